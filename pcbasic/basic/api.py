@@ -108,6 +108,25 @@ class Session(object):
             name = name.encode('ascii')
         return self._impl.get_variable(name)
 
+    def press_keys(self, keys):
+        """Insert keystrokes into the keyboard buffer, as when pasting text."""
+        self.start()
+        if isinstance(keys, unicode):
+            keys = self._impl.codepage.str_from_unicode(keys)
+        self._impl.keyboard.paste(keys)
+
+    def prepare_run(self):
+        """Set up the program to run from the start, e.g. before saving a warm image."""
+        self.start()
+        with self._impl.io_streams.activate():
+            self._impl.prepare_run()
+
+    def resume(self):
+        """Continue execution of a prepared or restored program."""
+        self.start()
+        with self._impl.io_streams.activate():
+            self._impl.resume()
+
     def interact(self):
         """Interactive interpreter session."""
         self.start()
@@ -45,6 +45,8 @@ VIDEO_CLEAR_ROWS = 10
 # scroll
 VIDEO_SCROLL_UP = 11
 VIDEO_SCROLL_DOWN = 12
+# scroll up by a number of lines
+VIDEO_SCROLL_UP_LINES = 22
 # enable/disable composite artifacts
 VIDEO_SET_COMPOSITE = 13
 # show/hide cursor
@@ -67,6 +69,8 @@ VIDEO_COPY_PAGE = 28
 VIDEO_SET_CAPTION = 29
 # clipboard copy reply
 VIDEO_SET_CLIPBOARD_TEXT = 30
+# the interpreter is about to wait for input; the screen is complete
+VIDEO_MARK_FRAME = 31
 
 # input queue signals
 # quit interpreter
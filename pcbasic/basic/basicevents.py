@@ -8,6 +8,7 @@ This file is released under the GNU GPL version 3 or later.
 
 from contextlib import contextmanager
 
+from ..compat import monotonic
 from .base import scancode
 from .base import error
 from .base import tokens as tk
@@ -21,11 +22,10 @@ from . import values
 class BasicEvents(object):
     """Manage BASIC events."""
 
-    def __init__(self, values, sound, clock, files, screen, program, syntax):
+    def __init__(self, values, sound, files, screen, program, syntax):
         """Initialise event triggers."""
         self._values = values
         self._sound = sound
-        self._clock = clock
         # files for com1 and com2
         self._files = files
         # for on_event_gosub_
@@ -54,7 +54,7 @@ class BasicEvents(object):
         keys += [None] * (20 - self.num_fn_keys - 4)
         self.key = [KeyHandler(sc) for sc in keys]
         # other events
-        self.timer = TimerHandler(self._clock)
+        self.timer = TimerHandler()
         self.play = PlayHandler(self._sound, self.multivoice)
         self.com = [
             ComHandler(self._files.get_device(b'COM1:')),
@@ -68,11 +68,24 @@ class BasicEvents(object):
         self.all = ([self.timer]
             + [self.key[num] for num in (range(10, 20) + range(10))]
             + [self.play] + self.com + [self.pen] + self.strig)
+        for handler in self.all:
+            handler.attach(self)
         # keep a list of enabled events
         self.enabled = set()
+        # enabled events that are checked on input signals and those that are polled
+        self.listeners = ()
+        self._polled = ()
+        self._next_poll = 0
+        # set when an event is triggered, so that we don't need to check every handler
+        self.pending = False
         # set suspension off
         self.suspend_all = False
 
+    def __setstate__(self, pickle_dict):
+        """Unpickle and poll on the next check."""
+        self.__dict__.update(pickle_dict)
+        self._next_poll = 0
+
     def set_active(self, active):
         """Activate or deactivate event checking."""
         self.active = active
@@ -98,8 +111,20 @@ class BasicEvents(object):
             handler.stopped = True
         else:
             return False
+        self.listeners = tuple(h for h in self.enabled if not h.polled)
+        self._polled = tuple(h for h in self.enabled if h.polled)
+        self._next_poll = 0
         return True
 
+    def poll(self):
+        """Check the enabled timer, music queue and serial port events when they may have changed."""
+        if self._polled:
+            if self._sound.queue_changed or monotonic() >= self._next_poll:
+                self._sound.queue_changed = False
+                for handler in self._polled:
+                    handler.poll()
+                self._next_poll = min(handler.next_poll() for handler in self._polled)
+
 
     ##########################################################################
     # callbacks
@@ -181,39 +206,77 @@ class BasicEvents(object):
             comnum = values.to_int(num)
             error.range_check(1, 2, comnum)
             self.com[comnum-1].set_jump(jumpnum)
+        # triggers may have changed, reschedule
+        self._next_poll = 0
 
 
 
 class EventHandler(object):
     """Manage event triggers."""
 
+    # polled for state changes rather than checked on input signals
+    polled = False
+
     def __init__(self):
         """Initialise untriggered and disabled."""
+        self._events = None
         self.reset()
 
     def reset(self):
         """Reset to untriggered and disabled initial state."""
         self.gosub = None
         self.enabled = False
-        self.stopped = False
+        self._stopped = False
         self.triggered = False
 
+    def attach(self, events):
+        """Report triggers to the event manager."""
+        self._events = events
+
+    def _notify(self):
+        """Flag the event manager if we may need handling."""
+        if self.triggered and self._events:
+            self._events.pending = True
+
+    @property
+    def stopped(self):
+        """Event is stopped: triggers are remembered but not handled."""
+        return self._stopped
+
+    @stopped.setter
+    def stopped(self, value):
+        """Stop or restart event handling."""
+        self._stopped = value
+        if not value:
+            self._notify()
+
     def set_jump(self, jump):
         """Set the jump line number."""
         self.gosub = jump
+        self._notify()
 
     def trigger(self):
         """Trigger the event."""
         self.triggered = True
+        self._notify()
 
     def check_input(self, signal):
         """Stub for event checker."""
         return False
 
+    def poll(self):
+        """Stub for event poller."""
+
+    def next_poll(self):
+        """Monotonic time when the poller next needs to run; 0 to run on every check."""
+        return 0
+
 
 class PlayHandler(EventHandler):
     """Manage PLAY (music queue) events."""
 
+    polled = True
+
     def __init__(self, sound, multivoice):
         """Initialise PLAY trigger."""
         EventHandler.__init__(self)
@@ -223,7 +286,7 @@ class PlayHandler(EventHandler):
         # set to a number higher than the maximum buffer length?
         self.last = 0 #34 if multivoice else 0
 
-    def check_input(self, signal):
+    def poll(self):
         """Check and trigger PLAY (music queue) events."""
         play_now = self.sound.tones_waiting()
         if self.multivoice:
@@ -233,7 +296,13 @@ class PlayHandler(EventHandler):
             if (self.last >= self.trig and play_now < self.trig):
                 self.trigger()
         self.last = play_now
-        return False
+
+    def next_poll(self):
+        """Poll when the next item leaves the music queue; new items are flagged by the queue."""
+        release = self.sound.next_release()
+        if release is None:
+            return float('inf')
+        return release
 
     def set_trigger(self, n):
         """Set PLAY trigger to n notes."""
@@ -243,44 +312,61 @@ class PlayHandler(EventHandler):
 class TimerHandler(EventHandler):
     """Manage TIMER events."""
 
-    def __init__(self, clock):
+    polled = True
+
+    def __init__(self):
         """Initialise TIMER trigger."""
         EventHandler.__init__(self)
+        # period and next due time on the monotonic clock, in seconds
+        # these are unaffected by TIME$, DATE$ and changes to the system clock
         self.period = 0
-        self.start = 0
-        self.clock = clock
+        self.due = 0
+
+    def __getstate__(self):
+        """Pickle the time remaining, as the monotonic clock has no fixed epoch."""
+        pickle_dict = self.__dict__.copy()
+        pickle_dict['due'] = self.due - monotonic()
+        return pickle_dict
+
+    def __setstate__(self, pickle_dict):
+        """Unpickle and reschedule."""
+        self.__dict__.update(pickle_dict)
+        self.due += monotonic()
 
     def set_trigger(self, n):
         """Set TIMER trigger to n milliseconds."""
-        self.start = self.clock.get_time_ms()
-        self.period = n
+        self.period = n / 1000.
+        self.due = monotonic() + self.period
 
-    def check_input(self, signal):
+    def poll(self):
         """Trigger TIMER events."""
-        mutimer = self.clock.get_time_ms()
-        if mutimer >= self.start + self.period:
-            self.start = mutimer
+        now = monotonic()
+        if now >= self.due:
+            if self.period:
+                # keep to the schedule, so that late checks don't accumulate drift
+                # periods that were missed entirely are not made up for
+                self.due += self.period * (1 + (now - self.due) // self.period)
             self.trigger()
-        return False
+
+    def next_poll(self):
+        """Poll when the timer is due."""
+        return self.due
 
 
 class ComHandler(EventHandler):
     """Manage COM-port events."""
 
+    polled = True
+
     def __init__(self, com_device):
         """Initialise COM trigger."""
         EventHandler.__init__(self)
         self.device = com_device
 
-    # treat com-port "trigger" as real-time check
-
-    @property
-    def triggered(self):
-        return self.device.char_waiting()
-
-    @triggered.setter
-    def triggered(self, value):
-        pass
+    def poll(self):
+        """Trigger COM events for as long as there is input waiting."""
+        self.triggered = self.device.char_waiting()
+        self._notify()
 
 
 class KeyHandler(EventHandler):
@@ -8,6 +8,8 @@ This file is released under the GNU GPL version 3 or later.
 
 import unicodedata
 import logging
+import codecs
+import bisect
 import os
 
 
@@ -94,6 +96,40 @@ class Codepage(object):
         self.unicode_to_cp = dict((reversed(item) for item in self.cp_to_unicode.items()))
         if self.dbcs_num_chars > 0:
             self.dbcs = True
+        # tables for single-byte conversion in one call, by preserved chars
+        self._decoding_tables = {}
+        self._encoding_map = None if self.dbcs else self._build_encoding_map()
+
+    def _build_encoding_map(self):
+        """Build charmap encoding table for graphemes that are a single, non-joining char."""
+        # control sequences and other ascii not in the codepage pass unchanged
+        encoding_map = {c: c for c in range(128)}
+        encoding_map.update(
+            (ord(uc), ord(cp_point))
+            for uc, cp_point in self.unicode_to_cp.iteritems()
+            if len(uc) == 1 and not _may_join(uc)
+        )
+        # NUL is the eascii prefix and always passes through
+        encoding_map[0] = 0
+        return encoding_map
+
+    def get_decoding_table(self, preserve=b''):
+        """Get charmap decoding table for a single-byte codepage."""
+        preserve = frozenset(preserve)
+        try:
+            return self._decoding_tables[preserve]
+        except KeyError:
+            pass
+        table = [self.cp_to_unicode[int2byte(c)] for c in range(256)]
+        for c in preserve:
+            table[ord(c)] = c.decode('ascii', errors='ignore')
+        if all(len(uc) == 1 for uc in table):
+            table = u''.join(table)
+        else:
+            # grapheme clusters need a 1-n mapping
+            table = dict(enumerate(table))
+        self._decoding_tables[preserve] = table
+        return table
 
     def connects(self, c, d, bset):
         """Return True if c and d connect according to box-drawing set bset."""
@@ -119,6 +155,12 @@ class Codepage(object):
 
     def str_from_unicode(self, ucs, errors='ignore'):
         """Convert unicode string to codepage string."""
+        if self._encoding_map:
+            try:
+                return codecs.charmap_encode(ucs, 'strict', self._encoding_map)[0]
+            except UnicodeError:
+                # unmapped or combining chars: go grapheme by grapheme
+                pass
         return b''.join(self.from_unicode(uc, errors=errors) for uc in split_graphemes(ucs))
 
     def to_unicode(self, cp, replace=u''):
@@ -127,6 +169,8 @@ class Codepage(object):
 
     def str_to_unicode(self, cps, preserve=b'', box_protect=True):
         """Convert codepage string to unicode string."""
+        if not self.dbcs:
+            return codecs.charmap_decode(cps, 'strict', self.get_decoding_table(preserve))[0]
         return Converter(self, preserve, box_protect).to_unicode(cps, flush=True)
 
     def get_converter(self, preserve=b''):
@@ -195,6 +239,16 @@ class Converter(object):
         self._dbcs = self._cp.dbcs
         self._bset = -1
         self._last = b''
+        # single-byte codepages convert statelessly through a table
+        self._table = None if self._dbcs else self._cp.get_decoding_table(preserve)
+
+    def get_state(self):
+        """Return the buffer and box-drawing state, to resume conversion from later."""
+        return self._buf, self._bset, self._last
+
+    def set_state(self, state=(b'', -1, b'')):
+        """Resume conversion from a saved state; by default, start afresh."""
+        self._buf, self._bset, self._last = state
 
     def mark(self, s, flush=False):
         """Process codepage string, returning list of grouped code sequences when ready."""
@@ -209,6 +263,8 @@ class Converter(object):
 
     def to_unicode(self, s, flush=False):
         """Process codepage string, returning unicode string when ready."""
+        if not self._dbcs:
+            return codecs.charmap_decode(s, 'strict', self._table)[0]
         return u''.join(
             (
                 seq.decode('ascii', errors='ignore')
@@ -706,11 +762,27 @@ GRAPHEME_BREAK = {
     ))
 }
 
+# sorted, disjoint code point intervals with their grapheme break property
+_BREAK_INTERVALS = sorted(
+    (base._lower, base._upper, key)
+    for key, value in GRAPHEME_BREAK.iteritems()
+    for base in value._base_intervals
+)
+_BREAK_LOWER = [_lower for _lower, _, _ in _BREAK_INTERVALS]
+
+# grapheme break properties that can join a cluster
+_JOINING = ('Regional_Indicator', 'Extend', 'SpacingMark', 'Prepend', 'V', 'L', 'T', 'LV', 'LVT')
+
+def _may_join(c):
+    """Return whether a unicode char can be part of a multi-char grapheme cluster."""
+    return _get_grapheme_break(c) in _JOINING
+
 def _get_grapheme_break(c):
     """Get grapheme break property of unicode char."""
-    for key, value in GRAPHEME_BREAK.iteritems():
-        if ord(c) in value:
-            return key
+    point = ord(c)
+    i = bisect.bisect_right(_BREAK_LOWER, point) - 1
+    if i >= 0 and point < _BREAK_INTERVALS[i][1]:
+        return _BREAK_INTERVALS[i][2]
     # no grapheme break property found
     return ''
 
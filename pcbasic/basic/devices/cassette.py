@@ -14,6 +14,11 @@ import string
 from chunk import Chunk
 import io
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from ..base import error
 from ..base import tokens as tk
 from .devicebase import RawFile, TextFileBase, InputMixin, DeviceSettings, parse_protocol_string
@@ -313,16 +318,7 @@ class CassetteStream(object):
 
     def _read_block(self):
         """Read a block of data from tape."""
-        count = 0
-        data = b''
-        while True:
-            if count == 256:
-                break
-            byte = self.bitstream.read_byte()
-            if byte is None:
-                raise PulseError()
-            data += int2byte(byte)
-            count += 1
+        data = self.bitstream.read_bytes(256)
         bytes0, bytes1 = self.bitstream.read_byte(), self.bitstream.read_byte()
         crc_given = bytes0 * 0x100 + bytes1
         crc_calc = crc(data)
@@ -335,13 +331,8 @@ class CassetteStream(object):
         """Write a 256-byte block to tape."""
         # fill out short blocks with last byte
         data += data[-1]*(256-len(data))
-        for b in data:
-            self.bitstream.write_byte(ord(b))
-        crc_word = crc(data)
         # crc is written big-endian
-        lo, hi = map(ord, struct.pack('<H', crc_word))
-        self.bitstream.write_byte(hi)
-        self.bitstream.write_byte(lo)
+        self.bitstream.write_bytes(data + struct.pack('>H', crc(data)))
 
     def _fill_record_buffer(self):
         """Read to fill the tape buffer."""
@@ -476,8 +467,7 @@ class TapeBitStream(object):
 
     def write_leader(self):
         """Write the leader / pilot tone."""
-        for _ in range(256):
-            self.write_byte(0xff)
+        self.write_bytes(b'\xff' * 256)
         self.write_bit(0)
         self.write_byte(0x16)
 
@@ -498,6 +488,15 @@ class TapeBitStream(object):
         for bit in bits:
             self.write_bit(bit)
 
+    def read_bytes(self, count):
+        """Read a number of bytes from the tape."""
+        return b''.join(int2byte(self.read_byte()) for _ in xrange(count))
+
+    def write_bytes(self, data):
+        """Write a string of bytes to tape image."""
+        for byte in bytearray(data):
+            self.write_byte(byte)
+
     def close(self):
         """Eject tape."""
         pass
@@ -750,7 +749,8 @@ class WAVBitStream(TapeBitStream):
                 raise EndOfTape()
             self.operating_mode = 'r'
         self.wav_pos = 0
-        self.buf_len = 1024
+        # number of frames to read and decode at a time
+        self.buf_len = 32768
         # convert 8-bit and 16-bit values to ints
         if self.sampwidth == 1:
             self.sub_threshold = 0
@@ -768,10 +768,10 @@ class WAVBitStream(TapeBitStream):
         self.length_cut = 2*self.halflength_cut
         # 2048 halves = 1024 pulses = 512 1-bits = 64 bytes of leader
         self.min_leader_halves = 2048
-        # initialise generators
+        # initialise filter and half-pulse detector
         self.filter = passthrough()
         self.filter.send(None)
-        self.read_half = self._gen_read_halfpulse()
+        self._reset_halves()
         # write fluff at start if this is a new file
         if self.operating_mode == 'w':
             self.write_intro()
@@ -794,6 +794,9 @@ class WAVBitStream(TapeBitStream):
 
     def switch_mode(self, mode):
         """Switch tape to reading or writing mode."""
+        if self.operating_mode == 'r' and mode == 'w':
+            # drop frames read ahead, so that we write at the tape position
+            self._seek(self.wav_pos)
         self.operating_mode = mode
 
     def counter(self):
@@ -802,16 +805,21 @@ class WAVBitStream(TapeBitStream):
 
     def wind(self, loc):
         """Set position of tape in seconds."""
-        self.wav_pos = int(loc * self.framerate)
-        self.wav.seek(self.wav_pos)
+        self._seek(int(loc * self.framerate))
+
+    def _seek(self, wav_pos):
+        """Set position of tape in frames."""
+        self.wav_pos = wav_pos
+        self.wav.seek(self.start + wav_pos * self.nchannels * self.sampwidth)
+        self._reset_halves()
 
     def read_bit(self):
         """Read the next bit."""
         try:
-            length_up, length_dn = next(self.read_half), next(self.read_half)
-        except StopIteration:
-            self.read_half = self._gen_read_halfpulse()
-            raise EndOfTape
+            length_up, length_dn = self._read_half(), self._read_half()
+        except EndOfTape:
+            self._reset_halves()
+            raise
         if (length_up > self.halflength_max or length_dn > self.halflength_max or
                 length_up < self.halflength_min or length_dn < self.halflength_min):
             return None
@@ -832,43 +840,70 @@ class WAVBitStream(TapeBitStream):
         self.wav.write(struct.pack('<4sL', b'data', end_pos-self.start))
         self.wav.close()
 
-    def _fill_buffer(self):
-        """Fill buffer with frames and pre-process."""
-        frame_buf = []
+    def read_bytes(self, count):
+        """Read a number of bytes from the tape."""
+        if not numpy:
+            return TapeBitStream.read_bytes(self, count)
+        try:
+            while len(self._halves) - self._half_pos < 16 * count:
+                self._detect_halves()
+        except EndOfTape:
+            # let the bitwise reader find out where the tape ends
+            return TapeBitStream.read_bytes(self, count)
+        halves = self._halves[self._half_pos:self._half_pos + 16*count]
+        length_up, length_dn = halves[0::2], halves[1::2]
+        errors = numpy.flatnonzero(
+            (length_up > self.halflength_max) | (length_dn > self.halflength_max) |
+            (length_up < self.halflength_min) | (length_dn < self.halflength_min)
+        )
+        if len(errors):
+            # the pulse in error has been read, like in read_bit
+            self._skip_halves(2*errors[0] + 2)
+            raise PulseError()
+        self._skip_halves(16 * count)
+        return numpy.packbits(length_up >= self.halflength_cut).tostring()
+
+    def _reset_halves(self):
+        """Drop detected half-pulses and restart detection."""
+        # lengths of half-pulses detected but not yet read
+        self._halves = numpy.zeros(0, int) if numpy else []
+        self._half_pos = 0
+        # detector state: last level, level before a zero, frames since last half-pulse
+        self._detector = 1, 1, 0
+
+    def _read_half(self):
+        """Read a half-pulse and return its length."""
+        while self._half_pos >= len(self._halves):
+            self._detect_halves()
+        length = int(self._halves[self._half_pos])
+        self._half_pos += 1
+        self.wav_pos += length
+        return length
+
+    def _skip_halves(self, count):
+        """Read a number of half-pulses that have been detected."""
+        skipped = self._halves[self._half_pos:self._half_pos + count]
+        self.wav_pos += int(numpy.sum(skipped) if numpy else sum(skipped))
+        self._half_pos += count
+
+    def _detect_halves(self):
+        """Read a buffer of frames and detect the half-pulses in it."""
         frames = self.wav.read(self.buf_len*self.nchannels*self.sampwidth)
         if not frames:
             raise EndOfTape
-        # convert MSBs to int (data stored little endian)
-        # note that we simply throw away all the less significant bytes
-        frames = map(ord, frames[self.sampwidth-1::self.sampwidth])
-        # sum frames over channels
-        frames = map(sum, zip(*[iter(frames)]*self.nchannels))
-        frames = [ x-self.subtractor if x >= self.sub_threshold else x for x in frames ]
-        return self.filter.send(frames)
-
-    def _gen_read_halfpulse(self):
-        """Generator to read a half-pulse and yield its length."""
-        length = 0
-        frame = 1
-        prezero = 1
-        pos_in_frame = 0
-        frame_buf = []
-        while True:
-            try:
-                sample = frame_buf[pos_in_frame]
-                pos_in_frame += 1
-            except IndexError:
-                frame_buf = self._fill_buffer()
-                pos_in_frame = 0
-                continue
-            length += 1
-            last, frame = frame, (sample > self.zero_threshold) + (sample >= -self.zero_threshold) - 1
-            if last != frame and (last != 0 or frame == prezero):
-                if frame == 0 and last != 0:
-                    prezero = last
-                self.wav_pos += length
-                yield length
-                length = 0
+        levels = _frame_levels(
+            frames, self.sampwidth, self.nchannels, self.sub_threshold, self.subtractor,
+            self.zero_threshold, self.filter
+        )
+        if not len(levels):
+            # incomplete frame at end of file
+            raise EndOfTape
+        halves, self._detector = _half_pulses(levels, *self._detector)
+        if numpy:
+            self._halves = numpy.append(self._halves[self._half_pos:], halves)
+        else:
+            self._halves = self._halves[self._half_pos:] + halves
+        self._half_pos = 0
 
     def write_pause(self, milliseconds):
         """Write a pause of given length to the tape."""
@@ -888,6 +923,21 @@ class WAVBitStream(TapeBitStream):
         )
         self.wav_pos += 2 * half_length
 
+    def write_bytes(self, data):
+        """Write a string of bytes to tape."""
+        if not numpy:
+            return TapeBitStream.write_bytes(self, data)
+        bits = numpy.unpackbits(numpy.frombuffer(bytes(data), numpy.uint8))
+        # each bit is a pulse of a down and an up half
+        lengths = numpy.repeat(numpy.array(self.halflength)[bits], 2)
+        if self.sampwidth == 1:
+            levels = numpy.array([0x00, 0xff], numpy.uint8)
+        else:
+            levels = numpy.array([-0x8000, 0x7fff], '<i2')
+        samples = numpy.repeat(numpy.tile(levels, len(bits)), lengths * self.nchannels)
+        self.wav.write(samples.tostring())
+        self.wav_pos += int(lengths.sum())
+
     def _read_wav_header(self):
         """Read RIFF WAV header."""
         try:
@@ -923,7 +973,7 @@ class WAVBitStream(TapeBitStream):
                 if not self.sampwidth:
                     logging.debug('Format chunk not found.')
                     return False
-                self.data_pos = self.wav.tell() - 4
+                self.data_pos = self.wav.tell() - 8
                 #self.wav.read(4)
                 self.start = self.wav.tell()
                 return True
@@ -949,9 +999,19 @@ class WAVBitStream(TapeBitStream):
         self.wav.write(struct.pack('<4sL', b'data', 0))
         self.start = self.wav.tell()
 
-    def _is_leader_halfpulse(self, half):
-        """Return whether the half pulse is of pilot wave frequency."""
-        return half >= self.length_cut/2
+    def _read_leader_halves(self):
+        """Read half-pulses of pilot wave frequency and the one ending them; return their number."""
+        counter = 0
+        while True:
+            while self._half_pos >= len(self._halves):
+                self._detect_halves()
+            halves = self._halves[self._half_pos:]
+            end = _find_below(halves, self.length_cut/2)
+            if end is not None:
+                self._skip_halves(end + 1)
+                return counter + end
+            counter += len(halves)
+            self._skip_halves(len(halves))
 
     def read_leader(self):
         """Read the leader / pilot wave."""
@@ -959,17 +1019,10 @@ class WAVBitStream(TapeBitStream):
             while True:
                 while self.read_bit() != 1:
                     pass
-                counter = 0
-                pulse = (0,0)
-                while True:
-                    last = pulse
-                    half = next(self.read_half)
-                    if not self._is_leader_halfpulse(half):
-                        if counter > self.min_leader_halves:
-                            #  zero bit; try to sync
-                            half = next(self.read_half)
-                        break
-                    counter += 1
+                counter = self._read_leader_halves()
+                if counter > self.min_leader_halves:
+                    #  zero bit; try to sync
+                    self._read_half()
                 # sync bit 0 has been read, check sync byte
                 if counter >= self.min_leader_halves:
                     # read rest of first byte
@@ -989,8 +1042,8 @@ class WAVBitStream(TapeBitStream):
                             '%s Error in sync byte after %d pulses: %s',
                             timestamp(self.counter()), counter, e
                         )
-        except (EndOfTape, StopIteration):
-            self.read_half = self._gen_read_halfpulse()
+        except EndOfTape:
+            self._reset_halves()
             return False
 
 ##############################################################################
@@ -1021,6 +1074,74 @@ def timestamp(counter):
     """Time stamp."""
     return b'[%d:%02d:%02d] ' % hms(counter)
 
+if numpy:
+    def _frame_levels(frames, sampwidth, nchannels, sub_threshold, subtractor, zero_threshold, filt):
+        """Convert WAV frames to levels -1, 0 or 1."""
+        # convert MSBs to int (data stored little endian)
+        # note that we simply throw away all the less significant bytes
+        values = numpy.frombuffer(frames, numpy.uint8)[sampwidth-1::sampwidth].astype(int)
+        # sum frames over channels
+        values = values[:len(values) - len(values) % nchannels]
+        values = values.reshape((-1, nchannels)).sum(axis=1)
+        values = filt.send(numpy.where(values >= sub_threshold, values - subtractor, values))
+        return (values > zero_threshold).astype(int) + (values >= -zero_threshold) - 1
+
+    def _half_pulses(levels, level, prezero, run):
+        """Find half-pulse lengths in a sequence of levels; return them and the new detector state."""
+        previous = numpy.append(level, levels[:-1])
+        changes = numpy.flatnonzero(levels != previous)
+        before, after = previous[changes], levels[changes]
+        # a change away from zero only counts if it returns to the level before the zero
+        # any change away from zero follows a change to zero, except at the start
+        prezeros = numpy.append(prezero, before[:-1])
+        ends = changes[(before != 0) | (after == prezeros)]
+        halves = numpy.diff(numpy.append(-1 - run, ends))
+        to_zero = before[after == 0]
+        if len(to_zero):
+            prezero = to_zero[-1]
+        if len(ends):
+            run = len(levels) - 1 - ends[-1]
+        else:
+            run += len(levels)
+        return halves, (levels[-1], prezero, run)
+
+    def _find_below(values, threshold):
+        """Index of the first value below threshold, or None."""
+        below = numpy.flatnonzero(values < threshold)
+        return below[0] if len(below) else None
+
+else:
+    def _frame_levels(frames, sampwidth, nchannels, sub_threshold, subtractor, zero_threshold, filt):
+        """Convert WAV frames to levels -1, 0 or 1."""
+        # convert MSBs to int (data stored little endian)
+        # note that we simply throw away all the less significant bytes
+        values = map(ord, frames[sampwidth-1::sampwidth])
+        # sum frames over channels
+        values = map(sum, zip(*[iter(values)]*nchannels))
+        values = filt.send([x-subtractor if x >= sub_threshold else x for x in values])
+        return [(x > zero_threshold) + (x >= -zero_threshold) - 1 for x in values]
+
+    def _half_pulses(levels, level, prezero, run):
+        """Find half-pulse lengths in a sequence of levels; return them and the new detector state."""
+        halves = []
+        for frame in levels:
+            run += 1
+            # a change away from zero only counts if it returns to the level before the zero
+            if frame != level and (level != 0 or frame == prezero):
+                if frame == 0:
+                    prezero = level
+                halves.append(run)
+                run = 0
+            level = frame
+        return halves, (level, prezero, run)
+
+    def _find_below(values, threshold):
+        """Index of the first value below threshold, or None."""
+        for i, value in enumerate(values):
+            if value < threshold:
+                return i
+        return None
+
 def passthrough():
     """Passthrough filter."""
     x = []
@@ -741,6 +741,15 @@ class BoundFile(object):
         """Context guard."""
         self._device.unbind(self._name)
 
+    def __getstate__(self):
+        """Pickle; a stream on a native file is bound by name on unpickling."""
+        pickle_dict = self.__dict__.copy()
+        name = getattr(self._file, 'name', None)
+        if not isinstance(self._file, basestring) and isinstance(name, basestring):
+            if os.path.isfile(name):
+                pickle_dict['_file'] = name
+        return pickle_dict
+
     def get_stream(self, mode):
         """Get a native stream for the bound file."""
         try:
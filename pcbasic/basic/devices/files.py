@@ -144,10 +144,10 @@ class Files(object):
             b'COM2:': ports.COMDevice(device_params.get(b'COM2:', None), queues, serial_in_size),
             # parallel devices - LPT1: must always be available
             b'LPT1:': parports.LPTDevice(
-                device_params.get(b'LPT1:', None), devicebase.nullstream(), codepage
+                device_params.get(b'LPT1:', None), devicebase.nullstream(), queues, codepage
             ),
-            b'LPT2:': parports.LPTDevice(device_params.get(b'LPT2:', None), None, codepage),
-            b'LPT3:': parports.LPTDevice(device_params.get(b'LPT3:', None), None, codepage),
+            b'LPT2:': parports.LPTDevice(device_params.get(b'LPT2:', None), None, queues, codepage),
+            b'LPT3:': parports.LPTDevice(device_params.get(b'LPT3:', None), None, queues, codepage),
         }
         # device files
         self.scrn_file = self._devices[b'SCRN:'].device_file
@@ -37,7 +37,7 @@ class LPTDevice(Device):
     # in GW-BASIC, FIELD gives a FIELD OVERFLOW; we get BAD FILE MODE.
     allowed_modes = b'OR'
 
-    def __init__(self, arg, default_stream, codepage):
+    def __init__(self, arg, default_stream, queues, codepage):
         """Initialise LPTn: device."""
         Device.__init__(self)
         addr, val = parse_protocol_string(arg)
@@ -55,7 +55,7 @@ class LPTDevice(Device):
                 logging.warning(u'Could not attach parallel port %s to LPT device: %s', val, e)
         elif addr == u'STDIO' or (not addr and val == u'STDIO'):
             crlf = (val.upper() == u'CRLF')
-            self.stream = StdIOParallelStream(crlf)
+            self.stream = StdIOParallelStream(queues, crlf)
         elif addr == u'PRINTER' or (val and not addr):
             # 'PRINTER' is default
             # name:parameters (LINE, PAGE, ...)
@@ -273,8 +273,10 @@ class ParallelStream(object):
 class StdIOParallelStream(object):
     """LPT output to standard output."""
 
-    def __init__(self, crlf=False):
+    def __init__(self, queues, crlf=False):
         """Initialise the stream."""
+        # to write out redirected output held back in front of ours
+        self._queues = queues
         self._crlf = crlf
 
     def close(self):
@@ -282,6 +284,7 @@ class StdIOParallelStream(object):
 
     def write(self, s):
         """Write to stdout."""
+        self._queues.flush_output()
         for c in s:
             if self._crlf and c == b'\r':
                 c = b'\n'
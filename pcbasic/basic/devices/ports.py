@@ -9,11 +9,10 @@ This file is released under the GNU GPL version 3 or later.
 import logging
 import sys
 import os
-import datetime
 import io
 from contextlib import contextmanager
 
-from ...compat import key_pressed
+from ...compat import key_pressed, monotonic
 from .devicebase import safe_io
 
 try:
@@ -168,7 +167,7 @@ class COMDevice(Device):
             if not addr and not val:
                 pass
             elif addr == u'STDIO' or (not addr and val.upper() == u'STDIO'):
-                return SerialStdIO(val.upper() == u'CRLF')
+                return SerialStdIO(self._queues, val.upper() == u'CRLF')
             else:
                 if not serial:
                     logging.warning(
@@ -223,16 +222,16 @@ class COMDevice(Device):
         if not rs:
             with safe_io(error.DEVICE_TIMEOUT):
                 self._serial.rts = True
-        now = datetime.datetime.now()
-        timeout_cts = now + datetime.timedelta(microseconds=cs)
-        timeout_dsr = now + datetime.timedelta(microseconds=ds)
-        timeout_cd = now + datetime.timedelta(microseconds=cd)
+        now = monotonic()
+        timeout_cts = now + cs * 1e-6
+        timeout_dsr = now + ds * 1e-6
+        timeout_cd = now + cd * 1e-6
         with safe_io(error.DEVICE_TIMEOUT):
             have_cts, have_dsr, have_cd = self._serial.cts, self._serial.dsr, self._serial.cd
         while ((now < timeout_cts and not have_cts) and
                 (now < timeout_dsr and not have_dsr) and
                 (now < timeout_cd and not have_cd)):
-            now = datetime.datetime.now()
+            now = monotonic()
             with safe_io(error.DEVICE_TIMEOUT):
                 have_cts = have_cts and self._serial.cts
                 have_dsr = have_dsr and self._serial.dsr
@@ -425,8 +424,10 @@ class SerialStdIO(object):
     dsr = True
     cts = True
 
-    def __init__(self, crlf):
+    def __init__(self, queues, crlf):
         """Initialise the stream."""
+        # to write out redirected output held back in front of ours
+        self._queues = queues
         self.is_open = False
         self._crlf = crlf
         # dummy parameters
@@ -463,6 +464,7 @@ class SerialStdIO(object):
 
     def write(self, s):
         """Write to stdout."""
+        self._queues.flush_output()
         if self._crlf:
             s = s.replace(b'\r', b'\n')
         sys.stdout.write(s)
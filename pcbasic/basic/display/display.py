@@ -130,7 +130,7 @@ class Display(object):
 
     def __init__(self, queues, values, input_methods, memory,
                 initial_width, video_mem_size, capabilities, monitor, sound, io_streams,
-                low_intensity, screen_aspect, codepage, fonts):
+                low_intensity, screen_aspect, codepage, fonts, coalesce_scroll=True):
         """Initialise the display."""
         self.queues = queues
         self._values = values
@@ -151,10 +151,12 @@ class Display(object):
         # text screen
         self.text_screen = TextScreen(
             self.queues, self._values, self.mode, self.capabilities,
-            fonts, codepage, io_streams, sound
+            fonts, codepage, io_streams, sound, coalesce_scroll
         )
         # graphics operations
-        self.drawing = graphics.Drawing(self.queues, input_methods, self._values, self._memory)
+        self.drawing = graphics.Drawing(
+            self.queues, input_methods, self._values, self._memory, self.text_screen
+        )
         # colour palette
         self.palette = Palette(self.queues, self.mode, self.capabilities, self._memory)
         # initialise a fresh textmode screen
@@ -212,6 +214,8 @@ class Display(object):
     def _set_mode(self, spec, new_mode, new_colorswitch,
                  new_apagenum, new_vpagenum, erase=True):
         """Change the video mode, colourburst, visible or active page."""
+        # held-back scrolls belong to the old mode
+        self.text_screen.flush_scroll()
         # preserve memory if erase==0; don't distingush erase==1 and erase==2
         save_mem = None
         if (not erase and self.mode.video_segment == spec.video_segment):
@@ -397,10 +401,12 @@ class Display(object):
 
     def get_memory(self, addr, num_bytes):
         """Retrieve bytes from video memory."""
+        self.text_screen.flush_scroll()
         return self.mode.get_memory(self, addr, num_bytes)
 
     def set_memory(self, addr, bytestr):
         """Set bytes in video memory."""
+        self.text_screen.flush_scroll()
         self.mode.set_memory(self, addr, bytestr)
 
     ###########################################################################
@@ -462,6 +468,7 @@ class Display(object):
         dst = values.to_int(next(args))
         list(args)
         error.range_check(0, self.mode.num_pages-1, dst)
+        self.text_screen.flush_scroll()
         self.text_screen.text.copy_page(src, dst)
         if not self.mode.is_text_mode:
             self.pixels.copy_page(src, dst)
@@ -28,6 +28,8 @@ int2byte = chr
 CARRY_COL_9_CHARS = tuple(int2byte(_c) for _c in range(0xb0, 0xdf+1))
 # ascii codepoints for which to repeat row 8 in row 9 (box drawing)
 CARRY_ROW_9_CHARS = tuple(int2byte(_c) for _c in range(0xb0, 0xdf+1))
+# maximum number of coloured sprites to keep in the glyph cache
+SPRITE_CACHE_SIZE = 1024
 
 
 # The glyphs below are extracted from Henrique Peron's CPIDOS v3.0,
@@ -228,6 +230,9 @@ class GlyphCache(object):
         self._mode = mode
         self._fonts = fonts
         self._codepage = codepage
+        # coloured sprites by character, foreground and background attribute
+        # these are shared between callers, so they are read-only
+        self._sprites = {}
         # preload SBCS glyphs
         self._glyphs = {
             c: self._fonts[mode.font_height].build_glyph(c, mode.font_width, mode.font_height)
@@ -259,6 +264,9 @@ class GlyphCache(object):
             char, self._mode.font_width*2, self._mode.font_height
         )
         self._glyphs[char] = mask
+        self._sprites = {
+            key: sprite for key, sprite in self._sprites.iteritems() if key[0] != char
+        }
         if self._mode.is_text_mode:
             self._queues.video.put(signals.Event(
                 signals.VIDEO_BUILD_GLYPHS, ({self._codepage.to_unicode(char, u'\0'): mask},)
@@ -272,23 +280,38 @@ class GlyphCache(object):
     if numpy:
         def get_sprite(self, row, col, char, fore, back):
             """Return a sprite for a given character."""
-            if char not in self._glyphs:
-                self._submit_char(char)
-            mask = self._glyphs[char]
-            # set background
-            glyph = numpy.full(mask.shape, back, dtype=int)
-            # stamp foreground mask
-            glyph[mask] = fore
+            try:
+                glyph = self._sprites[char, fore, back]
+            except KeyError:
+                if char not in self._glyphs:
+                    self._submit_char(char)
+                mask = self._glyphs[char]
+                # set background
+                glyph = numpy.full(mask.shape, back, dtype=int)
+                # stamp foreground mask
+                glyph[mask] = fore
+                glyph.flags.writeable = False
+                self._store_sprite(char, fore, back, glyph)
             x0, y0 = (col-1) * self._mode.font_width, (row-1) * self._mode.font_height
-            x1, y1 = x0 + mask.shape[1] - 1, y0 + mask.shape[0] - 1
+            x1, y1 = x0 + glyph.shape[1] - 1, y0 + glyph.shape[0] - 1
             return x0, y0, x1, y1, glyph
     else:
         def get_sprite(self, row, col, char, fore, back):
             """Return a sprite for a given character."""
-            if char not in self._glyphs:
-                self._submit_char(char)
-            mask = self._glyphs[char]
-            glyph = [[(fore if _bit else back) for _bit in _row] for _row in mask]
+            try:
+                glyph = self._sprites[char, fore, back]
+            except KeyError:
+                if char not in self._glyphs:
+                    self._submit_char(char)
+                mask = self._glyphs[char]
+                glyph = tuple(tuple((fore if _bit else back) for _bit in _row) for _row in mask)
+                self._store_sprite(char, fore, back, glyph)
             x0, y0 = (col-1) * self._mode.font_width, (row-1) * self._mode.font_height
-            x1, y1 = x0 + len(mask[0]) - 1, y0 + len(mask) - 1
+            x1, y1 = x0 + len(glyph[0]) - 1, y0 + len(glyph) - 1
             return x0, y0, x1, y1, glyph
+
+    def _store_sprite(self, char, fore, back, glyph):
+        """Keep a coloured sprite for reuse."""
+        if len(self._sprites) >= SPRITE_CACHE_SIZE:
+            self._sprites.clear()
+        self._sprites[char, fore, back] = glyph
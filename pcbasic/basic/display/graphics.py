@@ -12,6 +12,7 @@ except ImportError:
     numpy = None
 
 import math
+from contextlib import contextmanager
 
 from ..base import error
 from ..base import tokens as tk
@@ -20,6 +21,15 @@ from .. import values
 from .. import mlparser
 
 
+# maximum number of compiled DRAW strings to keep
+GML_CACHE_SIZE = 256
+
+# pseudo-commands in compiled DRAW strings
+_GML_CHECK = b'check'
+_GML_PARTIAL = b'partial'
+_GML_ERROR = b'error'
+
+
 class GraphicsViewPort(object):
     """Graphics viewport (clip area) functions."""
 
@@ -104,14 +114,16 @@ class GraphicsViewPort(object):
 class Drawing(object):
     """Graphical drawing operations."""
 
-    def __init__(self, queues, input_methods, values, memory):
+    def __init__(self, queues, input_methods, values, memory, text_screen):
         """Initialise graphics object."""
         # for apagenum and attr
         self._queues = queues
         self._values = values
         self._memory = memory
-        # for wait() in paint_
+        # for check_events() in paint_
         self._input_methods = input_methods
+        # for scrolls that must be applied before accessing pixels
+        self._text_screen = text_screen
         # memebers set on mode switch
         self._mode = None
         self._text = None
@@ -122,6 +134,13 @@ class Drawing(object):
         self.last_attr = None
         self.draw_scale = None
         self.draw_angle = None
+        # pixels plotted but not yet sent to the interface
+        self._plot_depth = 0
+        self._plot_rects = {}
+        self._plot_cells = set()
+        self._plot_areas = set()
+        # compiled DRAW strings
+        self._gml_cache = {}
 
     def init_mode(self, mode, text, pixels):
         """Initialise for new graphics mode."""
@@ -150,6 +169,11 @@ class Drawing(object):
         """Set the active page."""
         self._apagenum = apagenum
 
+    def _page(self, pagenum):
+        """Get a pixel page, bringing it up to date with the text screen."""
+        self._text_screen.flush_scroll()
+        return self._pixels.pages[pagenum]
+
     ### attributes
 
     def get_attr_index(self, c):
@@ -188,24 +212,99 @@ class Drawing(object):
         if pagenum is None:
             pagenum = self._apagenum
         if self.graph_view.contains(x, y):
-            self._pixels.pages[pagenum].put_pixel(x, y, index)
+            self._page(pagenum).put_pixel(x, y, index)
             self._queues.video.put(signals.Event(signals.VIDEO_PUT_PIXEL, (pagenum, x, y, index)))
             self.clear_text_at(x, y)
 
+    def put_pixels(self, xs, ys, index):
+        """Put a set of pixels, given as sequences of coordinates, on the active page."""
+        vx0, vy0, vx1, vy1 = self.graph_view.get()
+        if numpy:
+            xs, ys = numpy.asarray(xs, dtype=int), numpy.asarray(ys, dtype=int)
+            inside = (xs >= vx0) & (xs <= vx1) & (ys >= vy0) & (ys <= vy1)
+            xs, ys = xs[inside], ys[inside]
+            if not len(xs):
+                return
+            rect = xs.min(), ys.min(), xs.max(), ys.max()
+            # text cells covered by the pixels, as row*width + col
+            cells = numpy.unique(
+                (ys // self._mode.font_height) * self._mode.width + xs // self._mode.font_width
+            ).tolist()
+        else:
+            points = [
+                (x, y) for x, y in zip(xs, ys) if vx0 <= x <= vx1 and vy0 <= y <= vy1
+            ]
+            if not points:
+                return
+            xs, ys = zip(*points)
+            rect = min(xs), min(ys), max(xs), max(ys)
+            cells = set(
+                (y // self._mode.font_height) * self._mode.width + x // self._mode.font_width
+                for x, y in points
+            )
+        self._page(self._apagenum).put_pixels(xs, ys, index)
+        self._add_plotted(self._apagenum, rect)
+        self._plot_cells.update(cells)
+        if not self._plot_depth:
+            self._flush_plotted()
+
+    def _add_plotted(self, pagenum, rect):
+        """Extend the area of a page to be sent to the interface."""
+        if pagenum in self._plot_rects:
+            x0, y0, x1, y1 = self._plot_rects[pagenum]
+            rect = min(x0, rect[0]), min(y0, rect[1]), max(x1, rect[2]), max(y1, rect[3])
+        self._plot_rects[pagenum] = rect
+
+    @contextmanager
+    def plotting(self):
+        """Collect plotted pixels and update the interface and text buffer once."""
+        self._plot_depth += 1
+        try:
+            yield
+        finally:
+            self._plot_depth -= 1
+            if not self._plot_depth:
+                self._flush_plotted()
+
+    def _flush_plotted(self):
+        """Send the plotted area to the interface and remove the characters covering it."""
+        for pagenum, (x0, y0, x1, y1) in sorted(self._plot_rects.items()):
+            self._queues.video.put(signals.Event(signals.VIDEO_PUT_RECT, (
+                pagenum, x0, y0, x1, y1, self._page(pagenum).get_rect(x0, y0, x1, y1)
+            )))
+        for row0, col0, row1, col1 in self._plot_areas:
+            self._text.clear_area(self._apagenum, row0, col0, row1, col1, self._attr)
+        fore, back, blink, underline = self._mode.split_attr(self._attr)
+        for cell in sorted(self._plot_cells):
+            row, col = 1 + cell // self._mode.width, 1 + cell % self._mode.width
+            if row <= self._mode.height:
+                self._text.put_char_attr(self._apagenum, row, col, b' ', self._attr)
+                self._queues.video.put(signals.Event(signals.VIDEO_PUT_GLYPH, (
+                    self._apagenum, row, col, u' ', False, fore, back, blink, underline
+                )))
+        self._plot_rects = {}
+        self._plot_cells = set()
+        self._plot_areas = set()
+
     def get_pixel(self, x, y, pagenum=None):
         """Return the attribute a pixel on the screen."""
         if pagenum is None:
             pagenum = self._apagenum
-        return self._pixels.pages[pagenum].get_pixel(x, y)
+        return self._page(pagenum).get_pixel(x, y)
 
     def get_interval(self, pagenum, x, y, length):
         """Read a scanline interval into a list of attributes."""
-        return self._pixels.pages[pagenum].get_interval(x, y, length)
+        return self._page(pagenum).get_interval(x, y, length)
 
     def put_interval(self, pagenum, x, y, colours, mask=0xff):
         """Write a list of attributes to a scanline interval."""
         x, y, colours = self.graph_view.clip_list(x, y, colours)
-        newcolours = self._pixels.pages[pagenum].put_interval(x, y, colours, mask)
+        newcolours = self._page(pagenum).put_interval(x, y, colours, mask)
+        if self._plot_depth:
+            if len(colours):
+                self._add_plotted(pagenum, (x, y, x+len(colours)-1, y))
+            self._plot_areas.add(self._mode.pixel_to_text_area(x, y, x+len(colours), y))
+            return
         self._queues.video.put(
             signals.Event(signals.VIDEO_PUT_INTERVAL, (pagenum, x, y, newcolours))
         )
@@ -214,7 +313,7 @@ class Drawing(object):
     def fill_interval(self, x0, x1, y, index):
         """Fill a scanline interval in a solid attribute."""
         x0, x1, y = self.graph_view.clip_interval(x0, x1, y)
-        self._pixels.pages[self._apagenum].fill_interval(x0, x1, y, index)
+        self._page(self._apagenum).fill_interval(x0, x1, y, index)
         self._queues.video.put(
             signals.Event(signals.VIDEO_FILL_INTERVAL, (self._apagenum, x0, x1, y, index))
         )
@@ -222,16 +321,16 @@ class Drawing(object):
 
     def get_until(self, x0, x1, y, c):
         """Get the attribute values of a scanline interval."""
-        return self._pixels.pages[self._apagenum].get_until(x0, x1, y, c)
+        return self._page(self._apagenum).get_until(x0, x1, y, c)
 
     def get_rect(self, x0, y0, x1, y1):
         """Read a screen rect into an [y][x] array of attributes."""
-        return self._pixels.pages[self._apagenum].get_rect(x0, y0, x1, y1)
+        return self._page(self._apagenum).get_rect(x0, y0, x1, y1)
 
     def put_rect(self, x0, y0, x1, y1, sprite, operation_token):
         """Apply an [y][x] array of attributes onto a screen rect."""
         x0, y0, x1, y1, sprite = self.graph_view.clip_area(x0, y0, x1, y1, sprite)
-        rect = self._pixels.pages[self._apagenum].put_rect(
+        rect = self._page(self._apagenum).put_rect(
             x0, y0, x1, y1, sprite, operation_token
         )
         self._queues.video.put(
@@ -242,7 +341,7 @@ class Drawing(object):
     def fill_rect(self, x0, y0, x1, y1, index):
         """Fill a rectangle in a solid attribute."""
         x0, y0, x1, y1 = self.graph_view.clip_rect(x0, y0, x1, y1)
-        self._pixels.pages[self._apagenum].fill_rect(x0, y0, x1, y1, index)
+        self._page(self._apagenum).fill_rect(x0, y0, x1, y1, index)
         self._queues.video.put(
             signals.Event(signals.VIDEO_FILL_RECT, (self._apagenum, x0, y0, x1, y1, index))
         )
@@ -278,7 +377,8 @@ class Drawing(object):
             self.draw_box_filled(x0, y0, x1, y1, fill)
             self.last_attr = fill
         if border is not None:
-            self.draw_box(x0-1, y0-1, x1+1, y1+1, border)
+            with self.plotting():
+                self.draw_box(x0-1, y0-1, x1+1, y1+1, border)
             self.last_attr = border
         self.graph_view.set(x0, y0, x1, y1, absolute)
         self.last_point = self.graph_view.get_mid()
@@ -436,12 +536,13 @@ class Drawing(object):
             x0, y0 = self.last_point
         x1, y1 = self.graph_view.coords(*self.get_window_physical(*coord1))
         c = self.get_attr_index(c)
-        if not shape:
-            self.draw_line(x0, y0, x1, y1, c, pattern)
-        elif shape == b'B':
-            self.draw_box(x0, y0, x1, y1, c, pattern)
-        elif shape == b'BF':
-            self.draw_box_filled(x0, y0, x1, y1, c)
+        with self.plotting():
+            if not shape:
+                self.draw_line(x0, y0, x1, y1, c, pattern)
+            elif shape == b'B':
+                self.draw_box(x0, y0, x1, y1, c, pattern)
+            elif shape == b'BF':
+                self.draw_box_filled(x0, y0, x1, y1, c)
         self.last_point = x1, y1
         self.last_attr = c
 
@@ -461,22 +562,23 @@ class Drawing(object):
             dx, dy = dy, dx
         sx = 1 if x1 > x0 else -1
         sy = 1 if y1 > y0 else -1
-        mask = 0x8000
-        line_error = dx // 2
-        x, y = x0, y0
-        for x in xrange(x0, x1+sx, sx):
-            if pattern & mask != 0:
-                if steep:
-                    self.put_pixel(y, x, c)
-                else:
-                    self.put_pixel(x, y, c)
-            mask >>= 1
-            if mask == 0:
-                mask = 0x8000
-            line_error -= dy
-            if line_error < 0:
-                y += sy
-                line_error += dx
+        # the error term starts at dx//2 and decreases by dy at each step;
+        # y steps whenever it goes negative, after which dx is added back
+        # so after i steps, y has moved by the number of dx needed to keep it in [0, dx)
+        bits = _pattern_bits(pattern)
+        if numpy:
+            steps = numpy.arange(dx+1)
+            xs = x0 + sx * steps
+            ys = y0 + sy * (-((dx//2 - dy*steps) // max(dx, 1)))
+            plot = numpy.array(bits, dtype=bool)[steps % 16]
+            xs, ys = xs[plot], ys[plot]
+        else:
+            steps = [i for i in xrange(dx+1) if bits[i % 16]]
+            xs = [x0 + sx * i for i in steps]
+            ys = [y0 + sy * (-((dx//2 - dy*i) // max(dx, 1))) for i in steps]
+        if steep:
+            xs, ys = ys, xs
+        self.put_pixels(xs, ys, c)
 
     def draw_box_filled(self, x0, y0, x1, y1, c):
         """Draw a filled box between the given corner points."""
@@ -508,15 +610,17 @@ class Drawing(object):
         else:
             p0, p1, q, direction = x0, x1, y0, 'x'
         sp = 1 if p1 > p0 else -1
+        ps = []
         for p in range(p0, p1+sp, sp):
             if pattern & mask != 0:
-                if direction == 'x':
-                    self.put_pixel(p, q, c)
-                else:
-                    self.put_pixel(q, p, c)
+                ps.append(p)
             mask >>= 1
             if mask == 0:
                 mask = 0x8000
+        if direction == 'x':
+            self.put_pixels(ps, [q]*len(ps), c)
+        else:
+            self.put_pixels([q]*len(ps), ps, c)
         return mask
 
     ### CIRCLE: circle, ellipse, sectors
@@ -602,6 +706,19 @@ class Drawing(object):
         stop_octant, stop_coord, stop_line = -1, -1, False
         if stop:
             stop_octant, stop_coord, stop_line = _get_octant(stop, rx, ry)
+        with self.plotting():
+            self._circle(
+                x0, y0, rx, ry, c, aspect, start, stop,
+                start_octant, start_coord, start_line, stop_octant, stop_coord, stop_line
+            )
+        self.last_attr = c
+        self.last_point = x0, y0
+
+    def _circle(
+            self, x0, y0, rx, ry, c, aspect, start, stop,
+            start_octant, start_coord, start_line, stop_octant, stop_coord, stop_line
+        ):
+        """Draw a circle or an ellipse."""
         if aspect == 1.:
             self.draw_circle(x0, y0, rx, c,
                              start_octant, start_coord, start_line,
@@ -619,8 +736,6 @@ class Drawing(object):
                 start_octant//2, startx, starty, start_line,
                 stop_octant//2, stopx, stopy, stop_line
             )
-        self.last_attr = c
-        self.last_point = x0, y0
 
     def draw_circle(
             self, x0, y0, r, c,
@@ -641,6 +756,7 @@ class Drawing(object):
         # ....|-----|... ; coo1 gte coo0: print if y in [coo0,coo1]
         x, y = r, 0
         bres_error = 1-r
+        points = []
         while x >= y:
             for octant in range(0,8):
                 if octant in hide_oct:
@@ -661,7 +777,7 @@ class Drawing(object):
                         # (don't draw if y is between coo's)
                         if _octant_gt(oct0, y, coo1) and _octant_gt(oct0, coo0, y):
                             continue
-                self.put_pixel(*_octant_coord(octant, x0, y0, x, y), index=c)
+                points.append(_octant_coord(octant, x0, y0, x, y))
             # remember endpoints for pie sectors
             if y == coo0:
                 coo0x = x
@@ -674,6 +790,8 @@ class Drawing(object):
             else:
                 x -= 1
                 bres_error += 2*(y-x+1)
+        if points:
+            self.put_pixels(*zip(*points), index=c)
         # draw pie-slice lines
         if line0:
             self.draw_line(x0, y0, *_octant_coord(oct0, x0, y0, coo0x, coo0), c=c)
@@ -702,6 +820,7 @@ class Drawing(object):
         # error for first step
         err = dx + dy
         x, y = rx, 0
+        points = []
         while True:
             for quadrant in range(0,4):
                 # skip invisible arc sectors
@@ -718,7 +837,7 @@ class Drawing(object):
                     else:
                         if _quadrant_gt(qua0, x, y, x1, y1) and _quadrant_gt(qua0, x0, y0, x, y):
                             continue
-                self.put_pixel(*_quadrant_coord(quadrant, cx, cy, x, y), index=c)
+                points.append(_quadrant_coord(quadrant, cx, cy, x, y))
             # bresenham error step
             e2 = 2 * err
             if (e2 <= dy):
@@ -735,9 +854,11 @@ class Drawing(object):
         # too early stop of flat vertical ellipses
         # finish tip of ellipse
         while (y < ry):
-            self.put_pixel(cx, cy+y, c)
-            self.put_pixel(cx, cy-y, c)
+            points.append((cx, cy+y))
+            points.append((cx, cy-y))
             y += 1
+        if points:
+            self.put_pixels(*zip(*points), index=c)
         # draw pie-slice lines
         if line0:
             self.draw_line(cx, cy, *_quadrant_coord(qua0, cx, cy, x0, y0), c=c)
@@ -806,46 +927,63 @@ class Drawing(object):
         # paint nothing if we start on border attrib
         if self.get_pixel(x,y) == border:
             return
-        while len(line_seed) > 0:
-            # consider next interval
-            x_start, x_stop, y, ydir = line_seed.pop()
-            # extend interval as far as it goes to left and right
-            x_left = x_start - len(self.get_until(x_start-1, bound_x0-1, y, border))
-            x_right = x_stop + len(self.get_until(x_stop+1, bound_x1+1, y, border))
-            # check next scanlines and add intervals to the list
-            if ydir == 0:
-                if y + 1 <= bound_y1:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_right, y+1, c, tile, back, border, 1
-                    )
-                if y - 1 >= bound_y0:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_right, y-1, c, tile, back, border, -1
-                    )
-            else:
-                # check the same interval one scanline onward in the same direction
-                if y+ydir <= bound_y1 and y+ydir >= bound_y0:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_right, y+ydir, c, tile, back, border, ydir
-                    )
-                # check any bit of the interval that was extended one scanline backward
-                # this is where the flood fill goes around corners.
-                if y-ydir <= bound_y1 and y-ydir >= bound_y0:
-                    line_seed = self.check_scanline(
-                        line_seed, x_left, x_start-1, y-ydir, c, tile, back, border, -ydir
-                    )
-                    line_seed = self.check_scanline(
-                        line_seed, x_stop+1, x_right, y-ydir, c, tile, back, border, -ydir
-                    )
-            # draw the pixels for the current interval
-            if solid:
-                self.fill_interval(x_left, x_right, y, tile[0][0])
-            else:
-                interval = tile_to_interval(x_left, x_right, y, tile)
-                self.put_interval(self._apagenum, x_left, y, interval)
-            # allow interrupting the paint
-            if y%4 == 0:
-                self._input_methods.wait()
+        # the fill is drawn directly onto the page and sent to the interface in one go
+        page = self._page(self._apagenum)
+        rect_x0, rect_y0, rect_x1, rect_y1 = x, y, x, y
+        text_areas = set()
+        try:
+            while len(line_seed) > 0:
+                # consider next interval
+                x_start, x_stop, y, ydir = line_seed.pop()
+                # extend interval as far as it goes to left and right
+                x_left = x_start - len(page.get_until(x_start-1, bound_x0-1, y, border))
+                x_right = x_stop + len(page.get_until(x_stop+1, bound_x1+1, y, border))
+                # check next scanlines and add intervals to the list
+                if ydir == 0:
+                    if y + 1 <= bound_y1:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_right, y+1, c, tile, back, border, 1
+                        )
+                    if y - 1 >= bound_y0:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_right, y-1, c, tile, back, border, -1
+                        )
+                else:
+                    # check the same interval one scanline onward in the same direction
+                    if y+ydir <= bound_y1 and y+ydir >= bound_y0:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_right, y+ydir, c, tile, back, border, ydir
+                        )
+                    # check any bit of the interval that was extended one scanline backward
+                    # this is where the flood fill goes around corners.
+                    if y-ydir <= bound_y1 and y-ydir >= bound_y0:
+                        line_seed = self.check_scanline(
+                            line_seed, x_left, x_start-1, y-ydir, c, tile, back, border, -ydir
+                        )
+                        line_seed = self.check_scanline(
+                            line_seed, x_stop+1, x_right, y-ydir, c, tile, back, border, -ydir
+                        )
+                # draw the pixels for the current interval
+                if solid:
+                    page.fill_interval(x_left, x_right, y, tile[0][0])
+                    text_areas.add(self._mode.pixel_to_text_area(x_left, y, x_right, y))
+                else:
+                    page.put_interval(x_left, y, tile_to_interval(x_left, x_right, y, tile))
+                    # patterned intervals clear text up to one pixel beyond the interval
+                    text_areas.add(self._mode.pixel_to_text_area(x_left, y, x_right+1, y))
+                rect_x0, rect_x1 = min(rect_x0, x_left), max(rect_x1, x_right)
+                rect_y0, rect_y1 = min(rect_y0, y), max(rect_y1, y)
+                # allow interrupting the paint, but don't sleep
+                if y%4 == 0:
+                    self._input_methods.check_events()
+        finally:
+            if text_areas:
+                self._queues.video.put(signals.Event(signals.VIDEO_PUT_RECT, (
+                    self._apagenum, rect_x0, rect_y0, rect_x1, rect_y1,
+                    page.get_rect(rect_x0, rect_y0, rect_x1, rect_y1)
+                )))
+                for row0, col0, row1, col1 in text_areas:
+                    self._text.clear_area(self._apagenum, row0, col0, row1, col1, self._attr)
         self.last_attr = c
 
     def check_scanline(
@@ -855,32 +993,17 @@ class Drawing(object):
         """Append all subintervals between border colours to the scanning stack."""
         if x_stop < x_start:
             return line_seed
-        x_start_next = x_start
-        x_stop_next = x_start_next-1
         rtile = tile[y%len(tile)]
-        if back:
-            rback = back[y%len(back)]
-        x = x_start
-        while x <= x_stop:
-            # scan horizontally until border colour found, then append interval & continue scanning
-            pattern = self.get_until(x, x_stop+1, y, border)
-            x_stop_next = x + len(pattern) - 1
-            x = x_stop_next + 1
-            # never match zero pattern (special case)
-            has_same_pattern = (rtile != [0]*8)
-            for pat_x in range(len(pattern)):
-                if not has_same_pattern:
-                    break
-                tile_x = (x_start_next + pat_x) % 8
-                has_same_pattern &= (pattern[pat_x] == rtile[tile_x])
-                has_same_pattern &= (not back or pattern[pat_x] != rback[tile_x])
-            # we've reached a border colour, append our interval & start a new one
+        rback = back[y%len(back)] if back else None
+        # never match zero pattern (special case)
+        can_match = (list(rtile) != [0]*8)
+        for x_start_next, x_stop_next, has_same_pattern in (
+                self._page(self._apagenum).get_runs(
+                    x_start, x_stop, y, border, rtile, rback)):
             # don't append if same fill colour/pattern,
             # to avoid infinite loops over bits already painted (eg. 00 shape)
-            if x_stop_next >= x_start_next and not has_same_pattern:
+            if not (can_match and has_same_pattern):
                 line_seed.append([x_start_next, x_stop_next, y, ydir])
-            x_start_next = x + 1
-            x += 1
         return line_seed
 
     ### PUT and GET: Sprite operations
@@ -912,7 +1035,9 @@ class Drawing(object):
             dx, dy = self._mode.record_to_sprite_size(byte_array)
             sprite = self._mode.array_to_sprite(byte_array, 4, dx, dy)
             # store it now that we have it!
-            self._memory.arrays.set_cache(array_name, (dx, dy, sprite))
+            self._memory.arrays.set_cache(
+                array_name, (dx, dy, sprite), length=4+self._mode.sprite_length(dx, dy)
+            )
         # sprite must be fully inside *viewport* boundary
         x1, y1 = x0+dx-1, y0+dy-1
         # Tandy screen 6 sprites are twice as wide as claimed
@@ -957,6 +1082,7 @@ class Drawing(object):
         error.range_check(vx0, vx1, x0, x1)
         error.range_check(vy0, vy1, y0, y1)
         # set size record
+        self._memory.arrays.modified(array_name)
         byte_array[0:4] = self._mode.sprite_size_to_record(dx, dy)
         # read from screen and convert to byte array
         sprite = self.get_rect(x0, y0, x1, y1)
@@ -965,7 +1091,9 @@ class Drawing(object):
         except ValueError as e:
             raise error.BASICError(error.IFC)
         # store a copy in the sprite store
-        self._memory.arrays.set_cache(array_name, (dx, dy, sprite))
+        self._memory.arrays.set_cache(
+            array_name, (dx, dy, sprite), length=4+self._mode.sprite_length(dx, dy)
+        )
 
     ### DRAW statement
 
@@ -974,21 +1102,16 @@ class Drawing(object):
         if self._mode.is_text_mode:
             raise error.BASICError(error.IFC)
         gml = values.next_string(args)
-        self.draw(gml)
+        with self.plotting():
+            self.draw(gml)
         list(args)
 
     def draw(self, gml):
         """Execute a Graphics Macro Language string."""
-        # don't convert to uppercase as VARPTR$ elements are case sensitive
-        gmls = mlparser.MLParser(gml, self._memory, self._values)
         plot, goback = True, False
-        while True:
-            c = gmls.skip_blank_read().upper()
-            if c == b'':
-                break
-            elif c == b';':
-                continue
-            elif c == b'B':
+        for op in self._compile_gml(gml):
+            c = op[0]
+            if c == b'B':
                 # do not draw
                 plot = False
             elif c == b'N':
@@ -996,48 +1119,24 @@ class Drawing(object):
                 goback = True
             elif c == b'X':
                 # execute substring
-                sub = gmls.parse_string()
-                self.draw(sub)
+                self.draw(mlparser.get_string(self._memory, op[1]))
             elif c == b'C':
                 # set foreground colour
-                # allow empty spec (default 0), but only if followed by a semicolon
-                if gmls.skip_blank() == b';':
-                    self.last_attr = 0
-                else:
-                    attr = gmls.parse_number()
-                    # 100000 seems to be GW's limit
-                    error.range_check(-99999, 99999, attr)
-                    self.last_attr = attr
+                # 100000 seems to be GW's limit
+                self.last_attr = self._get_gml_number(op[1], -99999, 99999)
             elif c == b'S':
                 # set scale
-                scale = gmls.parse_number()
-                error.range_check(1, 255, scale)
-                self.draw_scale = scale
+                self.draw_scale = self._get_gml_number(op[1], 1, 255)
             elif c == b'A':
                 # set angle
-                # allow empty spec (default 0), but only if followed by a semicolon
-                if gmls.skip_blank() == b';':
-                    self.draw_angle = 0
-                else:
-                    angle = gmls.parse_number()
-                    error.range_check(0, 3, angle)
-                    self.draw_angle = 90 * angle
+                self.draw_angle = 90 * self._get_gml_number(op[1], 0, 3)
             elif c == b'T':
                 # 'turn angle' - set (don't turn) the angle to any value
-                if gmls.read(1).upper() != b'A':
-                    raise error.BASICError(error.IFC)
-                # allow empty spec (default 0), but only if followed by a semicolon
-                if gmls.skip_blank() == b';':
-                    self.draw_angle = 0
-                else:
-                    angle = gmls.parse_number()
-                    error.range_check(-360, 360, angle)
-                    self.draw_angle = angle
+                self.draw_angle = self._get_gml_number(op[1], -360, 360)
             # one-variable movement commands:
             elif c in (b'U', b'D', b'L', b'R', b'E', b'F', b'G', b'H'):
-                step = gmls.parse_number(default=1)
                 # 100000 seems to be GW's limit
-                error.range_check(-99999, 99999, step)
+                step = self._get_gml_number(op[1], -99999, 99999)
                 x0, y0 = self.last_point
                 x1, y1 = 0, 0
                 if c in (b'U', b'E', b'H'):
@@ -1053,15 +1152,9 @@ class Drawing(object):
                 goback = False
             # two-variable movement command
             elif c == b'M':
-                relative = gmls.skip_blank() in (b'+', b'-')
-                x = gmls.parse_number()
-                error.range_check(-9999, 9999, x)
-                if gmls.skip_blank() != b',':
-                    raise error.BASICError(error.IFC)
-                else:
-                    gmls.read(1)
-                y = gmls.parse_number()
-                error.range_check(-9999, 9999, y)
+                _, relative, xspec, yspec = op
+                x = self._get_gml_number(xspec, -9999, 9999)
+                y = self._get_gml_number(yspec, -9999, 9999)
                 x0, y0 = self.last_point
                 if relative:
                     self.draw_step(x0, y0, x, y, plot, goback)
@@ -1075,16 +1168,88 @@ class Drawing(object):
                 goback = False
             elif c == b'P':
                 # paint - flood fill
-                colour = gmls.parse_number()
-                error.range_check(0, 9999, colour)
-                if gmls.skip_blank_read() != b',':
-                    raise error.BASICError(error.IFC)
-                bound = gmls.parse_number()
-                error.range_check(0, 9999, bound)
+                colour = self._get_gml_number(op[1], 0, 9999)
+                bound = self._get_gml_number(op[2], 0, 9999)
                 x, y = self.get_window_logical(*self.last_point)
                 self.flood_fill((x, y, False), colour, None, bound, None)
-            else:
-                raise error.BASICError(error.IFC)
+            elif c == _GML_CHECK:
+                self._get_gml_number(*op[1:])
+            elif c == _GML_PARTIAL:
+                mlparser.resolve_partial(self._memory, op[1])
+            elif c == _GML_ERROR:
+                raise error.BASICError(op[1])
+
+    def _get_gml_number(self, spec, lower, upper):
+        """Resolve and range-check a number in a compiled DRAW string."""
+        if spec is None:
+            # empty spec followed by semicolon
+            return 0
+        value = mlparser.get_number(self._memory, spec)
+        error.range_check(lower, upper, value)
+        return value
+
+    def _compile_gml(self, gml):
+        """Compile a Graphics Macro Language string to a list of operations."""
+        try:
+            return self._gml_cache[gml]
+        except KeyError:
+            pass
+        # don't convert to uppercase as VARPTR$ elements are case sensitive
+        gmls = mlparser.MLParser(gml, None, None)
+        ops = []
+        # values evaluated by the current command before it fails to parse
+        checks = []
+        try:
+            while True:
+                checks = []
+                c = gmls.skip_blank_read().upper()
+                if c == b'':
+                    break
+                elif c == b';':
+                    continue
+                elif c in (b'B', b'N'):
+                    ops.append((c,))
+                elif c == b'X':
+                    ops.append((c, gmls.compile_string()))
+                elif c in (b'C', b'A', b'T'):
+                    if c == b'T' and gmls.read(1).upper() != b'A':
+                        raise error.BASICError(error.IFC)
+                    # allow empty spec (default 0), but only if followed by a semicolon
+                    if gmls.skip_blank() == b';':
+                        ops.append((c, None))
+                    else:
+                        ops.append((c, gmls.compile_number()))
+                elif c == b'S':
+                    ops.append((c, gmls.compile_number()))
+                elif c in (b'U', b'D', b'L', b'R', b'E', b'F', b'G', b'H'):
+                    ops.append((c, gmls.compile_number(default=1)))
+                elif c == b'M':
+                    relative = gmls.skip_blank() in (b'+', b'-')
+                    x = gmls.compile_number()
+                    checks = [(_GML_CHECK, x, -9999, 9999)]
+                    if gmls.skip_blank() != b',':
+                        raise error.BASICError(error.IFC)
+                    gmls.read(1)
+                    ops.append((c, relative, x, gmls.compile_number()))
+                elif c == b'P':
+                    colour = gmls.compile_number()
+                    checks = [(_GML_CHECK, colour, 0, 9999)]
+                    if gmls.skip_blank_read() != b',':
+                        raise error.BASICError(error.IFC)
+                    ops.append((c, colour, gmls.compile_number()))
+                else:
+                    raise error.BASICError(error.IFC)
+        except error.BASICError as e:
+            # raise the error when execution reaches the offending command
+            # after evaluating what the command had parsed, in the same order
+            ops.extend(checks)
+            if gmls.partial:
+                ops.append((_GML_PARTIAL, gmls.partial))
+            ops.append((_GML_ERROR, e.err))
+        if len(self._gml_cache) >= GML_CACHE_SIZE:
+            self._gml_cache.clear()
+        self._gml_cache[gml] = ops
+        return ops
 
     def draw_step(self, x0, y0, sx, sy, plot, goback):
         """Make a DRAW step, drawing a line and returning if requested."""
@@ -1176,6 +1341,10 @@ class Drawing(object):
         return self._values.new_single().from_value(value)
 
 
+def _pattern_bits(pattern):
+    """Convert a 16-bit line pattern to a list of on/off bits, most significant first."""
+    return [(pattern >> (15-i)) & 1 for i in range(16)]
+
 def tile_to_interval(x0, x1, y, tile):
     """Convert a tile to a list of attributes."""
     dx = x1 - x0 + 1
@@ -518,7 +518,7 @@ class VideoMode(object):
         # area bounds are all inclusive
         return (
             (col0-1) * self.font_width, (row0-1) * self.font_height,
-            (col1-col0+1) * self.font_width-1, (row1-row0+1) * self.font_height-1
+            col1 * self.font_width-1, row1 * self.font_height-1
         )
 
     def get_all_memory(self, screen):
@@ -555,48 +555,47 @@ class TextMode(VideoMode):
         self.is_text_mode = True
         self.num_attr = 32
 
+    def _walk_memory(self, addr, num_bytes):
+        """Yield parts of text memory corresponding to screen rows."""
+        row_size = self.width * 2
+        ofs = 0
+        while ofs < num_bytes:
+            page, offset = divmod(addr + ofs, self.page_size)
+            row_offset = offset % row_size
+            # stop at end of row or end of page
+            length = min(num_bytes - ofs, row_size - row_offset, self.page_size - offset)
+            crow = 1 + offset // row_size
+            if crow <= self.height:
+                yield page, crow, 1 + row_offset // 2, (addr + ofs) % 2, ofs, length
+            ofs += length
+
     def get_memory(self, screen, addr, num_bytes):
         """Retrieve bytes from textmode video memory."""
         addr -= self.video_segment*0x10
         mem_bytes = bytearray(num_bytes)
-        for i in xrange(num_bytes):
-            page = (addr+i) // self.page_size
-            offset = (addr+i) % self.page_size
-            ccol = 1 + (offset % (self.width*2)) // 2
-            crow = 1 + offset // (self.width*2)
-            try:
-                if (addr+i) % 2:
-                    mem_bytes[i] = screen.text_screen.text.get_attr(page, crow, ccol)
-                else:
-                    mem_bytes[i] = screen.text_screen.text.get_char(page, crow, ccol)
-            except IndexError:
-                pass
+        text = screen.text_screen.text
+        for page, crow, ccol, parity, ofs, length in self._walk_memory(addr, num_bytes):
+            if 0 <= page < len(text.pages):
+                num_cells = (parity + length + 1) // 2
+                cells = bytearray(2 * num_cells)
+                cells[0::2], cells[1::2] = text.get_chars_attrs(page, crow, ccol, num_cells)
+                mem_bytes[ofs:ofs+length] = cells[parity:parity+length]
         return mem_bytes
 
     def set_memory(self, screen, addr, mem_bytes):
         """Set bytes in textmode video memory."""
         addr -= self.video_segment*0x10
-        last_row = 0
-        for i in xrange(len(mem_bytes)):
-            page = (addr+i) // self.page_size
-            offset = (addr+i) % self.page_size
-            ccol = 1 + (offset % (self.width*2)) // 2
-            crow = 1 + offset // (self.width*2)
-            try:
-                if (addr+i) % 2:
-                    c = screen.text_screen.text.get_char(page, crow, ccol)
-                    a = mem_bytes[i]
-                else:
-                    c = mem_bytes[i]
-                    a = screen.text_screen.text.get_attr(page, crow, ccol)
-                screen.text_screen.text.put_char_attr(page, crow, ccol, int2byte(c), a)
-                if last_row > 0 and last_row != crow:
-                    screen.text_screen.refresh_range(page, last_row, 1, self.width)
-            except IndexError:
-                pass
-            last_row = crow
-        if last_row >= 1 and last_row <= self.height and page >= 0 and page < self.num_pages:
-            screen.text_screen.refresh_range(page, last_row, 1, self.width)
+        mem_bytes = bytearray(mem_bytes)
+        text = screen.text_screen.text
+        for page, crow, ccol, parity, ofs, length in self._walk_memory(addr, len(mem_bytes)):
+            if 0 <= page < len(text.pages):
+                num_cells = (parity + length + 1) // 2
+                cells = bytearray(2 * num_cells)
+                cells[0::2], cells[1::2] = text.get_chars_attrs(page, crow, ccol, num_cells)
+                cells[parity:parity+length] = mem_bytes[ofs:ofs+length]
+                text.put_chars_attrs(page, crow, ccol, bytes(cells[0::2]), cells[1::2])
+                if page < self.num_pages:
+                    screen.text_screen.refresh_range(page, crow, 1, self.width)
 
 
 class MonoTextMode(TextMode):
@@ -731,6 +730,26 @@ def walk_memory(self, addr, num_bytes, factor=1):
                 yield page, 0, y, ofs, row_size
         offset += row_size
 
+def read_memory(self, screen, addr, num_bytes, factor=1):
+    """Get the attributes of the pixels in a block of graphics memory."""
+    ppb = factor * self.ppb
+    if numpy:
+        attrs = numpy.zeros(num_bytes * ppb, dtype=int)
+    else:
+        attrs = [0] * (num_bytes * ppb)
+    for page, x, y, ofs, length in walk_memory(self, addr, num_bytes, factor):
+        attrs[ofs*ppb:(ofs+length)*ppb] = screen.pixels.pages[page].get_interval(x, y, length*ppb)
+    return attrs
+
+def write_memory(self, screen, addr, attrs, num_bytes, mask=0xff, factor=1):
+    """Set the pixels in a block of graphics memory to a sequence of attributes."""
+    ppb = factor * self.ppb
+    with screen.drawing.plotting():
+        for page, x, y, ofs, length in walk_memory(self, addr, num_bytes, factor):
+            screen.drawing.put_interval(
+                page, x, y, attrs[ofs*ppb:(ofs+length)*ppb], mask
+            )
+
 def sprite_size_to_record_ega(self, dx, dy):
     """Write 4-byte record of sprite size in EGA modes."""
     return struct.pack('<HH', dx, dy)
@@ -739,44 +758,119 @@ def record_to_sprite_size_ega(self, byte_array):
     """Read 4-byte record of sprite size in EGA modes."""
     return struct.unpack('<HH', byte_array[0:4])
 
-def sprite_to_array_ega(self, attrs, dx, dy, byte_array, offs):
-    """Build the sprite byte array in EGA modes."""
-    # for EGA modes, sprites have 8 pixels per byte
-    # with colour planes in consecutive rows
-    # each new row is aligned on a new byte
-    #
-    # this is much faster for wide selections
-    # but for narrow selections storing in an array and indexing take longer
-    # than just getting each pixel separately
-    row_bytes = (dx+7) // 8
-    length = dy * self.bitsperpixel * row_bytes
-    if offs+length > len(byte_array):
-        raise ValueError('Sprite exceeds array byte size')
-    byte_array[offs:offs+length] = b'\0'*length
-    for row in attrs:
-        for plane in range(self.bitsperpixel):
-            byte_array[offs:offs+row_bytes] = interval_to_bytes(row, 8, plane)
-            offs += row_bytes
+def sprite_length_ega(self, dx, dy):
+    """Number of bytes in a sprite in EGA modes, excluding the size record."""
+    return ((dx+7) // 8) * self.bitsperpixel * dy
+
+def sprite_length_cga(self, dx, dy):
+    """Number of bytes in a sprite in CGA modes, excluding the size record."""
+    return ((dx * self.bitsperpixel + 7) // 8) * dy
+
+# for EGA modes, sprites have 8 pixels per byte
+# with colour planes in consecutive rows
+# each new row is aligned on a new byte
+# for CGA modes, sprites have the bits of each pixel packed consecutively
 
-# elementwise OR, in-place if possible
 if numpy:
-    or_i = numpy.ndarray.__ior__
+    def _unpack_rows(byte_array, offset, num_rows, row_bytes):
+        """Unpack a block of byte rows into a [row][bit] array; missing bytes are zero."""
+        length = num_rows * row_bytes
+        packed = numpy.zeros(length, dtype=numpy.uint8)
+        data = numpy.frombuffer(bytearray(byte_array[offset:offset+length]), dtype=numpy.uint8)
+        packed[:len(data)] = data
+        return numpy.unpackbits(packed.reshape(num_rows, row_bytes), axis=1)
+
+    def _pack_rows(bits, byte_array, offs):
+        """Pack a [row][bit] array into consecutive byte rows."""
+        packed = numpy.packbits(bits, axis=-1).tobytes()
+        if offs+len(packed) > len(byte_array):
+            raise ValueError('Sprite exceeds array byte size')
+        byte_array[offs:offs+len(packed)] = packed
+
+    def sprite_to_array_ega(self, attrs, dx, dy, byte_array, offs):
+        """Build the sprite byte array in EGA modes."""
+        bpp = self.bitsperpixel
+        row_bytes = (dx+7) // 8
+        padded = numpy.zeros((dy, row_bytes*8), dtype=numpy.uint8)
+        padded[:, :dx] = numpy.asarray(attrs)
+        planes = numpy.arange(bpp, dtype=numpy.uint8).reshape(1, bpp, 1)
+        _pack_rows((padded[:, numpy.newaxis, :] >> planes) & 1, byte_array, offs)
+
+    def array_to_sprite_ega(self, byte_array, offset, dx, dy):
+        """Build sprite from byte_array in EGA modes."""
+        bpp = self.bitsperpixel
+        row_bytes = (dx+7) // 8
+        bits = _unpack_rows(byte_array, offset, dy*bpp, row_bytes).reshape(dy, bpp, row_bytes*8)
+        planes = numpy.arange(bpp, dtype=numpy.uint8).reshape(1, bpp, 1)
+        return (bits << planes).sum(axis=1, dtype=numpy.int8)[:, :dx]
+
+    def sprite_to_array_cga(self, attrs, dx, dy, byte_array, offs):
+        """Build the sprite byte array in CGA modes."""
+        bpp = self.bitsperpixel
+        row_bytes = (dx * bpp + 7) // 8
+        padded = numpy.zeros((dy, row_bytes*8 // bpp), dtype=numpy.uint8)
+        padded[:, :dx] = numpy.asarray(attrs)
+        shifts = numpy.arange(bpp-1, -1, -1, dtype=numpy.uint8)
+        bits = (padded[:, :, numpy.newaxis] >> shifts) & 1
+        _pack_rows(bits.reshape(dy, row_bytes*8), byte_array, offs)
+
+    def array_to_sprite_cga(self, byte_array, offset, dx, dy):
+        """Build sprite from byte_array in CGA modes."""
+        bpp = self.bitsperpixel
+        row_bytes = (dx * bpp + 7) // 8
+        bits = _unpack_rows(byte_array, offset, dy, row_bytes).reshape(dy, row_bytes*8 // bpp, bpp)
+        shifts = numpy.arange(bpp-1, -1, -1, dtype=numpy.uint8)
+        return (bits << shifts).sum(axis=2, dtype=numpy.int8)[:, :dx]
+
 else:
-    def or_i(list0, list1):
-        return [ x | y for x, y in zip(list0, list1) ]
-
-def array_to_sprite_ega(self, byte_array, offset, dx, dy):
-    """Build sprite from byte_array in EGA modes."""
-    row_bytes = (dx+7) // 8
-    attrs = []
-    for y in range(dy):
-        row = bytes_to_interval(byte_array[offset:offset+row_bytes], 8, 1)
-        offset += row_bytes
-        for plane in range(1, self.bitsperpixel):
-            row = or_i(row, bytes_to_interval(byte_array[offset:offset+row_bytes], 8, 1 << plane))
+    def sprite_to_array_ega(self, attrs, dx, dy, byte_array, offs):
+        """Build the sprite byte array in EGA modes."""
+        row_bytes = (dx+7) // 8
+        length = dy * self.bitsperpixel * row_bytes
+        if offs+length > len(byte_array):
+            raise ValueError('Sprite exceeds array byte size')
+        byte_array[offs:offs+length] = b'\0'*length
+        for row in attrs:
+            for plane in range(self.bitsperpixel):
+                byte_array[offs:offs+row_bytes] = interval_to_bytes(row, 8, plane)
+                offs += row_bytes
+
+    def array_to_sprite_ega(self, byte_array, offset, dx, dy):
+        """Build sprite from byte_array in EGA modes."""
+        row_bytes = (dx+7) // 8
+        attrs = []
+        for y in range(dy):
+            row = bytes_to_interval(byte_array[offset:offset+row_bytes], 8, 1)
             offset += row_bytes
-        attrs.append(row[:dx])
-    return attrs
+            for plane in range(1, self.bitsperpixel):
+                plane_row = bytes_to_interval(byte_array[offset:offset+row_bytes], 8, 1 << plane)
+                row = [x | y for x, y in zip(row, plane_row)]
+                offset += row_bytes
+            attrs.append(row[:dx])
+        return attrs
+
+    def sprite_to_array_cga(self, attrs, dx, dy, byte_array, offs):
+        """Build the sprite byte array in CGA modes."""
+        row_bytes = (dx * self.bitsperpixel + 7) // 8
+        length = row_bytes*dy
+        if offs+length > len(byte_array):
+            # NOTE: if we use memoryviews instead of bytearrays, we won't need
+            # this check as the assignment will fail with ValueError anyway
+            raise ValueError('Sprite exceeds array byte size')
+        byte_array[offs:offs+length] = b'\0'*length
+        for row in attrs:
+            byte_array[offs:offs+row_bytes] = interval_to_bytes(row, 8//self.bitsperpixel, 0)
+            offs += row_bytes
+
+    def array_to_sprite_cga(self, byte_array, offset, dx, dy):
+        """Build sprite from byte_array in CGA modes."""
+        row_bytes = (dx * self.bitsperpixel + 7) // 8
+        attrs = []
+        for y in range(dy):
+            row = bytes_to_interval(byte_array[offset:offset+row_bytes], 8//self.bitsperpixel, 1)
+            offset += row_bytes
+            attrs.append(row[:dx])
+        return attrs
 
 def build_tile_cga(self, pattern):
     """Build a flood-fill tile for CGA screens."""
@@ -878,19 +972,12 @@ class CGAMode(GraphicsMode):
 
     def set_memory(self, screen, addr, byte_array):
         """Set bytes in CGA memory."""
-        for page, x, y, ofs, length in walk_memory(self, addr, len(byte_array)):
-            screen.drawing.put_interval(
-                page, x, y, bytes_to_interval(byte_array[ofs:ofs+length], self.ppb)
-            )
+        attrs = bytes_to_interval(byte_array, self.ppb)
+        write_memory(self, screen, addr, attrs, len(byte_array))
 
     def get_memory(self, screen, addr, num_bytes):
         """Retrieve bytes from CGA memory."""
-        byte_array = bytearray(num_bytes)
-        for page, x, y, ofs, length in walk_memory(self, addr, num_bytes):
-            byte_array[ofs:ofs+length] = interval_to_bytes(
-                screen.pixels.pages[page].get_interval(x, y, length*self.ppb), self.ppb
-            )
-        return byte_array
+        return interval_to_bytes(read_memory(self, screen, addr, num_bytes), self.ppb)
 
     def sprite_size_to_record(self, dx, dy):
         """Write 4-byte record of sprite size."""
@@ -898,31 +985,13 @@ class CGAMode(GraphicsMode):
 
     def record_to_sprite_size(self, byte_array):
         """Read 4-byte record of sprite size."""
-        return struct.unpack('<HH', byte_array[0:4])
+        # the record holds the width in bits
+        dx, dy = struct.unpack('<HH', byte_array[0:4])
+        return dx // self.bitsperpixel, dy
 
-    def sprite_to_array(self, attrs, dx, dy, byte_array, offs):
-        """Build the sprite byte array."""
-        row_bytes = (dx * self.bitsperpixel + 7) // 8
-        length = row_bytes*dy
-        if offs+length > len(byte_array):
-            # NOTE: if we use memoryviews instead of bytearrays, we won't need
-            # this check as the assignment will fail with ValueError anyway
-            raise ValueError('Sprite exceeds array byte size')
-        byte_array[offs:offs+length] = b'\0'*length
-        for row in attrs:
-            byte_array[offs:offs+row_bytes] = interval_to_bytes(row, 8//self.bitsperpixel, 0)
-            offs += row_bytes
-
-    def array_to_sprite(self, byte_array, offset, dx, dy):
-        """Build sprite from byte_array."""
-        row_bytes = (dx * self.bitsperpixel + 7) // 8
-        # illegal fn call if outside screen boundary
-        attrs = []
-        for y in range(dy):
-            row = bytes_to_interval(byte_array[offset:offset+row_bytes], 8//self.bitsperpixel, 1)
-            offset += row_bytes
-            attrs.append(row[:dx])
-        return attrs
+    sprite_to_array = sprite_to_array_cga
+    array_to_sprite = array_to_sprite_cga
+    sprite_length = sprite_length_cga
 
     build_tile = build_tile_cga
 
@@ -982,12 +1051,7 @@ class EGAMode(GraphicsMode):
         byte_array = bytearray(num_bytes)
         if plane not in self.planes_used:
             return byte_array
-        for page, x, y, ofs, length in walk_memory(self, addr, num_bytes):
-            byte_array[ofs:ofs+length] = interval_to_bytes(
-                screen.pixels.pages[page].get_interval(x, y, length*self.ppb),
-                self.ppb, plane
-            )
-        return byte_array
+        return interval_to_bytes(read_memory(self, screen, addr, num_bytes), self.ppb, plane)
 
     def set_memory(self, screen, addr, byte_array):
         """Set bytes in EGA video memory."""
@@ -999,13 +1063,12 @@ class EGAMode(GraphicsMode):
         # return immediately for unused colour planes
         if mask == 0:
             return
-        for page, x, y, ofs, length in walk_memory(self, addr, len(byte_array)):
-            screen.drawing.put_interval(page, x, y,
-                bytes_to_interval(byte_array[ofs:ofs+length], self.ppb, mask), mask
-            )
+        attrs = bytes_to_interval(byte_array, self.ppb, mask)
+        write_memory(self, screen, addr, attrs, len(byte_array), mask)
 
     sprite_to_array = sprite_to_array_ega
     array_to_sprite = array_to_sprite_ega
+    sprite_length = sprite_length_ega
 
     sprite_size_to_record = sprite_size_to_record_ega
     record_to_sprite_size = record_to_sprite_size_ega
@@ -1061,14 +1124,11 @@ class Tandy6Mode(GraphicsMode):
         """Retrieve bytes from Tandy 640x200x4 """
         # 8 pixels per 2 bytes
         # low attribute bits stored in even bytes, high bits in odd bytes.
-        half_len = (num_bytes+1) // 2
-        hbytes = bytearray(half_len), bytearray(half_len)
-        for parity in (0, 1):
-            for page, x, y, ofs, length in walk_memory(self, addr, num_bytes, 2):
-                hbytes[parity][ofs:ofs+length] = interval_to_bytes(
-                    screen.pixels.pages[page].get_interval(x, y, length*self.ppb*2),
-                    self.ppb*2, parity ^ (addr%2)
-                )
+        attrs = read_memory(self, screen, addr, num_bytes, 2)
+        hbytes = [
+            interval_to_bytes(attrs, self.ppb*2, parity ^ (addr%2))
+            for parity in (0, 1)
+        ]
         # resulting array may be too long by one byte, so cut to size
         return [item for pair in zip(*hbytes) for item in pair] [:num_bytes]
 
@@ -1077,17 +1137,15 @@ class Tandy6Mode(GraphicsMode):
         hbytes = byte_array[0::2], byte_array[1::2]
         # Tandy-6 encodes 8 pixels per byte, alternating colour planes.
         # I.e. even addresses are 'colour plane 0', odd ones are 'plane 1'
-        for parity in (0, 1):
-            mask = 2 ** (parity^(addr%2))
-            for page, x, y, ofs, length in walk_memory(self, addr, len(byte_array), 2):
-                screen.drawing.put_interval(
-                    page, x, y,
-                    bytes_to_interval(hbytes[parity][ofs:ofs+length], 2*self.ppb, mask),
-                    mask
-                )
+        with screen.drawing.plotting():
+            for parity in (0, 1):
+                mask = 2 ** (parity^(addr%2))
+                attrs = bytes_to_interval(hbytes[parity], 2*self.ppb, mask)
+                write_memory(self, screen, addr, attrs, len(byte_array), mask, 2)
 
     sprite_to_array = sprite_to_array_ega
     array_to_sprite = array_to_sprite_ega
+    sprite_length = sprite_length_ega
 
     sprite_size_to_record = sprite_size_to_record_ega
     record_to_sprite_size = record_to_sprite_size_ega
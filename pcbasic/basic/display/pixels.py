@@ -71,6 +71,14 @@ class PixelPage(object):
         except IndexError:
             return 0
 
+    def put_pixels(self, xs, ys, attr):
+        """Put a set of pixels, given as sequences of coordinates, in the buffer."""
+        if numpy:
+            self.buffer[ys, xs] = attr
+        else:
+            for x, y in zip(xs, ys):
+                self.buffer[y][x] = attr
+
     def fill_interval(self, x0, x1, y, attr):
         """Write a list of attributes to a scanline interval."""
         try:
@@ -81,12 +89,15 @@ class PixelPage(object):
     if numpy:
         def init_operations(self):
             """Initialise operations closures."""
+            # apply in place, without temporary arrays
             self.operations = {
-                tk.PSET: lambda x, y: x.__setitem__(slice(len(x)), y),
-                tk.PRESET: lambda x, y: x.__setitem__(slice(len(x)), y.__xor__((1<<self.bitsperpixel) - 1)),
-                tk.AND: lambda x, y: x.__iand__(y),
-                tk.OR: lambda x, y: x.__ior__(y),
-                tk.XOR: lambda x, y: x.__ixor__(y),
+                tk.PSET: lambda x, y: numpy.copyto(x, y, casting='unsafe'),
+                tk.PRESET: lambda x, y: numpy.bitwise_xor(
+                    y, (1<<self.bitsperpixel) - 1, out=x, casting='unsafe'
+                ),
+                tk.AND: lambda x, y: numpy.bitwise_and(x, y, out=x, casting='unsafe'),
+                tk.OR: lambda x, y: numpy.bitwise_or(x, y, out=x, casting='unsafe'),
+                tk.XOR: lambda x, y: numpy.bitwise_xor(x, y, out=x, casting='unsafe'),
             }
 
         def put_interval(self, x, y, colours, mask=0xff):
@@ -161,6 +172,28 @@ class PixelPage(object):
                     arr = arr[found[0][-1]+1:]
             return list(arr.flatten())
 
+        def get_runs(self, x0, x1, y, c, pattern, exclude=None):
+            """
+            Find the runs in scanline interval [x0, x1] delimited by attribute c.
+            Return list of (start, stop, match) where match is True if the run equals
+            the 8-pixel pattern tiled from x=0 and differs from exclude at every pixel.
+            """
+            row = self.buffer[y, x0:x1+1]
+            # padded with delimiters on both sides, so that runs start and stop in pairs
+            delimited = numpy.ones(len(row)+2, dtype=numpy.int8)
+            delimited[1:-1] = (row == c)
+            edges = numpy.flatnonzero(numpy.diff(delimited))
+            starts, stops = edges[::2], edges[1::2]
+            tile_x = numpy.arange(x0, x1+1) % 8
+            differs = row != numpy.asarray(pattern)[tile_x]
+            if exclude is not None:
+                differs |= row == numpy.asarray(exclude)[tile_x]
+            # count differing pixels in each run
+            count = numpy.zeros(len(row)+1, dtype=int)
+            numpy.cumsum(differs, out=count[1:])
+            match = count[stops] == count[starts]
+            return zip((starts + x0).tolist(), (stops + x0 - 1).tolist(), match.tolist())
+
     else:
         def init_operations(self):
             """Initialise operations closures."""
@@ -238,3 +271,24 @@ class PixelPage(object):
             except ValueError:
                 index = x1-x0
             return self.buffer[y][x0:x0+index]
+
+        def get_runs(self, x0, x1, y, c, pattern, exclude=None):
+            """
+            Find the runs in scanline interval [x0, x1] delimited by attribute c.
+            Return list of (start, stop, match) where match is True if the run equals
+            the 8-pixel pattern tiled from x=0 and differs from exclude at every pixel.
+            """
+            runs = []
+            start = x0
+            for x in range(x0, x1+2):
+                if x > x1 or self.buffer[y][x] == c:
+                    if x > start:
+                        run = self.buffer[y][start:x]
+                        match = all(
+                            attr == pattern[(start+i) % 8]
+                            and (exclude is None or attr != exclude[(start+i) % 8])
+                            for i, attr in enumerate(run)
+                        )
+                        runs.append((start, x-1, match))
+                    start = x + 1
+            return runs
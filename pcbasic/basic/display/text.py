@@ -15,51 +15,118 @@ class TextRow(object):
     def __init__(self, attr, width, conv, dbcs_enabled):
         """Set up screen row empty and unwrapped."""
         self.width = width
+        self._dbcs_enabled = dbcs_enabled
+        self._conv = conv
         self.clear(attr)
         # line continues on next row (either LF or word wrap happened)
         self.wrap = False
-        self._dbcs_enabled = dbcs_enabled
-        self._conv = conv
 
     def clear(self, attr):
         """Clear the screen row buffer. Leave wrap untouched."""
         # screen buffer, initialised to spaces
-        self.buf = [(b' ', attr)] * self.width
-        # character is part of double width char; 0 = no; 1 = lead, 2 = trail
-        self.double = [0] * self.width
+        self.chars = bytearray(b' ') * self.width
+        self.attrs = bytearray((attr,)) * self.width
+        # double-width character flags, recalculated when needed
+        self._double = None
+        # DBCS converter state before each column, to re-mark from a changed column
+        self._states = None
         # last non-whitespace character
         self.end = 0
 
     def clear_from(self, scol, attr):
         """Clear characters from given position till end of row."""
-        self.buf = self.buf[:scol-1] + [(b' ', attr)] * (self.width - scol + 1)
-        self.double = self.double[:scol-1] + [0] * (self.width - scol + 1)
+        self.clear_range(scol, self.width, attr)
         self.end = min(self.end, scol-1)
 
+    def clear_range(self, col0, col1, attr):
+        """Clear characters in a range of columns."""
+        self.chars[col0-1:col1] = bytearray(b' ') * (col1 - col0 + 1)
+        self.attrs[col0-1:col1] = bytearray((attr,)) * (col1 - col0 + 1)
+        self._double = None
+
+    @property
+    def double(self):
+        """Character is part of double width char; 0 = no; 1 = lead, 2 = trail."""
+        if self._double is None:
+            self._double = bytearray(self.width)
+            if self._dbcs_enabled:
+                self._states = [None] * self.width
+                self._conv.set_state()
+                self._mark(0, 0)
+        return self._double
+
+    def _mark(self, start, pos):
+        """
+        Mark double-width characters from a 0-based column, with flags set up to pos.
+        Stop where the converter state is the same as last time; return the column reached.
+        """
+        for col in xrange(start, self.width):
+            state = self._conv.get_state()
+            if col > start and state == self._states[col]:
+                return col
+            self._states[col] = state
+            pos = self._set_flags(pos, self._conv.mark(chr(self.chars[col])))
+        self._set_flags(pos, self._conv.mark(b'', flush=True))
+        return self.width
+
+    def _set_flags(self, pos, sequences):
+        """Set double-width flags for converted sequences from a 0-based column."""
+        for seq in sequences:
+            if len(seq) == 1:
+                self._double[pos] = 0
+            else:
+                self._double[pos:pos+2] = b'\x01\x02'
+            pos += len(seq)
+        return pos
+
     def put_char_attr(self, col, c, attr):
         """Put a byte to the screen, reinterpreting SBCS and DBCS as necessary."""
-        # update the screen buffer
-        self.buf[col-1] = (c, attr)
-        self.double[col-1] = 0
-        # for sbcs codepages we're done now
+        # for sbcs codepages we only need to update the screen buffer
         if not self._dbcs_enabled:
+            self.chars[col-1] = ord(c)
+            self.attrs[col-1] = attr
             return col, col
-        # mark out replaced char and changed following dbcs characters to be redrawn
-        sequences = self._conv.mark(b''.join(entry[0] for entry in self.buf), flush=True)
-        flags = ((0,) if len(seq) == 1 else (1, 2) for seq in sequences)
-        old_double = self.double
-        self.double = [entry for flag in flags for entry in flag]
+        old_double = bytearray(self.double)
+        self.chars[col-1] = ord(c)
+        self.attrs[col-1] = attr
+        # re-mark from the state before this column; bytes still held by the converter
+        # there were not yet marked, so their flags may change too
+        state = self._states[col-1]
+        pos = col - 1 - len(state[0])
+        self._conv.set_state(state)
+        end = self._mark(col-1, pos)
         # find the first and last changed columns, to be able to redraw
-        diff = [old != new for old, new in zip(old_double, self.double)]
+        diff = [old != new for old, new in zip(old_double[pos:end], self._double[pos:end])]
         if True in diff:
-            start, stop = diff.index(True) + 1, len(diff) - diff[::-1].index(True)
+            start, stop = pos + diff.index(True) + 1, end - diff[::-1].index(True)
         else:
             start, stop = col, col
         # if the tail byte has changed, the lead byte needs to be redrawn as well
-        if self.double[start-1] == 2:
+        if self._double[start-1] == 2:
             start -= 1
         return min(col, start), max(col, stop)
 
+    def put_chars_attrs(self, col, chars, attrs):
+        """Put a sequence of bytes and attributes to the screen from a given column."""
+        self.chars[col-1:col-1+len(chars)] = chars
+        self.attrs[col-1:col-1+len(chars)] = attrs
+        self._double = None
+
+    def insert_char_attr(self, col, c, attr):
+        """Insert a byte, pushing the last one off the row and returning it."""
+        self.chars.insert(col-1, ord(c))
+        self.attrs.insert(col-1, attr)
+        self._double = None
+        return chr(self.chars.pop()), self.attrs.pop()
+
+    def copy_from(self, src):
+        """Copy the contents of another row."""
+        self.chars[:] = src.chars
+        self.attrs[:] = src.attrs
+        self._double = None
+        self.end = src.end
+        self.wrap = src.wrap
+
 
 class TextPage(object):
     """Buffer for a screen page."""
@@ -93,13 +160,13 @@ class TextBuffer(object):
         for num, page in enumerate(self.pages):
             row_strs += [horiz_bar]
             for i, row in enumerate(page.row):
-                s = [ c[0] for c in row.buf ]
+                s = bytes(row.chars)
                 outstr = '{0:2}'.format(i)
                 if lastwrap:
                     outstr += ('\\')
                 else:
                     outstr += ('|')
-                outstr += (''.join(s))
+                outstr += s
                 if row.wrap:
                     row_strs.append(outstr + '\\ {0:2}'.format(row.end))
                 else:
@@ -111,16 +178,12 @@ class TextBuffer(object):
     def copy_page(self, src, dst):
         """Copy source to destination page."""
         for x in range(self.height):
-            dstrow = self.pages[dst].row[x]
-            srcrow = self.pages[src].row[x]
-            dstrow.buf[:] = srcrow.buf[:]
-            dstrow.end = srcrow.end
-            dstrow.wrap = srcrow.wrap
+            self.pages[dst].row[x].copy_from(self.pages[src].row[x])
 
     def clear_area(self, pagenum, row0, col0, row1, col1, attr):
         """Clear a rectangular area of the screen."""
         for r in range(row0-1, row1):
-            self.pages[pagenum].row[r].buf[col0-1:col1] = [(b' ', attr)] * (col1 - col0 + 1)
+            self.pages[pagenum].row[r].clear_range(col0, col1, attr)
 
     def put_char_attr(self, pagenum, row, col, c, attr):
         """Put a byte to the screen, reinterpreting SBCS and DBCS as necessary."""
@@ -142,11 +205,20 @@ class TextBuffer(object):
 
     def get_char(self, pagenum, row, col):
         """Retrieve a byte from the screen (SBCS or DBCS half-char)."""
-        return ord(self.pages[pagenum].row[row-1].buf[col-1][0])
+        return self.pages[pagenum].row[row-1].chars[col-1]
 
     def get_attr(self, pagenum, row, col):
         """Retrieve attribute from the screen."""
-        return self.pages[pagenum].row[row-1].buf[col-1][1]
+        return self.pages[pagenum].row[row-1].attrs[col-1]
+
+    def get_chars_attrs(self, pagenum, row, col, length):
+        """Retrieve a sequence of bytes and attributes from the screen."""
+        therow = self.pages[pagenum].row[row-1]
+        return bytes(therow.chars[col-1:col-1+length]), therow.attrs[col-1:col-1+length]
+
+    def put_chars_attrs(self, pagenum, row, col, chars, attrs):
+        """Put a sequence of bytes and attributes to the screen."""
+        self.pages[pagenum].row[row-1].put_chars_attrs(col, chars, attrs)
 
     def get_charwidth(self, pagenum, row, col):
         """Retrieve DBCS character width in bytes."""
@@ -161,12 +233,9 @@ class TextBuffer(object):
         """Retrieve SBCS or DBCS character."""
         therow = self.pages[pagenum].row[row-1]
         if therow.double[col-1] == 1:
-            ca = therow.buf[col-1]
-            da = therow.buf[col]
-            char, attr = ca[0] + da[0], da[1]
+            char, attr = bytes(therow.chars[col-1:col+1]), therow.attrs[col]
         elif therow.double[col-1] == 0:
-            ca = therow.buf[col-1]
-            char, attr = ca[0], ca[1]
+            char, attr = chr(therow.chars[col-1]), therow.attrs[col-1]
         else:
             char, attr = b'\0', 0
             logging.debug('DBCS buffer corrupted at %d, %d (%d)', row, col, therow.double[col-1])
@@ -175,7 +244,7 @@ class TextBuffer(object):
     def get_text_raw(self, pagenum):
         """Retrieve all raw text on a page."""
         return tuple(
-            b''.join(c for c, _ in self.pages[pagenum].row[row_index].buf)
+            bytes(self.pages[pagenum].row[row_index].chars)
             for row_index in range(self.pages[pagenum].height)
         )
 
@@ -192,17 +261,17 @@ class TextBuffer(object):
             stop_col += 1
         r, c = start_row, start_col
         full = []
-        clip = []
+        clip = bytearray()
         while r < stop_row or (r == stop_row and c < stop_col):
-            clip.append(self.pages[pagenum].row[r-1].buf[c-1][0])
+            clip.append(self.pages[pagenum].row[r-1].chars[c-1])
             c += 1
             if c > self.pages[pagenum].row[r-1].end:
                 if not self.pages[pagenum].row[r-1].wrap:
-                    full.append(b''.join(clip))
-                    clip = []
+                    full.append(bytes(clip))
+                    clip = bytearray()
                 r += 1
                 c = 1
-        full.append(b''.join(clip))
+        full.append(bytes(clip))
         return full
 
     def find_start_of_line(self, pagenum, srow):
@@ -230,7 +299,7 @@ class TextBuffer(object):
         # add all rows of the logical line
         for row in range(srow, self.height+1):
             therow = self.pages[pagenum].row[row-1]
-            line += bytearray(pair[0] for pair in therow.buf[scol-1:therow.end])
+            line += therow.chars[scol-1:therow.end]
             # continue so long as the line wraps
             if not therow.wrap:
                 break
@@ -257,11 +326,9 @@ class TextBuffer(object):
                 therow = self.pages[pagenum].row[row-1]
                 # exclude prompt, if any; only go from furthest_left to furthest_right
                 if row == prompt_row:
-                    rowpairs = therow.buf[:therow.end][left-1:right-1]
+                    line += therow.chars[:therow.end][left-1:right-1]
                 else:
-                    rowpairs = therow.buf[:therow.end]
-                # get characters from char/attr pairs and convert to bytearray
-                line += bytearray(pair[0] for pair in rowpairs)
+                    line += therow.chars[:therow.end]
                 if not therow.wrap:
                     break
                 # wrap before end of line means LF
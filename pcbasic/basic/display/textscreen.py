@@ -8,6 +8,7 @@ This file is released under the GNU GPL version 3 or later.
 
 import logging
 
+from ...compat import monotonic
 from ..base import signals
 from ..base import error
 from ..base import tokens as tk
@@ -20,11 +21,17 @@ from .textbase import BottomBar, Cursor, ScrollArea
 # mark bytes conversion explicitly
 int2byte = chr
 
+# maximum time to hold back scrolls before updating the screen, in seconds
+SCROLL_FLUSH_DELAY = 0.05
+
 
 class TextScreen(object):
     """Text screen."""
 
-    def __init__(self, queues, values, mode, capabilities, fonts, codepage, io_streams, sound):
+    def __init__(
+            self, queues, values, mode, capabilities, fonts, codepage, io_streams, sound,
+            coalesce_scroll=True
+        ):
         """Initialise text-related members."""
         self.queues = queues
         self._values = values
@@ -52,9 +59,17 @@ class TextScreen(object):
         }
         # function key macros
         self.bottom_bar = BottomBar()
+        # scrolls held back: (pagenum, from_line, bottom, back), number of lines, deadline
+        self._coalesce_scroll = coalesce_scroll
+        self._pending_scroll = None
+        self._pending_lines = 0
+        self._scroll_due = 0
+        # rows in the scroll region written while scrolls are held back, with column range
+        self._deferred_rows = {}
 
     def init_mode(self, mode, pixels, attr, vpagenum, apagenum):
         """Reset the text screen for new video mode."""
+        self.flush_scroll()
         self.mode = mode
         self.attr = attr
         self.apagenum = apagenum
@@ -78,6 +93,7 @@ class TextScreen(object):
 
     def set_page(self, vpagenum, apagenum):
         """Set visible and active page."""
+        self.flush_scroll()
         self.vpagenum = vpagenum
         self.apagenum = apagenum
 
@@ -96,6 +112,7 @@ class TextScreen(object):
 
     def rebuild(self):
         """Completely resubmit the text screen to the interface."""
+        self.flush_scroll()
         # send the glyph dict to interface if necessary
         self._glyphs.submit()
         # fix the cursor
@@ -366,6 +383,15 @@ class TextScreen(object):
 
     def refresh_range(self, pagenum, row, start, stop, text_only=False):
         """Redraw a section of a screen row, assuming DBCS buffer has been set."""
+        if self._pending_scroll:
+            scroll_page, from_line, bottom, _ = self._pending_scroll
+            if pagenum == scroll_page and from_line <= row <= bottom:
+                # draw when the scroll is applied, unless the row has scrolled out by then
+                if row in self._deferred_rows:
+                    old_start, old_stop = self._deferred_rows[row]
+                    start, stop = min(start, old_start), max(stop, old_stop)
+                self._deferred_rows[row] = start, stop
+                return
         therow = self.text.pages[pagenum].row[row-1]
         col = start
         while col <= stop:
@@ -434,6 +460,13 @@ class TextScreen(object):
 
     def clear_rows(self, start, stop):
         """Clear text and graphics on given (inclusive) text row range."""
+        if self._pending_scroll:
+            scroll_page, from_line, bottom, _ = self._pending_scroll
+            if scroll_page == self.apagenum and start <= from_line and bottom <= stop:
+                # the whole scroll region gets cleared; no need to show the scroll
+                self._pending_scroll, self._pending_lines, self._deferred_rows = None, 0, {}
+            else:
+                self.flush_scroll()
         for r in self.text.pages[self.apagenum].row[start-1:stop]:
             r.clear(self.attr)
             # can't we just do this in row.clear?
@@ -471,6 +504,7 @@ class TextScreen(object):
 
     def _set_scroll_area(self, start, stop):
         """Set the scroll area."""
+        self.flush_scroll()
         self.scroll_area.set(start, stop)
         #set_pos(start, 1)
         self.overflow = False
@@ -484,22 +518,68 @@ class TextScreen(object):
         if from_line is None:
             from_line = self.scroll_area.top
         _, back, _, _ = self.mode.split_attr(self.attr)
-        self.queues.video.put(signals.Event(
-            signals.VIDEO_SCROLL_UP, (from_line, self.scroll_area.bottom, back)
-        ))
+        # hold back the interface and pixel buffer update, to coalesce consecutive scrolls
+        region = self.apagenum, from_line, self.scroll_area.bottom, back
+        if region != self._pending_scroll:
+            # deferred rows must be drawn before the text buffer moves on
+            self.flush_scroll()
+            self._pending_scroll = region
+            self._scroll_due = monotonic() + SCROLL_FLUSH_DELAY
+        self._pending_lines += 1
         if self.current_row > from_line:
             self.current_row -= 1
         # sync buffers with the new screen reality:
         self.text.scroll_up(self.apagenum, from_line, self.scroll_area.bottom, self.attr)
-        if not self.mode.is_text_mode:
-            sx0, sy0, sx1, sy1 = self.mode.text_to_pixel_area(from_line+1, 1,
-                self.scroll_area.bottom, self.mode.width)
-            tx0, ty0, _, _ = self.mode.text_to_pixel_area(from_line, 1,
-                self.scroll_area.bottom-1, self.mode.width)
-            self.pixels.pages[self.apagenum].move_rect(sx0, sy0, sx1, sy1, tx0, ty0)
+        # deferred rows move up with the text; the top row is gone before it was ever shown
+        self._deferred_rows = {
+            row-1: span for row, span in self._deferred_rows.iteritems() if row > from_line
+        }
+        if not self._coalesce_scroll:
+            self.flush_scroll()
+
+    def check_output(self, idle):
+        """Apply held-back scrolls if we're waiting or they have been held long enough."""
+        if self._pending_scroll and (idle or monotonic() >= self._scroll_due):
+            self.flush_scroll()
+
+    def flush_scroll(self):
+        """Apply held-back scrolls to pixel buffer and interface, then draw deferred rows."""
+        if not self._pending_scroll:
+            return
+        pagenum, from_line, bottom, back = self._pending_scroll
+        num_lines, deferred_rows = self._pending_lines, self._deferred_rows
+        self._pending_scroll, self._pending_lines, self._deferred_rows = None, 0, {}
+        if num_lines > bottom - from_line:
+            # everything in the scroll region has scrolled out
+            self.queues.video.put(signals.Event(
+                signals.VIDEO_CLEAR_ROWS, (back, from_line, bottom)
+            ))
+            if not self.mode.is_text_mode:
+                x0, y0, x1, y1 = self.mode.text_to_pixel_area(from_line, 1, bottom, self.mode.width)
+                self.pixels.pages[pagenum].fill_rect(x0, y0, x1, y1, 0)
+        else:
+            if num_lines == 1:
+                self.queues.video.put(signals.Event(
+                    signals.VIDEO_SCROLL_UP, (from_line, bottom, back)
+                ))
+            else:
+                self.queues.video.put(signals.Event(
+                    signals.VIDEO_SCROLL_UP_LINES, (from_line, bottom, back, num_lines)
+                ))
+            if not self.mode.is_text_mode:
+                sx0, sy0, sx1, sy1 = self.mode.text_to_pixel_area(
+                    from_line+num_lines, 1, bottom, self.mode.width
+                )
+                tx0, ty0, _, _ = self.mode.text_to_pixel_area(
+                    from_line, 1, bottom-num_lines, self.mode.width
+                )
+                self.pixels.pages[pagenum].move_rect(sx0, sy0, sx1, sy1, tx0, ty0)
+        for row, (start, stop) in sorted(deferred_rows.iteritems()):
+            self.refresh_range(pagenum, row, start, stop)
 
     def scroll_down(self, from_line):
         """Scroll the scroll region down by one line, starting at from_line."""
+        self.flush_scroll()
         _, back, _, _ = self.mode.split_attr(self.attr)
         self.queues.video.put(signals.Event(
             signals.VIDEO_SCROLL_DOWN, (from_line, self.scroll_area.bottom, back)
@@ -580,9 +660,8 @@ class TextScreen(object):
         for c in sequence:
             while True:
                 therow = self.text.pages[self.apagenum].row[row-1]
-                therow.buf.insert(col-1, (c, attr))
+                pushed = therow.insert_char_attr(col, c, attr)
                 if therow.end < self.mode.width:
-                    therow.buf.pop()
                     if therow.end > col-1:
                         therow.end += 1
                     else:
@@ -595,7 +674,7 @@ class TextScreen(object):
                     if not therow.wrap and row < self.mode.height:
                         self.scroll_down(row+1)
                         therow.wrap = True
-                    c, attr = therow.buf.pop()
+                    c, attr = pushed
                     row += 1
                     col = 1
             col += 1
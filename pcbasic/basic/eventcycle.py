@@ -9,6 +9,7 @@ This file is released under the GNU GPL version 3 or later.
 import time
 import Queue
 
+from ..compat import monotonic
 from .base import error
 from .base import scancode
 from .base import signals
@@ -86,7 +87,9 @@ class NullQueue(object):
     def put_nowait(self, item):
         pass
     def get(self, block=False, timeout=False):
-        # we're ignoring block
+        # nothing will arrive, but honour a timed wait
+        if block and timeout:
+            time.sleep(timeout)
         raise Queue.Empty
     def task_done(self):
         pass
@@ -106,6 +109,8 @@ class EventQueues(object):
         self._values = values
         # input signal handlers
         self._handlers = []
+        # handlers for held-back output
+        self._output_handlers = []
         # pause-key halts everything until another keypress
         self._pause = False
         # treat ctrl+c as break interrupt
@@ -137,13 +142,40 @@ class EventQueues(object):
         """Add an input handler."""
         self._handlers.append(handler)
 
-    def wait(self):
-        """Wait and check events."""
-        time.sleep(self.tick)
+    def add_output_handler(self, handler):
+        """Add a handler for held-back output."""
+        self._output_handlers.append(handler)
+
+    def flush_output(self):
+        """Show all held-back output."""
+        for handler in self._output_handlers:
+            handler.check_output(idle=True)
+
+    def mark_frame(self):
+        """Show all held-back output and tell the interface the screen is complete."""
+        self.flush_output()
+        self.video.put(signals.Event(signals.VIDEO_MARK_FRAME))
+
+    def wait(self, until=None):
+        """Wait a tick, or until a monotonic time unless input arrives first; check events."""
+        # show all output before waiting
+        self.flush_output()
+        if until is None:
+            time.sleep(self.tick)
+        else:
+            try:
+                signal = self.inputs.get(True, max(0., until - monotonic()))
+            except Queue.Empty:
+                pass
+            else:
+                self.inputs.task_done()
+                self._handle_input(signal, ())
         self.check_events()
 
     def check_events(self, event_check_input=()):
         """Main event cycle."""
+        for handler in self._output_handlers:
+            handler.check_output(idle=False)
         # check input first to avoid hang if the interface plugin has crashed
         # and we have put a lot of work on the queue
         # this works because Interface will send KEYB_QUIT on termination
@@ -166,21 +198,22 @@ class EventQueues(object):
                 if self._pause:
                     continue
                 else:
-                    # we still need to handle basic events: not all are inputs
-                    for e in event_check_input:
-                        e.check_input(signals.Event(None))
                     break
             self.inputs.task_done()
-            # effect replacements
-            self._replace_inputs(signal)
-            # handle input events
-            for handle_input in (
-                        [self._handle_non_trappable_interrupts] +
-                        [e.check_input for e in event_check_input] +
-                        [self._handle_trappable_interrupts] +
-                        [e.check_input for e in self._handlers]):
-                if handle_input(signal):
-                    break
+            self._handle_input(signal, event_check_input)
+
+    def _handle_input(self, signal, event_check_input):
+        """Handle an input event."""
+        # effect replacements
+        self._replace_inputs(signal)
+        # handle input events
+        for handle_input in (
+                    [self._handle_non_trappable_interrupts] +
+                    [e.check_input for e in event_check_input] +
+                    [self._handle_trappable_interrupts] +
+                    [e.check_input for e in self._handlers]):
+            if handle_input(signal):
+                break
 
     def _handle_non_trappable_interrupts(self, signal):
         """Handle non-trappable interrupts (before BASIC events)."""
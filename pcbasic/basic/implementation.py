@@ -53,7 +53,7 @@ class Implementation(object):
             codepage=None, box_protect=True, font=None, text_width=80,
             video=u'cga', monitor=u'rgb', aspect_ratio=(4, 3), low_intensity=False,
             devices=None, current_device=u'Z:', mount=None, utf8=False, soft_linefeed=False,
-            keys=u'', check_keybuffer_full=True, ctrl_c_is_break=True,
+            keys=u'', check_keybuffer_full=True, ctrl_c_is_break=True, coalesce_scroll=True,
             hide_listing=None, hide_protected=False,
             peek_values=None, allow_code_poke=False, rebuild_offsets=True,
             max_memory=65534, reserved_memory=3429, video_memory=262144,
@@ -124,7 +124,7 @@ class Implementation(object):
             self.memory, text_width, video_memory, video, monitor,
             self.sound, self.io_streams,
             low_intensity, aspect_ratio,
-            self.codepage, font
+            self.codepage, font, coalesce_scroll
         )
         self.screen = self.display.text_screen
         self.drawing = self.display.drawing
@@ -135,6 +135,8 @@ class Implementation(object):
         self.keyboard = inputs.Keyboard(
             self.queues, self.values, self.codepage, keys, check_keybuffer_full
         )
+        # redirected input is held back while the keyboard has plenty waiting
+        self.io_streams.attach_keyboard(self.keyboard)
         self.pen = inputs.Pen()
         self.stick = inputs.Stick(self.values)
         ######################################################################
@@ -169,9 +171,12 @@ class Implementation(object):
         self.queues.add_handler(self.keyboard)
         self.queues.add_handler(self.pen)
         self.queues.add_handler(self.stick)
+        # held-back scrolls and buffered redirected output are written in the event cycle
+        self.queues.add_output_handler(self.screen)
+        self.queues.add_output_handler(self.io_streams)
         # set up BASIC event handlers
         self.basic_events = basicevents.BasicEvents(
-            self.values, self.sound, self.clock, self.files,
+            self.values, self.sound, self.files,
             self.screen, self.program, syntax
         )
         ######################################################################
@@ -261,6 +266,19 @@ class Implementation(object):
             return self.parser.parse_expression(tokens).to_value()
         return None
 
+    def prepare_run(self):
+        """Set up the program to run from the start, but don't run it yet."""
+        self._greeting = False
+        with self._handle_exceptions():
+            self._start_run()
+            self.interpreter.set_parse_mode(True)
+
+    def resume(self):
+        """Continue execution of a prepared or restored program."""
+        self._greeting = False
+        with self._handle_exceptions():
+            self.interpreter.loop()
+
     def set_variable(self, name, value):
         """Set a variable in memory."""
         name = name.upper()
@@ -301,6 +319,8 @@ class Implementation(object):
 
     def close(self):
         """Close the session."""
+        # write out redirected output
+        self.io_streams.flush()
         # close files if we opened any
         self.files.close_all()
         self.files.close_devices()
@@ -387,6 +407,10 @@ class Implementation(object):
             self._prompt = True
         except error.Exit:
             raise
+        finally:
+            # show held-back output before control returns
+            self.screen.flush_scroll()
+            self.io_streams.flush()
 
     def _handle_error(self, e):
         """Handle a BASIC error through error message."""
@@ -474,6 +498,8 @@ class Implementation(object):
         self.screen.cursor.show(True)
         # sound stops playing and is forgotten
         self.sound.stop_all_sound()
+        # redirected output must precede anything the shell writes
+        self.io_streams.flush()
         # run the os-specific shell
         self.shell.launch(cmd)
         # reset cursor visibility to its previous state
@@ -664,10 +690,14 @@ class Implementation(object):
             except StopIteration:
                 pass
         list(args)
+        self._start_run(jumpnum, close_files=not comma_r)
+
+    def _start_run(self, jumpnum=None, close_files=True):
+        """Clear state and point to the start of the program, as RUN does."""
         self.interpreter.on_error = 0
         self.interpreter.error_handle_mode = False
         self.interpreter.clear_stacks_and_pointers()
-        self._clear_all(close_files=not comma_r)
+        self._clear_all(close_files=close_files)
         if jumpnum is None:
             self.interpreter.set_pointer(True, 0)
         else:
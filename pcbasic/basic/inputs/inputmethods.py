@@ -6,8 +6,7 @@ Keyboard, pen and joystick handling
 This file is released under the GNU GPL version 3 or later.
 """
 
-import datetime
-
+from ...compat import monotonic
 from ..base import error
 from ..base import scancode
 from ..base import tokens as tk
@@ -138,6 +137,17 @@ class Stick(object):
         # timer for reading game port
         self._out_time = self._decay_timer()
 
+    def __getstate__(self):
+        """Pickle the time since reset, as the monotonic clock has no fixed epoch."""
+        pickle_dict = self.__dict__.copy()
+        pickle_dict['_out_time'] = self.decay()
+        return pickle_dict
+
+    def __setstate__(self, pickle_dict):
+        """Unpickle and rebase the game port timer."""
+        self.__dict__.update(pickle_dict)
+        self._out_time = self._decay_timer() - self._out_time
+
     def check_input(self, signal):
         """Handle joystick-related input signals."""
         if signal.event_type == signals.STICK_DOWN:
@@ -220,5 +230,4 @@ class Stick(object):
 
     def _decay_timer(self):
         """Millisecond timer for game port decay."""
-        now = datetime.datetime.now()
-        return now.second*1000 + now.microsecond//1000
+        return int(monotonic() * 1000)
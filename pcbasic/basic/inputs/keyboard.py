@@ -72,6 +72,8 @@ class KeyboardBuffer(object):
         self._start = ring_length
         # check if ring is full
         self._check_full = check_full
+        # pasted keystrokes waiting for room in the ring
+        self._pending = deque()
 
     @contextmanager
     def ignore_limit(self):
@@ -85,7 +87,10 @@ class KeyboardBuffer(object):
         # if check_full is off, we pretend the ring buffer is infinite
         # this is for inserting keystrokes and pasting text into the emulator
         if cp_c:
-            if self._check_full and len(self._buffer) - self._start >= self._ring_length-1:
+            if self._pending:
+                # keep keystrokes in order behind a paste in progress
+                self._pending.append((cp_c, scan))
+            elif self._check_full and len(self._buffer) - self._start >= self._ring_length-1:
                 # when buffer is full, GW-BASIC inserts a \r at the end but doesn't count it
                 self._buffer[self._start-1] = (b'\r', scancode.RETURN)
                 # emit a sound signal; keystroke is dropped
@@ -93,6 +98,21 @@ class KeyboardBuffer(object):
             else:
                 self._buffer.append((cp_c, scan))
 
+    def paste(self, keystrokes):
+        """Queue eascii/codepage keystrokes to enter the ring as it empties."""
+        self._pending.extend((cp_c, None) for cp_c in keystrokes if cp_c)
+        self._refill()
+
+    def _refill(self):
+        """Move pasted keystrokes into the ring while there is room."""
+        while self._pending and len(self._buffer) - self._start < self._ring_length-1:
+            self._buffer.append(self._pending.popleft())
+
+    def clear(self):
+        """Drop all keystrokes in the ring and those waiting to enter it."""
+        self._pending.clear()
+        self._start = len(self._buffer)
+
     def getc(self):
         """Read a keystroke as eascii/codepage."""
         try:
@@ -101,6 +121,7 @@ class KeyboardBuffer(object):
             c = b''
         else:
             self._start += 1
+            self._refill()
         return c
 
     def peek(self):
@@ -169,6 +190,7 @@ class KeyboardBuffer(object):
             start += 1
             self._buffer = [(b'\0\0', 0)] + self._buffer
         self._start = start
+        self._refill()
 
 
 ###############################################################################
@@ -235,7 +257,7 @@ class Keyboard(object):
         elif signal.event_type == signals.STREAM_CLOSED:
             self._close_input()
         elif signal.event_type == signals.CLIP_PASTE:
-            self._stream_chars(*signal.params)
+            self.paste(self._codepage.str_from_unicode(*signal.params))
         else:
             return False
         return True
@@ -295,10 +317,24 @@ class Keyboard(object):
         for ea_char in _split_eascii(self._codepage.str_from_unicode(us)):
             self._stream_buffer.append(ea_char)
 
+    def paste(self, cp_s):
+        """Insert a string of eascii/codepage keystrokes, beyond the ring buffer limit."""
+        self.buf.paste(_split_eascii(cp_s))
+
+    def clear(self):
+        """Drop all waiting keystrokes, including pasted text and macro expansions."""
+        self.buf.clear()
+        self._expansion_vessel = []
+
     def _close_input(self):
         """Signal that input stream has closed."""
         self._input_closed = True
 
+    @property
+    def stream_backlog(self):
+        """Number of characters from input streams waiting to be read."""
+        return len(self._stream_buffer)
+
     # macros
 
     def set_macro(self, num, macro):
@@ -315,6 +351,9 @@ class Keyboard(object):
 
     def wait_char(self, keyboard_only=False):
         """Wait for character, then return it but don't drop from queue."""
+        # mark the screen as complete, for recordings; do this even if input is waiting
+        # so that the frames recorded do not depend on the timing of input
+        self._queues.mark_frame()
         # if input stream has closed, don't wait but return empty
         # which will tell the Editor to close
         # except if we're waiting for KYBD: input
@@ -83,7 +83,8 @@ class Interpreter(object):
         """Parse from the current pointer in current codestream."""
         while True:
             # check input and BASIC events. may raise Break, Reset or Exit
-            self._queues.check_events(self._basic_events.enabled)
+            self._queues.check_events(self._basic_events.listeners)
+            self._basic_events.poll()
             try:
                 self.handle_basic_events()
                 ins = self.get_codestream()
@@ -200,8 +201,10 @@ class Interpreter(object):
 
     def handle_basic_events(self):
         """Jump to user-defined event subs if events triggered."""
-        if self._basic_events.suspend_all or not self.run_mode:
+        if not self._basic_events.pending or self._basic_events.suspend_all or not self.run_mode:
             return
+        # events that can't be handled now will set the flag again once they can
+        self._basic_events.pending = False
         for event in self._basic_events.enabled:
             if (event.triggered and not event.stopped and event.gosub is not None):
                 # release trigger
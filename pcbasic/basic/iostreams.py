@@ -6,22 +6,37 @@ Input/output streams
 This file is released under the GNU GPL version 3 or later.
 """
 
+import os
 import logging
 import threading
+import select
+import codecs
 import sys
 import time
 import io
 from contextlib import contextmanager
 from collections import Iterable
 
-from ..compat import WIN32, read_all_available
+from ..compat import WIN32, read_all_available, monotonic
 from .base import signals
 from .codepage import CONTROL
 
 
-# sleep period for input thread
-# does not need to be very short as it reads multiple bytes in one cycle
+# period at which input threads check for the interpreter to start running
+# or, for the windows console, poll the keyboard
 TICK = 0.03
+# period at which input threads check for the interpreter to catch up with input
+HOLD_TICK = 0.005
+
+# largest chunk read from an input stream at once
+CHUNK_SIZE = 16384
+# stop reading ahead when this many input characters are waiting for the interpreter
+MAX_BACKLOG = 65536
+
+# redirected output to files and pipes is written out once this many bytes are waiting
+BUFFER_SIZE = 8192
+# or once the oldest waiting output is this many seconds old
+FLUSH_INTERVAL = 0.2
 
 
 class IOStreams(object):
@@ -44,20 +59,46 @@ class IOStreams(object):
             output_streams = ()
         elif hasattr(output_streams, 'write') or not isinstance(output_streams, Iterable):
             output_streams = (output_streams,)
-        self._output_echos = [self._wrap_output(stream) for stream in output_streams]
+        self._output_streams = [self._wrap_output(stream) for stream in output_streams]
+        self._output_echos = list(self._output_streams)
+        # time by which buffered output must be written out, None if nothing is waiting
+        self._flush_due = None
         # disable at start
         self._active = False
-        # launch a daemon thread for input
+        # keyboard that holds the stream input until the interpreter reads it
+        self._keyboard = None
+        # launch daemon threads for input
         if self._input_streams:
-            # launch a thread to allow nonblocking reads on both Windows and Unix
-            thread = threading.Thread(target=self._process_input, args=())
-            thread.daemon = True
-            thread.start()
+            # select() only works on sockets on Windows
+            if not WIN32 and all(stream.fileno() is not None for stream in self._input_streams):
+                # wait for all streams at once
+                self._launch(self._select_input)
+            else:
+                # fall back to a blocking reader thread per stream
+                for stream in self._input_streams:
+                    self._launch(self._read_input, stream)
+
+    def attach_keyboard(self, keyboard):
+        """Register the keyboard, to hold off input the interpreter isn't ready for."""
+        self._keyboard = keyboard
 
     def write(self, s):
         """Write a string/bytearray to all stream outputs."""
         for f in self._output_echos:
             f.write(s)
+        if self._flush_due is None:
+            self._flush_due = monotonic() + FLUSH_INTERVAL
+
+    def flush(self):
+        """Write out all buffered output."""
+        self._flush_due = None
+        for f in self._output_streams:
+            f.flush()
+
+    def check_output(self, idle):
+        """Write out buffered output if we're waiting or it has been held long enough."""
+        if self._flush_due is not None and (idle or monotonic() >= self._flush_due):
+            self.flush()
 
     def toggle_echo(self, stream):
         """Toggle copying of all screen I/O to stream."""
@@ -85,55 +126,98 @@ class IOStreams(object):
     def _wrap_output(self, stream):
         """Wrap output stream."""
         return OutputStreamWrapper(
-                stream, self._codepage, (stream.encoding if stream.isatty() else self._encoding)
+                stream, self._codepage, (stream.encoding if stream.isatty() else self._encoding),
+                buffered=not stream.isatty()
             )
 
-    def _process_input(self):
-        """Process input from streams."""
+    def _launch(self, target, *args):
+        """Launch an input thread."""
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+
+    def _wait_for_interpreter(self):
+        """Wait until the interpreter runs and has taken the input sent so far."""
         while True:
-            time.sleep(TICK)
             if not self._active:
-                continue
-            queue = self._queues.inputs
-            for stream in self._input_streams:
-                instr = stream.read()
-                if instr is None:
-                    break
-                elif instr:
-                    queue.put(signals.Event(signals.STREAM_CHAR, (instr,)))
+                time.sleep(TICK)
+            elif self._queues.inputs.qsize() or (
+                    self._keyboard and self._keyboard.stream_backlog >= MAX_BACKLOG):
+                time.sleep(HOLD_TICK)
             else:
-                # executed if not break
-                continue
+                return
+
+    def _select_input(self):
+        """Read input from selectable streams as soon as it arrives."""
+        while self._input_streams:
+            self._wait_for_interpreter()
+            # time out so we stop reading when the interpreter gets busy
+            for stream in select.select(self._input_streams, [], [], TICK)[0]:
+                self._send_input(stream, stream.read())
+
+    def _read_input(self, stream):
+        """Read input from a stream that can't be selected on."""
+        while stream in self._input_streams:
+            self._wait_for_interpreter()
+            instr = stream.read()
+            if instr == u'':
+                # nothing available yet on a non-blocking stream
+                time.sleep(TICK)
+            self._send_input(stream, instr)
+
+    def _send_input(self, stream, instr):
+        """Send input to the interpreter."""
+        queue = self._queues.inputs
+        if instr:
+            queue.put(signals.Event(signals.STREAM_CHAR, (instr,)))
+        elif instr is None:
             # input stream is closed, remove it
             self._input_streams.remove(stream)
             # exit the interpreter if last input closed
             if not self._input_streams:
                 queue.put(signals.Event(signals.STREAM_CLOSED))
-                return
 
 
 class OutputStreamWrapper(object):
     """Converter stream wrapper."""
 
-    def __init__(self, stream, codepage, encoding):
+    def __init__(self, stream, codepage, encoding, buffered=False):
         """Set up codec."""
         self._encoding = encoding
         # converter with DBCS lead-byte buffer for utf8 output redirection
         self._uniconv = codepage.get_converter(preserve=CONTROL)
         self._stream = stream
+        # hold back output to non-interactive streams, to avoid a system call per write
+        self._buffered = buffered
+        self._buffer = []
+        self._buffer_size = 0
 
     def write(self, s):
         """Write bytes to codec stream."""
         if self._encoding:
-            self._stream.write(self._uniconv.to_unicode(s).encode(self._encoding, 'replace'))
+            s = self._uniconv.to_unicode(s).encode(self._encoding, 'replace')
         else:
             # raw output
+            s = bytes(s)
+        if not self._buffered:
             self._stream.write(s)
-        self._stream.flush()
+            self._stream.flush()
+            return
+        self._buffer.append(s)
+        self._buffer_size += len(s)
+        if self._buffer_size >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write out buffered output."""
+        if self._buffer:
+            self._stream.write(b''.join(self._buffer))
+            self._buffer, self._buffer_size = [], 0
+            self._stream.flush()
 
 
 class InputStreamWrapper(object):
-    """Converter and non-blocking input wrapper."""
+    """Converter and chunked input wrapper."""
 
     def __init__(self, stream, codepage, encoding, lfcr):
         """Set up codec."""
@@ -141,21 +225,45 @@ class InputStreamWrapper(object):
         self._encoding = encoding
         self._lfcr = lfcr
         self._stream = stream
+        # last chunk ended in CR; drop the LF if the next chunk starts with one
+        self._after_cr = False
+        # keep multibyte sequences together that are split between chunks
+        if encoding:
+            self._decoder = codecs.getincrementaldecoder(encoding)('replace')
+        # windows console needs to be polled to read keystrokes without echo
+        self._console = WIN32 and stream == sys.stdin and stream.isatty()
+        try:
+            self._fileno = stream.fileno()
+        except (AttributeError, EnvironmentError, io.UnsupportedOperation):
+            self._fileno = None
+
+    def fileno(self):
+        """File descriptor of the stream, or None if it has none."""
+        return self._fileno
 
     def read(self):
-        """Read all chars available; nonblocking; returns unicode."""
-        # we need non-blocking readers
-        s = read_all_available(self._stream)
+        """Read a chunk of input; blocks until there is some except on console; returns unicode."""
+        if self._console:
+            s = read_all_available(self._stream)
+        elif self._fileno is not None:
+            # unlike file.read(), this returns as soon as anything is available
+            s = os.read(self._fileno, CHUNK_SIZE) or None
+        else:
+            s = self._stream.read(CHUNK_SIZE) or None
         # can be None (closed) or b'' (no input)
         if s is None:
             return None
         elif not s:
             return u''
+        # CR LF may be split between chunks
+        if self._after_cr and s.startswith(b'\n'):
+            s = s[1:]
+        self._after_cr = s.endswith(b'\r')
         s = s.replace(b'\r\n', b'\r')
         if self._lfcr:
             s = s.replace(b'\n', b'\r')
         if self._encoding:
-            return s.decode(self._encoding, 'replace')
+            return self._decoder.decode(s)
         else:
             # raw input means it's already in the BASIC codepage
             # but the keyboard functions use unicode
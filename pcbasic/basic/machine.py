@@ -427,28 +427,32 @@ class Memory(object):
         elif addr >= 0:
             self._set_low_memory(addr, val)
 
+    def _get_video_range(self, addr, length):
+        """Get the offsets of the video memory part of a block of memory."""
+        video_start = self.video_segment*0x10
+        start = min(max(0, video_start - addr), length)
+        stop = min(max(start, video_start + 0x20000 - addr), length)
+        return start, stop
+
     def _get_memory_block(self, addr, length):
         """Retrieve a contiguous block of bytes from memory."""
-        block = bytearray()
-        if addr >= self.video_segment*0x10:
-            video_len = 0x20000 - (addr - self.video_segment*0x10)
+        start, stop = self._get_video_range(addr, length)
+        block = bytearray(max(0, self._get_memory(a)) for a in range(addr, addr+start))
+        if stop > start:
             # graphics and text memory - specialised call
-            block += self._get_video_memory_block(addr, min(length, video_len))
-            addr += video_len
-            length -= video_len
-        for a in range(addr, addr+length):
-            block.append(max(0, self._get_memory(a)))
+            block += self._get_video_memory_block(addr+start, stop-start)
+        block += bytearray(max(0, self._get_memory(a)) for a in range(addr+stop, addr+length))
         return block
 
     def _set_memory_block(self, addr, buf):
         """Set a contiguous block of bytes in memory."""
-        if addr >= self.video_segment*0x10:
-            video_len = 0x20000 - (addr - self.video_segment*0x10)
+        start, stop = self._get_video_range(addr, len(buf))
+        for a in range(start):
+            self._set_memory(addr + a, buf[a])
+        if stop > start:
             # graphics and text memory - specialised call
-            self._set_video_memory_block(addr, buf[:video_len])
-            addr += video_len
-            buf = buf[video_len:]
-        for a in range(len(buf)):
+            self._set_video_memory_block(addr+start, buf[start:stop])
+        for a in range(stop, len(buf)):
             self._set_memory(addr + a, buf[a])
 
 
@@ -604,7 +608,8 @@ class Memory(object):
             odd = (addr-1024-self.key_buffer_offset) % 2
             c, scan = self.keyboard.buf.ring_read(index)
             if odd:
-                return scan
+                # inserted and pasted keystrokes have no scancode
+                return scan or 0
             elif c == b'':
                 return 0
             else:
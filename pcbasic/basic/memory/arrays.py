@@ -43,7 +43,10 @@ class Arrays(object):
         """Clear arrays."""
         self._dims = {}
         self._buffers = {}
+        # decoded sprites, keyed by (name, offset, version)
         self._cache = {}
+        self._versions = {}
+        self._version = 0
         self._array_memory = {}
         self.current = 0
 
@@ -61,7 +64,8 @@ class Arrays(object):
             # delete buffers
             del self._dims[name]
             del self._buffers[name]
-            del self._cache[name]
+            self._drop_cache(name)
+            del self._versions[name]
             del self._array_memory[name]
             # update memory model
             for name in self._array_memory:
@@ -100,13 +104,39 @@ class Arrays(object):
         """Return the dimensions of an array."""
         return self._dims[name]
 
-    def get_cache(self, name):
-        """Retrieve the sprite cache for the given array."""
-        return self._cache[name]
+    def get_cache(self, name, offset=0):
+        """Retrieve the sprite cached at a byte offset in the given array, or None."""
+        try:
+            _, item = self._cache[(name, offset, self._versions[name])]
+        except KeyError:
+            if name not in self._dims:
+                raise
+            return None
+        return item
+
+    def set_cache(self, name, item, offset=0, length=None):
+        """Store a sprite decoded from length bytes at an offset in the given array."""
+        if length is None:
+            length = len(self._buffers[name]) - offset
+        self._cache[(name, offset, self._versions[name])] = (offset + length, item)
+
+    def modified(self, name, index=None):
+        """Drop the cached sprites affected by a change to an array element or the whole array."""
+        if index is None:
+            self._drop_cache(name)
+            self._version += 1
+            self._versions[name] = self._version
+        else:
+            _, start, stop = self._element_range(name, index)
+            self._drop_cache(name, start, stop)
 
-    def set_cache(self, name, item):
-        """Store a sprite in the cache for a given array."""
-        self._cache[name] = item
+    def _drop_cache(self, name, start=0, stop=None):
+        """Drop cached sprites overlapping a byte range of an array."""
+        if not self._cache:
+            return
+        for key, (sprite_stop, _) in self._cache.items():
+            if key[0] == name and sprite_stop > start and (stop is None or key[1] < stop):
+                del self._cache[key]
 
     def dim_(self, args):
         """DIM: dimension arrays."""
@@ -156,7 +186,8 @@ class Arrays(object):
         self._array_memory[name] = (name_ptr, array_ptr)
         self._buffers[name] = bytearray(array_bytes)
         self._dims[name] = dimensions
-        self._cache[name] = None
+        self._version += 1
+        self._versions[name] = self._version
 
     def check_dim(self, name, index):
         """
@@ -194,12 +225,17 @@ class Arrays(object):
             raise error.BASICError(error.DUPLICATE_DEFINITION)
         self._base = base
 
-    def view_buffer(self, name, index):
-        """Return a memoryview to an array element."""
+    def _element_range(self, name, index):
+        """Return the buffer and byte range of an array element."""
         dimensions, lst = self.check_dim(name, index)
         bigindex = self.index(index, dimensions)
         bytesize = values.size_bytes(name)
-        return memoryview(lst)[bigindex*bytesize:(bigindex+1)*bytesize]
+        return lst, bigindex*bytesize, (bigindex+1)*bytesize
+
+    def view_buffer(self, name, index):
+        """Return a memoryview to an array element."""
+        lst, start, stop = self._element_range(name, index)
+        return memoryview(lst)[start:stop]
 
     def get(self, name, index):
         """Retrieve a view of the value of an array element."""
@@ -212,9 +248,10 @@ class Arrays(object):
         if isinstance(value, values.String):
             self._memory.strings.fix_temporaries()
         # copy value into array
-        self.view_buffer(name, index)[:] = values.to_type(name[-1], value).to_bytes()
-        # drop cache
-        self._cache[name] = None
+        lst, start, stop = self._element_range(name, index)
+        lst[start:stop] = values.to_type(name[-1], value).to_bytes()
+        # drop sprites decoded from this element
+        self._drop_cache(name, start, stop)
 
     def varptr(self, name, indices):
         """Retrieve the address of an array."""
@@ -15,6 +15,9 @@ from . import values
 
 DIGITS = string.digits
 
+# kinds of value reference in compiled macro-language strings
+CONSTANT, VARIABLE, VARPTR = 0, 1, 2
+
 
 class MLParser(codestream.CodeStream):
     """Macro Language parser."""
@@ -27,9 +30,30 @@ class MLParser(codestream.CodeStream):
         codestream.CodeStream.__init__(self, gml)
         self.memory = data_memory
         self.values = values
+        # variables referenced before the last compile_ call failed, see resolve_partial
+        self.partial = []
 
     def parse_number(self, default=None):
         """Parse a value in a macro-language string."""
+        try:
+            spec = self.compile_number(default)
+        except error.BASICError as e:
+            resolve_partial(self.memory, self.partial)
+            raise e
+        return get_number(self.memory, spec)
+
+    def parse_string(self):
+        """Parse a string value in a macro-language string."""
+        try:
+            ref = self.compile_string()
+        except error.BASICError as e:
+            resolve_partial(self.memory, self.partial)
+            raise e
+        return get_string(self.memory, ref)
+
+    def compile_number(self, default=None):
+        """Parse a numeric value into a reference to be resolved by get_number."""
+        self.partial = []
         c = self.skip_blank()
         sgn = -1 if c == b'-' else 1
         if c in (b'+', b'-'):
@@ -43,41 +67,43 @@ class MLParser(codestream.CodeStream):
             if len(c) == 0:
                 raise error.BASICError(error.IFC)
             elif ord(c) > 8:
-                step = self._parse_variable().to_int()
+                ref = VARIABLE, self._compile_variable()
+                # the variable is evaluated before a missing semicolon is reported
+                self.partial.append((ref, True))
                 self.require_read((b';',), err=error.IFC)
             else:
                 # varptr$
-                step = self.memory.get_value_for_varptrstr(self.read(3)).to_int()
+                ref = VARPTR, self.read(3)
         elif c and c in DIGITS:
-            step = self._parse_const()
+            ref = CONSTANT, self._parse_const()
         elif default is not None:
-            step = default
+            ref = CONSTANT, default
         else:
             raise error.BASICError(error.IFC)
-        if sgn == -1:
-            step = -step
-        return step
+        self.partial = []
+        return (sgn,) + ref
 
-    def parse_string(self):
-        """Parse a string value in a macro-language string."""
+    def compile_string(self):
+        """Parse a string value into a reference to be resolved by get_string."""
+        self.partial = []
         c = self.skip_blank()
         if len(c) == 0:
             raise error.BASICError(error.IFC)
         elif ord(c) > 8:
-            sub = self._parse_variable()
+            ref = VARIABLE, self._compile_variable()
+            self.partial.append((ref, False))
             self.require_read((b';',), err=error.IFC)
-            return values.pass_string(sub).to_str()
         else:
             # varptr$
-            ptr = self.memory.get_value_for_varptrstr(self.read(3))
-            return values.pass_string(ptr).to_str()
+            ref = VARPTR, self.read(3)
+        self.partial = []
+        return ref
 
-    def _parse_variable(self):
-        """Parse and return a named variable."""
+    def _compile_variable(self):
+        """Parse a variable name and indices."""
         name = self.read_name()
         error.throw_if(not name)
-        indices = self._parse_indices()
-        return self.memory.view_or_create_variable(name, indices)
+        return name, self._compile_indices()
 
     def _parse_const(self):
         """Parse and return a constant value in a macro-language string."""
@@ -89,16 +115,57 @@ class MLParser(codestream.CodeStream):
         except ValueError:
             raise error.BASICError(error.IFC)
 
-    def _parse_indices(self):
-        """Parse constant array indices."""
+    def _compile_indices(self):
+        """Parse constant or variable array indices."""
         indices = []
         if self.skip_blank_read_if((b'[', b'(')):
             while True:
                 if self.skip_blank() in set(DIGITS):
-                    indices.append(self._parse_const())
+                    indices.append((CONSTANT, self._parse_const()))
                 else:
-                    indices.append(self._parse_variable().to_int())
+                    ref = VARIABLE, self._compile_variable()
+                    self.partial.append((ref, True))
+                    indices.append(ref)
                 if not self.skip_blank_read_if((b',',)):
                     break
             self.require_read((b']', b')'))
-        return indices
+        return tuple(indices)
+
+
+def _get_variable(memory, name, indices):
+    """Retrieve or create a variable referenced in a macro-language string."""
+    indices = [
+        index if kind == CONSTANT else _get_variable(memory, *index).to_int()
+        for kind, index in indices
+    ]
+    return memory.view_or_create_variable(name, indices)
+
+def _get_value(memory, ref):
+    """Resolve a variable or VARPTR$ reference."""
+    kind, arg = ref
+    if kind == VARIABLE:
+        return _get_variable(memory, *arg)
+    return memory.get_value_for_varptrstr(arg)
+
+def resolve_partial(memory, partial):
+    """Evaluate the variables referenced before a syntax error, for their side effects."""
+    # arrays are allocated when retrieved and numbers are converted, as when parsing directly
+    for ref, is_number in partial:
+        value = _get_value(memory, ref)
+        if is_number:
+            value.to_int()
+
+def get_number(memory, spec):
+    """Resolve a numeric value compiled from a macro-language string."""
+    sgn, kind, arg = spec
+    if kind == CONSTANT:
+        step = arg
+    else:
+        step = _get_value(memory, (kind, arg)).to_int()
+    if sgn == -1:
+        step = -step
+    return step
+
+def get_string(memory, ref):
+    """Resolve a string value compiled from a macro-language string."""
+    return values.pass_string(_get_value(memory, ref)).to_str()
@@ -9,8 +9,8 @@ This file is released under the GNU GPL version 3 or later.
 from collections import deque
 import Queue
 import string
-import datetime
 
+from ..compat import monotonic
 from .base import error
 from .base import signals
 from .base import tokens as tk
@@ -50,6 +50,9 @@ LOOP_THRESHOLD = 0.02272727248
 # length of a clock tick ("PIT tick", see Joel Yliluoma's noise.bas)
 TICK_LENGTH = 0x1234DC / 65536.
 
+# sample rate of the audio synthesiser; tones play for a whole number of samples
+SAMPLE_RATE = 44100
+
 
 class Sound(object):
     """Sound queue manipulations."""
@@ -74,6 +77,8 @@ class Sound(object):
         self._voice_queue = [TimedQueue(), TimedQueue(), TimedQueue(), TimedQueue()]
         self._foreground = True
         self._synch = False
+        # set when the queues have grown or been cleared, for PLAY event polling
+        self.queue_changed = False
         # initialise PLAY state
         self.reset_play()
 
@@ -113,6 +118,7 @@ class Sound(object):
             gap = signals.Event(signals.AUDIO_TONE, (voice, 0, (1-fill) * duration, 0, 0))
             self._queues.audio.put(gap)
             self._voice_queue[voice].put(gap, (1-fill) * duration, False)
+        self.queue_changed = True
         if voice == 2 and frequency != 0:
             # reset linked noise frequencies
             # /2 because we're using a 0x4000 rotation rather than 0x8000
@@ -128,6 +134,7 @@ class Sound(object):
         noise = signals.Event(signals.AUDIO_NOISE, (source > 3, frequency, duration, loop, volume))
         self._queues.audio.put(noise)
         self._voice_queue[3].put(noise, None if loop else duration, True)
+        self.queue_changed = True
 
     def sound_(self, args):
         """SOUND: produce a sound or switch external speaker on/off."""
@@ -207,13 +214,21 @@ class Sound(object):
     def _wait(self, wait_length):
         """Wait until queue is shorter than or equal to given length."""
         # top of queue is the currently playing tone or gap
-        while max(len(queue) for queue in self._voice_queue) > wait_length:
-            self._queues.wait()
+        while True:
+            release = [queue.release_time(wait_length) for queue in self._voice_queue]
+            if None in release:
+                # looping sound never ends by itself
+                self._queues.wait()
+            elif not any(release):
+                return
+            else:
+                self._queues.wait(until=max(release))
 
     def stop_all_sound(self):
         """Terminate all sounds immediately."""
         for q in self._voice_queue:
             q.clear()
+        self.queue_changed = True
         self._queues.audio.put(signals.Event(signals.AUDIO_STOP))
 
     def persist(self, flag):
@@ -242,19 +257,28 @@ class Sound(object):
         """Return max number of tones waiting in queues."""
         return max(self._voice_queue[voice].tones_waiting() for voice in range(3))
 
+    def next_release(self):
+        """Monotonic time when the next item leaves one of the tone queues; None if none will."""
+        release = [
+            queue.release_time(len(queue) - 1) for queue in self._voice_queue[:3] if len(queue)
+        ]
+        release = [when for when in release if when is not None]
+        return min(release) if release else None
+
     def emit_synch(self):
         """Synchronise the three tone voices."""
         # on Tandy/PCjr, align voices (excluding noise) at the end of each PLAY statement
         if self._multivoice:
             max_time = max(q.expiry() for q in self._voice_queue[:3])
             for voice, q in enumerate(self._voice_queue[:3]):
-                duration = (max_time - q.expiry()).total_seconds()
+                duration = max_time - q.expiry()
                 # fill up the queue with the necessary amount of silence
                 # this takes up one spot in the buffer and thus affects timings
                 # which is intentional
                 balloon = signals.Event(signals.AUDIO_TONE, (voice, 0, duration, False, 0))
                 self._queues.audio.put(balloon)
                 self._voice_queue[voice].put(balloon, duration, None)
+            self.queue_changed = True
         self._synch = False
 
     def reset_play(self):
@@ -422,11 +446,13 @@ class PlayState(object):
 # sound queue
 
 class TimedQueue(object):
-    """Queue with expiring elements."""
+    """Queue with elements expiring on the monotonic clock."""
 
     def __init__(self):
         """Initialise timed queue."""
         self._deque = deque()
+        # number of elements that count for the queue size
+        self._counted = 0
         # hack to reproduce queue lengths
         self._balloon_popped = False
 
@@ -435,21 +461,29 @@ class TimedQueue(object):
         self._check_expired()
         return {
             'deque': self._deque,
-            'now': datetime.datetime.now()}
+            'now': monotonic()}
 
     def __setstate__(self, st):
         """Initialise queue from pickling dict."""
-        offset = datetime.datetime.now() - st['now']
-        self._deque = deque((item, expiry+offset, counts) for (item, expiry, counts) in st['deque'])
+        # the monotonic clock has no fixed epoch, so rebase expiry times
+        offset = monotonic() - st['now']
+        self._deque = deque(
+            (item, None if expiry is None else expiry+offset, counts)
+            for (item, expiry, counts) in st['deque']
+        )
+        self._counted = sum(1 for _, _, counts in self._deque if counts)
+        self._balloon_popped = False
 
     def _check_expired(self):
         """Drop expired items from queue."""
-        counts = 0
+        now = monotonic()
         try:
-            while self._deque[0][1] <= datetime.datetime.now():
+            # None (looping sound) never expires
+            while self._deque[0][1] is not None and self._deque[0][1] <= now:
                 popped = self._deque.popleft()
+                self._counted -= bool(popped[2])
                 self._balloon_popped = (popped[2] is None)
-        except (IndexError, TypeError):
+        except IndexError:
             pass
 
     def put(self, item, duration, count_for_size):
@@ -461,30 +495,46 @@ class TimedQueue(object):
         # drop looping elements
         try:
             if self._deque[-1][1] is None:
-                self._deque.pop()
+                self._counted -= bool(self._deque.pop()[2])
         except IndexError:
             pass
         if duration is None:
             expiry = None
         else:
-            last = self._deque[-1][1] if self._deque else datetime.datetime.now()
-            expiry = max(last, datetime.datetime.now()) + datetime.timedelta(seconds=duration)
+            now = monotonic()
+            last = self._deque[-1][1] if self._deque else now
+            # follow the synthesiser, which plays each tone for a whole number of samples
+            expiry = max(last, now) + int(duration * SAMPLE_RATE) / float(SAMPLE_RATE)
         self._deque.append((item, expiry, count_for_size))
+        self._counted += bool(count_for_size)
 
     def clear(self):
         """Clear the queue."""
         self._deque.clear()
+        self._counted = 0
 
     def __len__(self):
         """Number of elements in queue."""
         self._check_expired()
         return len(self._deque)
 
+    def release_time(self, length):
+        """
+        Monotonic time when the queue will be no longer than the given length.
+        Zero if it is already; None if a looping sound keeps it too long.
+        """
+        self._check_expired()
+        if len(self._deque) <= length:
+            return 0.
+        return self._deque[-length-1][1]
+
     def tones_waiting(self):
         """Number of tones (not gaps) waiting in queue."""
         self._check_expired()
         # count number of notes waiting, exclude the top of queue ("now playing")
-        waiting = len([item for i, item in enumerate(self._deque) if item[2] and i])
+        waiting = self._counted
+        if self._deque and self._deque[0][2]:
+            waiting -= 1
         # hack: if the most recent item popped was a balloon
         # (i.e. we've just started a PLAY and the first note has not finished)
         # include the first note in the waiting queue length
@@ -493,22 +543,22 @@ class TimedQueue(object):
         return waiting
 
     def expiry(self):
-        """Last expiry in queue, return now() for looping sound."""
+        """Last expiry in queue, return current time for looping sound."""
         self._check_expired()
         try:
-            return self._deque[-1][1] or datetime.datetime.now()
+            return self._deque[-1][1] or monotonic()
         except IndexError:
-            return datetime.datetime.now()
+            return monotonic()
 
     def iteritems(self):
         """Iterate over each item and its duration."""
         self._check_expired()
-        last_expiry = datetime.datetime.now()
+        last_expiry = monotonic()
         for item, expiry, _ in self._deque:
             if expiry is None:
                 duration = None
             else:
                 # adjust duration
-                duration = (expiry - last_expiry).total_seconds()
+                duration = expiry - last_expiry
                 last_expiry = expiry
             yield item, duration
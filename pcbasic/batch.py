@@ -0,0 +1,276 @@
+"""
+PC-BASIC - batch.py
+Run many BASIC jobs across a pool of worker processes
+
+(c) 2013--2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import io
+import os
+import time
+import traceback
+import multiprocessing
+from collections import deque
+
+from .compat import monotonic
+from .basic import Session
+from .basic.base import error
+from .basic.inputs.keyboard import DEFAULT_MACROS
+
+
+# exit codes for jobs that did not end normally; BASIC errors give their error number
+TIMED_OUT = -1
+FAILED = -2
+
+# interval at which the pool checks on busy workers
+TICK = 0.01
+
+
+class WorkerFailed(Exception):
+    """A worker process could not start its session."""
+
+    def __init__(self, exitcode=None):
+        self._message = u'Worker exited with code %s while starting' % (exitcode,)
+
+    def __str__(self):
+        return self._message
+
+
+class BatchJob(object):
+    """A BASIC program to run, with its files, commands and keystrokes."""
+
+    def __init__(self, program, files=None, commands=(), keys=u'', timeout=None):
+        """Define the job."""
+        # native file name of the program
+        self.program = program
+        # dict of BASIC names (opened as @:NAME) to native file names
+        self.files = files or {}
+        # BASIC statements to execute before RUN
+        self.commands = commands
+        # keystrokes to feed to the program
+        self.keys = keys
+        # seconds after which the job is stopped; None for the pool's default
+        self.timeout = timeout
+
+
+class BatchResult(object):
+    """Outcome of a batch job."""
+
+    def __init__(self, job, exit_code=0, output=b'', message=u'', wall=0., cpu=None):
+        """Record the outcome."""
+        self.job = job
+        # 0, a BASIC error number, TIMED_OUT or FAILED
+        self.exit_code = exit_code
+        # redirected screen output
+        self.output = output
+        # traceback or reason for failure
+        self.message = message
+        # wall-clock and processor time in seconds
+        self.wall = wall
+        self.cpu = cpu
+
+
+class BatchRunner(object):
+    """Pool of worker processes, each with a warmed-up session."""
+
+    def __init__(self, workers=None, timeout=None, **session_params):
+        """Set up the pool; workers are started when first needed."""
+        self._num_workers = workers or multiprocessing.cpu_count()
+        self._timeout = timeout
+        self._session_params = session_params
+        self._workers = []
+
+    def __enter__(self):
+        """Context guard."""
+        return self
+
+    def __exit__(self, ex_type, ex_val, tb):
+        """Context guard."""
+        self.close()
+
+    def run(self, jobs):
+        """Run jobs and return their results in order."""
+        jobs = list(jobs)
+        results = [None] * len(jobs)
+        pending = deque(enumerate(jobs))
+        while len(self._workers) < min(self._num_workers, len(jobs)):
+            self._workers.append(_Worker(self._session_params))
+        while pending or any(worker.busy for worker in self._workers):
+            changed = False
+            for i, worker in enumerate(self._workers):
+                if worker.busy:
+                    result = worker.check()
+                    if result is not None:
+                        results[worker.index] = result
+                        if worker.failed:
+                            # replace a hung or crashed worker, the rest of the pool carries on
+                            worker.close()
+                            self._workers[i] = _Worker(self._session_params)
+                        changed = True
+                elif pending and worker.ready():
+                    index, job = pending.popleft()
+                    timeout = job.timeout if job.timeout is not None else self._timeout
+                    worker.submit(index, job, timeout)
+                    changed = True
+            if not changed:
+                time.sleep(TICK)
+        return results
+
+    def close(self):
+        """Stop all workers."""
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+
+
+class _Worker(object):
+    """Handle on a worker process."""
+
+    def __init__(self, session_params):
+        """Start the worker process."""
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child_connection, session_params)
+        )
+        self._process.daemon = True
+        self._process.start()
+        self._ready = False
+        self.busy = False
+        self.failed = False
+        self.index = None
+        self._job = None
+        self._start = None
+        self._deadline = None
+
+    def ready(self):
+        """The worker has warmed up and is waiting for a job."""
+        if not self._ready:
+            if self._connection.poll():
+                # the first message is sent once the session has started
+                self._ready = self._connection.recv()
+            elif not self._process.is_alive():
+                raise WorkerFailed(self._process.exitcode)
+        return self._ready and not self.busy
+
+    def submit(self, index, job, timeout):
+        """Send a job to the worker."""
+        self.index, self._job = index, job
+        self._start = monotonic()
+        self._deadline = self._start + timeout if timeout else None
+        self.busy = True
+        self._connection.send(job)
+
+    def check(self):
+        """Return the result if the job has finished, failed or timed out; None if still running."""
+        result = None
+        try:
+            if self._connection.poll():
+                result = self._connection.recv()
+                result.job = self._job
+        except (EOFError, EnvironmentError):
+            pass
+        if result is None:
+            if not self._process.is_alive():
+                result = BatchResult(
+                    self._job, FAILED, message=u'Worker exited with code %s' % self._process.exitcode,
+                    wall=monotonic() - self._start
+                )
+                self.failed = True
+            elif self._deadline is not None and monotonic() > self._deadline:
+                result = BatchResult(
+                    self._job, TIMED_OUT, message=u'Timed out', wall=monotonic() - self._start
+                )
+                self.failed = True
+            else:
+                return None
+        self.busy = False
+        return result
+
+    def close(self):
+        """Stop the worker process."""
+        if self._process.is_alive():
+            if self.busy or self.failed or not self._ready:
+                self._process.terminate()
+            else:
+                try:
+                    self._connection.send(None)
+                except EnvironmentError:
+                    self._process.terminate()
+        self._process.join()
+        self._connection.close()
+
+
+def _serve(connection, session_params):
+    """Worker process: run jobs in a warmed-up session until told to stop."""
+    output = io.BytesIO()
+    session = _start_session(output, session_params)
+    width = session_params.get('text_width', 80)
+    connection.send(True)
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        start_time, start_clock = monotonic(), time.clock()
+        try:
+            exit_code = _run_job(session, job, width)
+            message = u''
+        except Exception:
+            exit_code, message = FAILED, traceback.format_exc().decode('utf-8', 'replace')
+            # the session may be in any state now, start afresh
+            session.close()
+            session = _start_session(output, session_params)
+        wall, cpu = monotonic() - start_time, time.clock() - start_clock
+        result = BatchResult(None, exit_code, output.getvalue(), message, wall, cpu)
+        output.seek(0)
+        output.truncate()
+        connection.send(result)
+    session.close()
+
+def _start_session(output, session_params):
+    """Start a session with output captured and no input."""
+    session = Session(input_streams=None, output_streams=output, **session_params)
+    session.start()
+    return session
+
+def _reset_session(session, width):
+    """Restore what CLEAR leaves alone: waiting keystrokes, screen width and function keys."""
+    keyboard = session._impl.keyboard
+    keyboard.clear()
+    for num, macro in enumerate(DEFAULT_MACROS, 1):
+        keyboard.set_macro(num, macro)
+    session.execute(b'SCREEN 0: WIDTH %d: KEY OFF' % (width,))
+
+def _run_job(session, job, width):
+    """Load and run a job in a session left clean by the last one; return the exit code."""
+    _reset_session(session, width)
+    if not os.path.isfile(job.program):
+        return error.FILE_NOT_FOUND
+    # always reload, as the last job may have changed the program with CHAIN, MERGE or commands
+    with session.bind_file(job.program) as progfile:
+        session.execute(b'LOAD "%s"' % (progfile,))
+    exit_code = session.evaluate(b'ERR')
+    if exit_code:
+        return exit_code
+    bound = [
+        session.bind_file(native_name, name, create=True)
+        for name, native_name in job.files.iteritems()
+    ]
+    try:
+        for cmd in job.commands:
+            session.execute(cmd)
+        if job.keys:
+            session.press_keys(job.keys)
+        try:
+            session.execute(b'RUN')
+        except error.Exit:
+            # SYSTEM ends the job normally
+            pass
+        exit_code = session.evaluate(b'ERR')
+        # close files and clear variables for the next job
+        session.execute(b'CLEAR')
+        _reset_session(session, width)
+    finally:
+        for bound_file in bound:
+            bound_file.__exit__()
+    return exit_code
@@ -6,9 +6,10 @@ Cross-platform compatibility utilities
 This file is released under the GNU GPL version 3 or later.
 """
 
-from .base import WIN32, MACOS, X64, USER_CONFIG_HOME, USER_DATA_HOME, BASE_DIR, PLATFORM
+from .base import WIN32, MACOS, X64, USER_CONFIG_HOME, USER_DATA_HOME, USER_CACHE_HOME
+from .base import BASE_DIR, PLATFORM
 from .base import split_quoted
-from .python2 import which
+from .python2 import which, monotonic
 
 if WIN32:
 
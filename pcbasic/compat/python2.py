@@ -10,6 +10,9 @@ and released under a GPL-compatible licence https://docs.python.org/3.3/license.
 import shutil
 import sys
 import os
+import time
+import ctypes
+import ctypes.util
 
 try:
     from shutil import which
@@ -76,3 +79,51 @@ except ImportError:
                     if _access_check(name, mode):
                         return name
         return None
+
+
+try:
+    from time import monotonic
+except ImportError:
+    # following PEP 418 and the Python 3.3 time module source
+
+    def _monotonic_fallback():
+        """Wall-clock time, but never going backward."""
+        latest = [time.time()]
+        def monotonic():
+            """Return the value of a clock that cannot go backward, in seconds."""
+            latest[0] = max(latest[0], time.time())
+            return latest[0]
+        return monotonic
+
+    if sys.platform == 'win32':
+        try:
+            _GetTickCount64 = ctypes.windll.kernel32.GetTickCount64
+            _GetTickCount64.restype = ctypes.c_ulonglong
+        except AttributeError:
+            # before Vista
+            monotonic = _monotonic_fallback()
+        else:
+            def monotonic():
+                """Return the value of a clock that cannot go backward, in seconds."""
+                return _GetTickCount64() * 0.001
+    else:
+        class _timespec(ctypes.Structure):
+            _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+        # CLOCK_MONOTONIC is 6 on macOS (from 10.12) and 1 on Linux and the BSDs
+        _CLOCK_MONOTONIC = 6 if sys.platform == 'darwin' else 1
+        try:
+            _librt = ctypes.CDLL(
+                ctypes.util.find_library('rt') or ctypes.util.find_library('c'), use_errno=True)
+            _clock_gettime = _librt.clock_gettime
+            _clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_timespec)]
+            if _clock_gettime(_CLOCK_MONOTONIC, ctypes.byref(_timespec())) != 0:
+                raise OSError()
+        except (EnvironmentError, AttributeError, TypeError):
+            monotonic = _monotonic_fallback()
+        else:
+            def monotonic():
+                """Return the value of a clock that cannot go backward, in seconds."""
+                spec = _timespec()
+                _clock_gettime(_CLOCK_MONOTONIC, ctypes.byref(spec))
+                return spec.tv_sec + spec.tv_nsec * 1e-9
@@ -16,14 +16,13 @@ import codecs
 import locale
 import tempfile
 import shutil
-import pkg_resources
 import string
 from collections import deque
 
 from .metadata import VERSION, NAME
 from .data import CODEPAGES, FONTS, PROGRAMS, ICON
 from .compat import WIN32, get_short_pathname, get_unicode_argv, HAS_CONSOLE
-from .compat import USER_CONFIG_HOME, USER_DATA_HOME
+from .compat import USER_CONFIG_HOME, USER_DATA_HOME, USER_CACHE_HOME
 from .compat import split_quoted
 from . import data
 
@@ -38,6 +37,8 @@ BASENAME = u'pcbasic-{0}'.format(MAJOR_VERSION)
 # user configuration and state directories
 USER_CONFIG_DIR = os.path.join(USER_CONFIG_HOME, BASENAME)
 STATE_PATH = os.path.join(USER_DATA_HOME, BASENAME)
+# compiled codepages and fonts
+CACHE_PATH = os.path.join(USER_CACHE_HOME, BASENAME)
 
 # @: target drive for bundled programs
 PROGRAM_PATH = os.path.join(STATE_PATH, u'bundled_programs')
@@ -223,7 +224,7 @@ class Settings(object):
         u'interface': {
             u'type': u'string', u'default': u'',
             u'choices': (u'', u'none', u'cli', u'text', u'graphical',
-                        u'ansi', u'curses', u'pygame', u'sdl2'), },
+                        u'ansi', u'curses', u'pygame', u'sdl2', u'record'), },
         u'sound': {
             u'type': u'string', u'default': u'',
             u'choices': (u'', u'none', u'beep', u'portaudio', u'interface'), },
@@ -292,6 +293,7 @@ class Settings(object):
         u'shell': {u'type': u'string', u'default': u'',},
         u'ctrl-c-break': {u'type': u'bool', u'default': True,},
         u'wait': {u'type': u'bool', u'default': False,},
+        u'record': {u'type': u'string', u'default': u'', },
         u'current-device': {u'type': u'string', u'default': ''},
         u'extension': {u'type': u'string', u'list': u'*', u'default': []},
         u'options': {u'type': u'string', u'default': ''},
@@ -497,7 +499,7 @@ class Settings(object):
         max_list[0] = max_list[0] or max_list[1]
         # codepage parameters
         codepage_params = self.get('codepage').split(u':')
-        codepage_dict = data.read_codepage(codepage_params[0])
+        codepage_dict = data.read_codepage(codepage_params[0], cache_dir=CACHE_PATH)
         nobox = len(codepage_params) > 1 and codepage_params[1] == u'nobox'
         # video parameters
         video_params = self.get('video').split(u':')
@@ -515,7 +517,9 @@ class Settings(object):
             'text_width': self.get('text-width'),
             'video_memory': self.get('video-memory'),
             'low_intensity': cga_low,
-            'font': data.read_fonts(codepage_dict, self.get('font'), warn=self.get('debug')),
+            'font': data.read_fonts(
+                codepage_dict, self.get('font'), warn=self.get('debug'), cache_dir=CACHE_PATH
+            ),
             # inserted keystrokes
             'keys': self.get('keys').encode('utf-8', 'replace')
                         .decode('string_escape').decode('utf-8', 'replace'),
@@ -550,6 +554,8 @@ class Settings(object):
             'extension': self.get('extension'),
             # ignore key buffer in console-based interfaces, to allow pasting text in console
             'check_keybuffer_full': self.get('interface') not in ('cli', 'text', 'ansi', 'curses'),
+            # the command-line interface prints every row, so don't skip any by coalescing scrolls
+            'coalesce_scroll': self.get('interface') != 'cli',
             # following GW, don't write greeting for redirected input or command-line filter run
             'greeting': (not params['input_streams']),
         })
@@ -568,6 +574,7 @@ class Settings(object):
             'mouse_clipboard': self.get('mouse-clipboard'),
             'icon': ICON,
             'wait': self.get('wait'),
+            'record': self.get('record'),
             }
 
     def _get_audio_parameters(self):
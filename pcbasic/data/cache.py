@@ -0,0 +1,69 @@
+"""
+PC-BASIC - data package
+Compiled resource cache
+
+(c) 2013--2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import marshal
+import hashlib
+import logging
+import tempfile
+
+from ..metadata import VERSION
+
+# increase when the layout of cached objects changes
+CACHE_FORMAT = 1
+CACHE_PATTERN = u'{name}-{key}.cache'
+
+
+def get_signature(paths):
+    """Modification time and size of source files; None for missing files."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime, stat.st_size))
+        except EnvironmentError:
+            signature.append((path, None, None))
+    return signature
+
+def get_cached(cache_dir, name, key, paths, build):
+    """Retrieve a resource from the cache, or build and store it if not present or outdated."""
+    if not cache_dir:
+        return build()
+    # the key separates variants of the same resource, e.g. subsets for different codepages
+    filename = os.path.join(cache_dir, CACHE_PATTERN.format(
+        name=name, key=hashlib.md5(repr(key)).hexdigest()[:16]
+    ))
+    signature = repr((CACHE_FORMAT, VERSION, key, get_signature(paths)))
+    try:
+        with open(filename, 'rb') as cache_file:
+            cached_signature, obj = marshal.loads(cache_file.read())
+        if cached_signature == signature:
+            return obj
+    except EnvironmentError:
+        pass
+    except (ValueError, EOFError, TypeError) as e:
+        logging.debug('Discarding unreadable resource cache %s: %s', filename, e)
+    obj = build()
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        # write to a temporary file first so that other processes never see a partial cache
+        handle, temp_name = tempfile.mkstemp(dir=cache_dir)
+        with os.fdopen(handle, 'wb') as cache_file:
+            cache_file.write(marshal.dumps((signature, obj)))
+        try:
+            if os.path.exists(filename):
+                # on Windows, rename does not replace an existing file
+                os.remove(filename)
+            os.rename(temp_name, filename)
+        finally:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+    except (EnvironmentError, ValueError) as e:
+        logging.debug('Could not write resource cache %s: %s', filename, e)
+    return obj
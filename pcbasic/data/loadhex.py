@@ -7,23 +7,41 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import sys
-import pkg_resources
+import marshal
+import hashlib
 import logging
 import binascii
 
 from ..basic.codepage import PRINTABLE_ASCII
-from .resources import get_data, ResourceFailed
+from .resources import get_data, get_path, listdir, ResourceFailed
+from .cache import get_cached
 
 FONT_DIR = u'fonts'
 FONT_PATTERN = u'{path}/{name}_{height:02d}.hex'
 FONTS = sorted(
     set(name.split(u'_', 1)[0]
-    for name in pkg_resources.resource_listdir(__name__, FONT_DIR)
+    for name in listdir(FONT_DIR)
     if name.lower().endswith(u'.hex'))
 )
 
 
-def read_fonts(codepage_dict, font_families, warn):
+def read_fonts(codepage_dict, font_families, warn, cache_dir=None):
+    """Load font typefaces, through the cache if given."""
+    if warn or not cache_dir:
+        # parse the font files, reporting on missing glyphs if requested
+        return _parse_fonts(codepage_dict, font_families, warn)
+    # cached fonts are subsets for a given codepage
+    codepage_key = hashlib.md5(marshal.dumps(sorted(codepage_dict.iteritems()))).hexdigest()
+    return get_cached(
+        cache_dir, u'font', (tuple(font_families), codepage_key),
+        [
+            get_path(FONT_PATTERN, path=FONT_DIR, name=name, height=height)
+            for height in (16, 14, 8) for name in font_families
+        ],
+        lambda: _parse_fonts(codepage_dict, font_families, warn)
+    )
+
+def _parse_fonts(codepage_dict, font_families, warn):
     """Load font typefaces."""
     # load the graphics fonts, including the 8-pixel RAM font
     # use set() for speed - lookup is O(1) rather than O(n) for list
@@ -6,22 +6,30 @@ UCP codepage loader
 This file is released under the GNU GPL version 3 or later.
 """
 
-import pkg_resources
 import logging
 import binascii
 
-from .resources import get_data
+from .resources import get_data, get_path, listdir
+from .cache import get_cached
 
 CODEPAGE_DIR = u'codepages'
 CODEPAGE_PATTERN = u'{path}/{name}.ucp'
 CODEPAGES = [
     name.split(u'.', 1)[0]
-    for name in pkg_resources.resource_listdir(__name__, CODEPAGE_DIR)
+    for name in listdir(CODEPAGE_DIR)
     if name.lower().endswith(u'.ucp')
 ]
 
 
-def read_codepage(codepage_name):
+def read_codepage(codepage_name, cache_dir=None):
+    """Read a codepage file and convert to codepage dict, through the cache if given."""
+    return get_cached(
+        cache_dir, u'codepage', codepage_name,
+        [get_path(CODEPAGE_PATTERN, path=CODEPAGE_DIR, name=codepage_name)],
+        lambda: _parse_codepage(codepage_name)
+    )
+
+def _parse_codepage(codepage_name):
     """Read a codepage file and convert to codepage dict."""
     codepage = {}
     for line in get_data(CODEPAGE_PATTERN, path=CODEPAGE_DIR, name=codepage_name).splitlines():
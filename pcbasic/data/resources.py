@@ -6,11 +6,23 @@ Fonts, codepages and BASIC resources
 This file is released under the GNU GPL version 3 or later.
 """
 
-import pkg_resources
+import os
+import io
+
+from ..compat import BASE_DIR
+
+# use BASE_DIR as __file__ is undefined in frozen packages
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+
+def listdir(path):
+    """List the bundled resources in a data subdirectory."""
+    return os.listdir(os.path.join(DATA_DIR, path))
+
 
 PROGRAM_DIR = u'programs'
 PROGRAM_PATTERN = u'{path}/{name}'
-PROGRAMS = (name for name in pkg_resources.resource_listdir(__name__, PROGRAM_DIR) if name.lower().endswith(u'.bas'))
+PROGRAMS = (name for name in listdir(PROGRAM_DIR) if name.lower().endswith(u'.bas'))
 
 ICON = [
     [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
@@ -48,16 +60,17 @@ class ResourceFailed(Exception):
 # resource readers
 
 def get_data(pattern, **kwargs):
-    """Wrapper for resource_string."""
+    """Read a bundled resource."""
     name = pattern.format(**kwargs)
     try:
-        # this should return None if not available, I thought, but it doesn't
-        resource = pkg_resources.resource_string(__name__, name)
+        with io.open(get_path(pattern, **kwargs), 'rb') as f:
+            return f.read()
     except EnvironmentError:
         raise ResourceFailed(name)
-    if resource is None:
-        raise ResourceFailed(name)
-    return resource
+
+def get_path(pattern, **kwargs):
+    """Location of a bundled resource in the file system."""
+    return os.path.join(DATA_DIR, *pattern.format(**kwargs).split(u'/'))
 
 def read_program_file(name):
     """Read a bundled BASIC program file."""
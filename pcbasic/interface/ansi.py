@@ -43,6 +43,8 @@ SET_CURSOR_COLOUR = u'\x1B]12;%s\a'
 # 1 blinking block 2 block 3 blinking line 4 line
 SET_CURSOR_SHAPE = u'\x1B[%i q'
 SET_COLOUR = u'\x1B[%im'
+# semicolon-separated list of colour parameters
+SET_COLOURS = u'\x1B[%sm'
 SET_TITLE = u'\x1B]2;%s\a'
 MOVE_RIGHT = u'\x1B[C'
 MOVE_LEFT = u'\x1B[D'
@@ -7,6 +7,7 @@ This file is released under the GNU GPL version 3 or later.
 """
 
 import os
+import importlib
 
 
 # message displayed when wiating to close
@@ -28,9 +29,10 @@ class InitFailed(Exception):
 class PluginRegister(object):
     """Plugin register."""
 
-    def __init__(self):
-        """Initialise plugin register."""
+    def __init__(self, modules):
+        """Initialise plugin register with a map of plugin names to the modules that define them."""
         self._plugins = {}
+        self._modules = modules
 
     def register(self, name):
         """Decorator to register a plugin."""
@@ -40,7 +42,9 @@ class PluginRegister(object):
         return decorated_plugin
 
     def __getitem__(self, name):
-        """Retrieve plugin."""
+        """Retrieve plugin, importing its module on first use."""
+        if name not in self._plugins and name in self._modules:
+            importlib.import_module(self._modules[name], __name__.rpartition('.')[0])
         return self._plugins[name]
 
 
@@ -87,5 +91,18 @@ class EnvironmentCache(object):
 ###############################################################################
 # plugin registers
 
-video_plugins = PluginRegister()
-audio_plugins = PluginRegister()
+# plugin modules are only imported when selected, to keep startup fast
+video_plugins = PluginRegister({
+    'cli': '.video_cli',
+    'ansi': '.video_ansi',
+    'curses': '.video_curses',
+    'pygame': '.video_pygame',
+    'sdl2': '.video_sdl2',
+    'record': '.video_record',
+})
+audio_plugins = PluginRegister({
+    'beep': '.audio_beep',
+    'pygame': '.audio_pygame',
+    'sdl2': '.audio_sdl2',
+    'portaudio': '.audio_portaudio',
+})
@@ -41,6 +41,27 @@ else:
 AMPLITUDE[0] = 0
 
 
+# bit sequences of LFSR cycles, by feedback and register state
+# values are (bits, states, index of the state in the cycle)
+_cycles = {}
+
+def _add_cycle(feedback, lfsr):
+    """Tabulate the LFSR cycle through the given state; False if it is not on a cycle."""
+    bits, states, seen = [], [], set()
+    state = lfsr
+    while state not in seen:
+        seen.add(state)
+        states.append(state)
+        bits.append(state & 1)
+        state = (state >> 1) ^ (feedback if state & 1 else 0)
+    if state != lfsr:
+        return False
+    bits, states = numpy.array(bits, numpy.int8), numpy.array(states)
+    for index, state in enumerate(states):
+        _cycles[feedback, state] = bits, states, index
+    return True
+
+
 class SignalSource(object):
     """Linear Feedback Shift Register to generate noise or tone."""
 
@@ -61,6 +82,25 @@ class SignalSource(object):
         self.bit = bit
         return bit
 
+    def next_bits(self, count):
+        """Get an array of sample bits."""
+        # step through any states that lead into a cycle but are not on it
+        head = []
+        while (
+                count and (self.feedback, self.lfsr) not in _cycles
+                and not _add_cycle(self.feedback, self.lfsr)
+            ):
+            head.append(self.next())
+            count -= 1
+        if not count:
+            return numpy.array(head, numpy.int8)
+        bits, states, index = _cycles[self.feedback, self.lfsr]
+        period = len(bits)
+        tail = bits[numpy.arange(index, index + count) % period]
+        self.lfsr = int(states[(index + count) % period])
+        self.bit = int(tail[-1])
+        return numpy.append(numpy.array(head, numpy.int8), tail)
+
 
 class SoundGenerator(object):
     """Sound sample chunk generator."""
@@ -92,56 +132,37 @@ class SoundGenerator(object):
         # work on last element of sound queue
         if self.frequency == 0:
             chunk = numpy.zeros(length, numpy.int16)
+            self.signal_source.phase = 0.
         else:
-            half_wavelength = SAMPLE_RATE / (2.*self.frequency)
-            # resolution for averaging
-            resolution = 20
-            # generate first half-wave so as to complete the last one played
-            if self.signal_source.phase:
-                bit = -self.amplitude if self.signal_source.bit else self.amplitude
-                first_length = int(half_wavelength * self.signal_source.phase)
-                matrix = numpy.repeat(numpy.array([bit], numpy.int16), first_length * resolution)
-                length -= first_length
-                self.signal_source.phase = 0.
-            else:
-                matrix = numpy.array([], numpy.int16)
-            num_half_waves = int(ceil(length / half_wavelength))
-            # generate bits
-            bits = [
-                -self.amplitude if self.signal_source.next() else self.amplitude
-                for _ in xrange(num_half_waves)
-            ]
-            # do sampling by averaging the signal over bins of given resolution
-            # this allows to use numpy all the way
-            # which is *much* faster than looping over an array
-            # stretch array by half_wavelength * resolution
-            matrix = numpy.append(
-                matrix,
-                numpy.repeat(numpy.array(bits, numpy.int16), int(half_wavelength * resolution))
-            )
-            # cut off on round number of resolution blocks
-            matrix = matrix[:len(matrix)-(len(matrix)%resolution)]
-            # average over blocks
-            matrix = matrix.reshape((len(matrix)//resolution, resolution))
-            chunk = numpy.int16(numpy.mean(matrix, axis=1))
-        if not self.loop:
-            # last chunk is shorter
-            if self.count_samples + len(chunk) < self.num_samples:
-                self.count_samples += len(chunk)
-            else:
-                # append final chunk
-                rest_length = self.num_samples - self.count_samples
-                # keep track of remaining phase to avoid ticks
-                if self.frequency:
-                    self.signal_source.phase = float(len(chunk) - rest_length) / half_wavelength
-                else:
-                    self.signal_source.phase = 0.
-                chunk = chunk[:rest_length]
-                # done
-                self.count_samples = self.num_samples
+            chunk = self._build_wave(length)
         # if loop, attach one chunk to loop, do not increment count
+        if not self.loop:
+            self.count_samples += length
         return chunk
 
+    def _build_wave(self, length):
+        """Sample the square wave by averaging it exactly over each sample interval."""
+        source = self.signal_source
+        half_wavelength = SAMPLE_RATE / (2.*self.frequency)
+        # sample boundaries, in units of half-waves
+        edges = numpy.arange(length + 1) / half_wavelength
+        # first complete the half-wave left over from the last chunk, then continue with new ones
+        phase = source.phase
+        count = max(0, int(ceil(edges[-1] - phase)))
+        bits = numpy.append(source.bit, source.next_bits(count))
+        values = float(self.amplitude) * (1 - 2*bits.astype(float))
+        starts = numpy.arange(-1., count) + phase
+        starts[0] = 0.
+        widths = numpy.diff(numpy.append(starts, phase + count))
+        # integral of the signal up to the start of each half-wave
+        before = numpy.cumsum(values * widths) - values * widths
+        # half-wave in which each sample boundary falls
+        index = numpy.clip(numpy.floor(edges - phase).astype(int) + 1, 0, count)
+        integral = before[index] + (edges - starts[index]) * values[index]
+        # keep track of remaining phase to avoid ticks
+        source.phase = phase + count - edges[-1] if count else phase - edges[-1]
+        return (numpy.diff(integral) * half_wavelength).astype(numpy.int16)
+
 
 def get_signal_sources():
     """Return three tone voices plus a noise source."""
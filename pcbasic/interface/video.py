@@ -26,6 +26,7 @@ class VideoPlugin(object):
             signals.VIDEO_PUT_GLYPH: self.put_glyph,
             signals.VIDEO_CLEAR_ROWS: self.clear_rows,
             signals.VIDEO_SCROLL_UP: self.scroll_up,
+            signals.VIDEO_SCROLL_UP_LINES: self.scroll_up_lines,
             signals.VIDEO_SCROLL_DOWN: self.scroll_down,
             signals.VIDEO_SET_PALETTE: self.set_palette,
             signals.VIDEO_SET_CURSOR_SHAPE: self.set_cursor_shape,
@@ -44,6 +45,7 @@ class VideoPlugin(object):
             signals.VIDEO_FILL_RECT: self.fill_rect,
             signals.VIDEO_SET_CAPTION: self.set_caption_message,
             signals.VIDEO_SET_CLIPBOARD_TEXT: self.set_clipboard_text,
+            signals.VIDEO_MARK_FRAME: self.mark_frame,
         }
 
     # called by Interface
@@ -106,6 +108,9 @@ class VideoPlugin(object):
     def set_clipboard_text(self, text, mouse):
         """Put text on the clipboard."""
 
+    def mark_frame(self):
+        """Mark a point where the screen is complete, before waiting for input."""
+
     def set_palette(self, rgb_palette_0, rgb_palette_1):
         """Build the palette."""
 
@@ -136,6 +141,11 @@ class VideoPlugin(object):
     def scroll_up(self, from_line, scroll_height, back_attr):
         """Scroll the screen up between from_line and scroll_height."""
 
+    def scroll_up_lines(self, from_line, scroll_height, back_attr, num_lines):
+        """Scroll the screen up by a number of lines."""
+        for _ in range(num_lines):
+            self.scroll_up(from_line, scroll_height, back_attr)
+
     def scroll_down(self, from_line, scroll_height, back_attr):
         """Scroll the screen down between from_line and scroll_height."""
 
@@ -13,7 +13,13 @@ from .video import VideoPlugin
 from .base import video_plugins
 from . import video_cli
 from . import ansi
-from ..compat import console, TERM_SIZE
+from ..compat import TERM_SIZE
+
+
+# default attribute for cleared cells
+DEFAULT_ATTR = (7, 0, False, False)
+# unchanged cells to rewrite rather than break a span with a cursor move
+SPAN_GAP = 4
 
 
 @video_plugins.register('ansi')
@@ -40,9 +46,16 @@ class VideoANSI(video_cli.VideoTextBase):
         self.height = 25
         self.width = 80
         self._set_default_colours(16)
-        self.text = [[[(u' ', (7, 0, False, False))]*80 for _ in range(25)]]
+        self.text = [self._blank_rows(self.height)]
+        # shadow of what the terminal shows; None for cells in unknown state
+        self._shown = [[None]*self.width for _ in range(self.height)]
+        # terminal print position, None if unknown
+        self._term_pos = None
+        # scroll and clear operations to be sent before the next frame's text
+        self._ops = []
+        # the visible screen may have changed since the last frame
+        self._dirty = True
         self.logger = logging.getLogger()
-        #console.flush()
 
     def __enter__(self):
         """Open ANSI interface."""
@@ -54,12 +67,12 @@ class VideoANSI(video_cli.VideoTextBase):
     def __exit__(self, type, value, traceback):
         """Close ANSI interface."""
         try:
-            console.write(ansi.SET_COLOUR % 0)
-            console.write(ansi.RESIZE_TERM % TERM_SIZE)
-            console.write(ansi.CLEAR_SCREEN)
-            console.write(ansi.MOVE_CURSOR % (1, 1))
+            self._write(ansi.SET_COLOUR % 0)
+            self._write(ansi.RESIZE_TERM % TERM_SIZE)
+            self._write(ansi.CLEAR_SCREEN)
+            self._write(ansi.MOVE_CURSOR % (1, 1))
             self.show_cursor(True)
-            #console.flush()
+            self._flush_frame()
             # re-enable logger
             self.logger.disabled = False
         finally:
@@ -67,17 +80,100 @@ class VideoANSI(video_cli.VideoTextBase):
 
     def _work(self):
         """Handle screen and interface events."""
+        if not self._frame_due():
+            return
+        if self._dirty:
+            self._draw_frame()
+        self._flush_frame()
 
-    def _redraw(self):
-        """Redraw the screen."""
-        console.write(ansi.CLEAR_SCREEN)
+    def _blank_rows(self, num, attr=DEFAULT_ATTR):
+        """Create empty text rows."""
+        return [[(u' ', attr)]*self.width for _ in range(num)]
+
+    def _draw_frame(self):
+        """Bring the terminal up to date with the visible page."""
+        for op, args in self._ops:
+            op(*args)
+        self._ops = []
         for row, textrow in enumerate(self.text[self.vpagenum]):
-            console.write(ansi.MOVE_CURSOR % (row+1, 1))
-            for col, charattr in enumerate(textrow):
-                self._set_attributes(*charattr[1])
-                console.write(charattr[0])
-        console.write(ansi.MOVE_CURSOR % (self.cursor_row, self.cursor_col))
-        #console.flush()
+            if textrow != self._shown[row]:
+                self._draw_row_diff(row, textrow, self._shown[row])
+        if self._term_pos != (self.cursor_row, self.cursor_col):
+            self._write(ansi.MOVE_CURSOR % (self.cursor_row, self.cursor_col))
+            self._term_pos = self.cursor_row, self.cursor_col
+        self._dirty = False
+
+    def _draw_row_diff(self, row, textrow, shownrow):
+        """Send the spans of a row that differ from the terminal."""
+        changed = [col for col in xrange(self.width) if textrow[col] != shownrow[col]]
+        start = stop = changed[0]
+        for col in changed[1:]:
+            if col - stop > SPAN_GAP:
+                self._draw_span(row, start, stop)
+                start = col
+            stop = col
+        self._draw_span(row, start, stop)
+
+    def _draw_span(self, row, start, stop):
+        """Send a run of cells in a row to the terminal."""
+        textrow = self.text[self.vpagenum][row]
+        # include both halves of fullwidth characters
+        if start > 0 and textrow[start][0] == u'':
+            start -= 1
+        if stop < self.width-1 and textrow[stop+1][0] == u'':
+            stop += 1
+        if self._term_pos != (row+1, start+1):
+            self._write(ansi.MOVE_CURSOR % (row+1, start+1))
+        for char, attr in textrow[start:stop+1]:
+            # second half of a fullwidth character: the terminal has already advanced
+            if char:
+                self._set_attributes(*attr)
+                self._write(char)
+        self._shown[row][start:stop+1] = textrow[start:stop+1]
+        # after writing in the last column, the terminal may or may not have wrapped
+        self._term_pos = (row+1, stop+2) if stop < self.width-1 else None
+
+    def _draw_clear(self, start, stop, back_attr):
+        """Clear rows on the terminal."""
+        self._set_attributes(7, back_attr, False, False)
+        for row in range(start, stop+1):
+            self._write(ansi.MOVE_CURSOR % (row, 1))
+            self._write(ansi.CLEAR_LINE)
+        self._term_pos = stop, 1
+
+    def _draw_scroll(self, from_line, scroll_height, back_attr, num, scroll):
+        """Scroll a region of the terminal."""
+        self._set_attributes(7, back_attr, False, False)
+        self._write(ansi.SET_SCROLL_REGION % (from_line, scroll_height))
+        self._write(scroll % num)
+        self._write(ansi.SET_SCROLL_SCREEN)
+        # setting the scroll region moves the cursor on some terminals
+        self._term_pos = None
+
+    def _draw_mode(self):
+        """Resize and clear the terminal."""
+        self._write(ansi.RESIZE_TERM % (self.height, self.width))
+        self._set_attributes(*DEFAULT_ATTR)
+        self._write(ansi.CLEAR_SCREEN)
+        self._term_pos = None
+
+    def _queue_scroll(self, from_line, scroll_height, back_attr, scroll, num=1):
+        """Queue a terminal scroll, merging with a preceding one."""
+        if from_line >= scroll_height:
+            # terminals ignore single-line scroll regions
+            self._ops.append((self._draw_clear, (from_line, from_line, back_attr)))
+            return
+        # no point scrolling further once the whole region is blank
+        height = scroll_height - from_line + 1
+        if self._ops:
+            op, args = self._ops[-1]
+            if op == self._draw_scroll and args[:3] + args[4:] == (
+                    from_line, scroll_height, back_attr, scroll):
+                self._ops[-1] = op, args[:3] + (min(height, args[3]+num), scroll)
+                return
+        self._ops.append((
+            self._draw_scroll, (from_line, scroll_height, back_attr, min(height, num), scroll)
+        ))
 
     def _set_default_colours(self, num_attr):
         """Set colours for default palette."""
@@ -99,26 +195,24 @@ class VideoANSI(video_cli.VideoTextBase):
         else:
             fore = 90 + self.default_colours[fore%8]
         back = 40 + self.default_colours[back%8]
-        console.write(ansi.SET_COLOUR % 0)
-        console.write(ansi.SET_COLOUR % back)
-        console.write(ansi.SET_COLOUR % fore)
         if blink:
-            console.write(ansi.SET_COLOUR % 5)
-        #console.flush()
+            self._write(ansi.SET_COLOURS % (u'0;%i;%i;5' % (back, fore)))
+        else:
+            self._write(ansi.SET_COLOURS % (u'0;%i;%i' % (back, fore)))
 
     def set_mode(self, mode_info):
         """Change screen mode."""
         self.height = mode_info.height
         self.width = mode_info.width
         self.num_pages = mode_info.num_pages
-        self.text = [[[(u' ', (7, 0, False, False))]*self.width
-                            for _ in range(self.height)]
-                            for _ in range(self.num_pages)]
+        self.text = [self._blank_rows(self.height) for _ in range(self.num_pages)]
         self._set_default_colours(len(mode_info.palette))
-        console.write(ansi.RESIZE_TERM % (self.height, self.width))
-        self._set_attributes(7, 0, False, False)
-        console.write(ansi.CLEAR_SCREEN)
-        #console.flush()
+        # the colour table has changed, so the attribute needs to be resent
+        self.last_attributes = None
+        # earlier operations are wiped out by the clear
+        self._ops = [(self._draw_mode, ())]
+        self._shown = self._blank_rows(self.height)
+        self._dirty = True
         return True
 
     def set_page(self, new_vpagenum, new_apagenum):
@@ -126,48 +220,42 @@ class VideoANSI(video_cli.VideoTextBase):
         if (self.vpagenum, self.apagenum) == (new_vpagenum, new_apagenum):
             return
         self.vpagenum, self.apagenum = new_vpagenum, new_apagenum
-        self._redraw()
+        self._dirty = True
 
     def copy_page(self, src, dst):
         """Copy screen pages."""
         self.text[dst] = [row[:] for row in self.text[src]]
         if dst == self.vpagenum:
-            self._redraw()
+            self._dirty = True
 
     def clear_rows(self, back_attr, start, stop):
         """Clear screen rows."""
-        self.text[self.apagenum][start-1:stop] = [
-            [(u' ', (7, 0, False, False))]*len(self.text[self.apagenum][0])
-                        for _ in range(start-1, stop)]
+        attr = (7, back_attr, False, False)
+        self.text[self.apagenum][start-1:stop] = self._blank_rows(stop-start+1, attr)
         if self.vpagenum == self.apagenum:
-            self._set_attributes(7, back_attr, False, False)
-            for r in range(start, stop+1):
-                console.write(ansi.MOVE_CURSOR % (r, 1))
-                console.write(ansi.CLEAR_LINE)
-            console.write(ansi.MOVE_CURSOR % (self.cursor_row, self.cursor_col))
-            #console.flush()
+            self._ops.append((self._draw_clear, (start, stop, back_attr)))
+            self._shown[start-1:stop] = self._blank_rows(stop-start+1, attr)
+            self._dirty = True
 
     def move_cursor(self, row, col):
         """Move the cursor to a new position."""
         if (row, col) != (self.cursor_row, self.cursor_col):
             self.cursor_row, self.cursor_col = row, col
-            console.write(ansi.MOVE_CURSOR % (self.cursor_row, self.cursor_col))
-            #console.flush()
+            self._dirty = True
 
     def set_cursor_attr(self, attr):
         """Change attribute of cursor."""
-        #console.write(ansi.SET_CURSOR_COLOUR % ansi.COLOUR_NAMES[attr%16])
+        #self._write(ansi.SET_CURSOR_COLOUR % ansi.COLOUR_NAMES[attr%16])
 
     def show_cursor(self, cursor_on):
         """Change visibility of cursor."""
         self.cursor_visible = cursor_on
         if cursor_on:
-            console.write(ansi.SHOW_CURSOR)
-            #console.write(ansi.SET_CURSOR_SHAPE % cursor_shape)
+            self._write(ansi.SHOW_CURSOR)
+            #self._write(ansi.SET_CURSOR_SHAPE % cursor_shape)
         else:
             # force move when made visible again
-            console.write(ansi.HIDE_CURSOR)
-        #console.flush()
+            self._write(ansi.HIDE_CURSOR)
 
     def set_cursor_shape(self, width, height, from_line, to_line):
         """Set the cursor shape."""
@@ -178,8 +266,7 @@ class VideoANSI(video_cli.VideoTextBase):
         # 1 blinking block 2 block 3 blinking line 4 line
         if self.cursor_visible:
             pass
-            #console.write(ansi.SET_CURSOR_SHAPE % cursor_shape)
-            #console.flush()
+            #self._write(ansi.SET_CURSOR_SHAPE % cursor_shape)
 
     def put_glyph(self, pagenum, row, col, char, is_fullwidth, fore, back, blink, underline):
         """Put a character at a given position."""
@@ -188,45 +275,42 @@ class VideoANSI(video_cli.VideoTextBase):
         self.text[pagenum][row-1][col-1] = char, (fore, back, blink, underline)
         if is_fullwidth:
             self.text[pagenum][row-1][col] = u'', (fore, back, blink, underline)
-        if self.vpagenum != pagenum:
-            return
-        if (row, col) != (self.cursor_row, self.cursor_col):
-            console.write(ansi.MOVE_CURSOR % (row, col))
-        self._set_attributes(fore, back, blink, underline)
-        console.write(char)
-        if is_fullwidth:
-            console.write(u' ')
-        self.cursor_row, self.cursor_col = row, col+1
-        #console.flush()
+        if self.vpagenum == pagenum:
+            self._dirty = True
 
     def scroll_up(self, from_line, scroll_height, back_attr):
         """Scroll the screen up between from_line and scroll_height."""
+        self.scroll_up_lines(from_line, scroll_height, back_attr, 1)
+
+    def scroll_up_lines(self, from_line, scroll_height, back_attr, num_lines):
+        """Scroll the screen up by a number of lines."""
+        attr = (7, back_attr, False, False)
         self.text[self.apagenum][from_line-1:scroll_height] = (
-                self.text[self.apagenum][from_line:scroll_height] +
-                [[(u' ', 0)]*len(self.text[self.apagenum][0])])
+                self.text[self.apagenum][from_line-1+num_lines:scroll_height]
+                + self._blank_rows(num_lines, attr))
         if self.apagenum != self.vpagenum:
             return
-        console.write(ansi.SET_SCROLL_REGION % (from_line, scroll_height))
-        console.write(ansi.SCROLL_UP % 1)
-        console.write(ansi.SET_SCROLL_SCREEN)
-        self.clear_rows(back_attr, scroll_height, scroll_height)
+        self._queue_scroll(from_line, scroll_height, back_attr, ansi.SCROLL_UP, num_lines)
+        self._shown[from_line-1:scroll_height] = (
+                self._shown[from_line-1+num_lines:scroll_height]
+                + self._blank_rows(num_lines, attr))
+        self._dirty = True
 
     def scroll_down(self, from_line, scroll_height, back_attr):
         """Scroll the screen down between from_line and scroll_height."""
+        attr = (7, back_attr, False, False)
         self.text[self.apagenum][from_line-1:scroll_height] = (
-                [[(u' ', 0)]*len(self.text[self.apagenum][0])] +
-                self.text[self.apagenum][from_line-1:scroll_height-1])
+                self._blank_rows(1, attr) + self.text[self.apagenum][from_line-1:scroll_height-1])
         if self.apagenum != self.vpagenum:
             return
-        console.write(ansi.SET_SCROLL_REGION % (from_line, scroll_height))
-        console.write(ansi.SCROLL_DOWN % 1)
-        console.write(ansi.SET_SCROLL_SCREEN)
-        self.clear_rows(back_attr, from_line, from_line)
+        self._queue_scroll(from_line, scroll_height, back_attr, ansi.SCROLL_DOWN)
+        self._shown[from_line-1:scroll_height] = (
+                self._blank_rows(1, attr) + self._shown[from_line-1:scroll_height-1])
+        self._dirty = True
 
     def set_caption_message(self, msg):
         """Add a message to the window caption."""
         if msg:
-            console.write(ansi.SET_TITLE % (self.caption + u' - ' + msg))
+            self._write(ansi.SET_TITLE % (self.caption + u' - ' + msg))
         else:
-            console.write(ansi.SET_TITLE % self.caption)
-        #console.flush()
+            self._write(ansi.SET_TITLE % self.caption)
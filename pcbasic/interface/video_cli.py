@@ -17,7 +17,7 @@ from .base import video_plugins, InitFailed
 from ..basic.base import signals
 from ..basic.base import scancode
 from ..basic.base.eascii import as_unicode as uea
-from ..compat import UEOF, console
+from ..compat import UEOF, console, monotonic
 
 
 # escape sequence to scancode
@@ -44,6 +44,9 @@ ESC_TO_EASCII = {
     ansi.DELETE: uea.DELETE,  ansi.PAGEUP: uea.PAGEUP,  ansi.PAGEDOWN: uea.PAGEDOWN,
     }
 
+# minimum time between terminal frames, in seconds
+FRAME_INTERVAL = 1./30.
+
 
 class VideoTextBase(VideoPlugin):
     """Text-based interface."""
@@ -57,6 +60,10 @@ class VideoTextBase(VideoPlugin):
         VideoPlugin.__init__(self, input_queue, video_queue)
         # start the stdin thread for non-blocking reads
         self._input_handler = InputHandlerCLI(input_queue)
+        # output collected for the next frame
+        self._frame = []
+        # monotonic time of the last frame
+        self._last_frame = -FRAME_INTERVAL
 
     def __enter__(self):
         """Open text-based interface."""
@@ -74,6 +81,24 @@ class VideoTextBase(VideoPlugin):
         """Handle keyboard events."""
         self._input_handler.drain_queue()
 
+    def _write(self, unicode_str):
+        """Queue output for the next frame."""
+        self._frame.append(unicode_str)
+
+    def _flush_frame(self):
+        """Write the queued output to the console in one go."""
+        if self._frame:
+            console.write(u''.join(self._frame))
+            self._frame = []
+
+    def _frame_due(self):
+        """Check if enough time has passed to draw a new frame."""
+        now = monotonic()
+        if now - self._last_frame < FRAME_INTERVAL:
+            return False
+        self._last_frame = now
+        return True
+
 
 @video_plugins.register('cli')
 class VideoCLI(VideoTextBase):
@@ -98,7 +123,8 @@ class VideoCLI(VideoTextBase):
         """Close command-line interface."""
         try:
             if self._col != 1:
-                console.write(u'\r\n')
+                self._write(u'\r\n')
+            self._flush_frame()
         finally:
             VideoTextBase.__exit__(self, type, value, traceback)
 
@@ -108,6 +134,8 @@ class VideoCLI(VideoTextBase):
         # or if actual printing takes place on the new cursor row
         if self._cursor_row != self._last_row or self._cursor_col != self._col:
             self._update_position(self._cursor_row, self._cursor_col)
+        if self._frame_due():
+            self._flush_frame()
 
     ###############################################################################
 
@@ -123,8 +151,7 @@ class VideoCLI(VideoTextBase):
             # may have to update row!
             if row != self._last_row or col != self._col:
                 self._update_position(row, col)
-            console.write(char)
-            #console.flush()
+            self._write(char)
             self._col = (col+2) if is_fullwidth else (col+1)
         # the terminal cursor has moved, so we'll need to move it back later
         # if that's not where we want to be
@@ -145,8 +172,7 @@ class VideoCLI(VideoTextBase):
         if (self._vpagenum == self._apagenum and
                 start <= self._cursor_row and stop >= self._cursor_row):
             self._update_position(self._cursor_row, 1)
-            console.write(ansi.CLEAR_LINE)
-            #console.flush()
+            self._write(ansi.CLEAR_LINE)
 
     def scroll_up(self, from_line, scroll_height, back_attr):
         """Scroll the screen up between from_line and scroll_height."""
@@ -156,8 +182,7 @@ class VideoCLI(VideoTextBase):
             )
         if self._vpagenum != self._apagenum:
             return
-        console.write(u'\r\n')
-        #console.flush()
+        self._write(u'\r\n')
 
     def scroll_down(self, from_line, scroll_height, back_attr):
         """Scroll the screen down between from_line and scroll_height."""
@@ -190,17 +215,15 @@ class VideoCLI(VideoTextBase):
             return
         self._update_col(1)
         rowtext = (u''.join(self._text[self._vpagenum][row-1]))
-        console.write(rowtext.replace(u'\0', u' '))
+        self._write(rowtext.replace(u'\0', u' '))
         self._col = len(self._text[self._vpagenum][row-1])+1
-        #console.flush()
 
     def _update_position(self, row, col):
         """Move terminal print location."""
         # move cursor if necessary
         if row and row != self._last_row:
             if self._last_row:
-                console.write(u'\r\n')
-                #console.flush()
+                self._write(u'\r\n')
                 self._col = 1
             self._last_row = row
             # show what's on the line where we are.
@@ -211,11 +234,9 @@ class VideoCLI(VideoTextBase):
         """Move terminal print column."""
         if col != self._col:
             if self._col > col:
-                console.write(ansi.MOVE_N_LEFT % (self._col-col))
-                #console.flush()
+                self._write(ansi.MOVE_N_LEFT % (self._col-col))
             elif self._col < col:
-                console.write(ansi.MOVE_N_RIGHT % (col-self._col))
-                #console.flush()
+                self._write(ansi.MOVE_N_RIGHT % (col-self._col))
             self._col = col
 
 
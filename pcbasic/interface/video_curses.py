@@ -386,22 +386,26 @@ class VideoCurses(VideoPlugin):
 
     def scroll_up(self, from_line, scroll_height, back_attr):
         """Scroll the screen up between from_line and scroll_height."""
+        self.scroll_up_lines(from_line, scroll_height, back_attr, 1)
+
+    def scroll_up_lines(self, from_line, scroll_height, back_attr, num_lines):
+        """Scroll the screen up by a number of lines."""
         bgcolor = self._curses_colour(7, back_attr, False)
         self.text[self.apagenum][from_line-1:scroll_height] = (
-            self.text[self.apagenum][from_line:scroll_height]
-            + [[(u' ', bgcolor)] * len(self.text[self.apagenum][0])]
+            self.text[self.apagenum][from_line-1+num_lines:scroll_height]
+            + [[(u' ', bgcolor)] * len(self.text[self.apagenum][0]) for _ in range(num_lines)]
         )
         if self.apagenum != self.vpagenum:
             return
         self.window.scrollok(True)
         self.window.setscrreg(from_line-1, scroll_height-1)
         try:
-            self.window.scroll(1)
+            self.window.scroll(num_lines)
         except curses.error:
             pass
         self.window.scrollok(False)
         self.window.setscrreg(1, self.height-1)
-        self.clear_rows(back_attr, scroll_height, scroll_height)
+        self.clear_rows(back_attr, scroll_height-num_lines+1, scroll_height)
         if self.cursor_row > 1:
             self.window.move(self.cursor_row-2, self.cursor_col-1)
 
@@ -109,8 +109,15 @@ class VideoPygame(VideoPlugin):
         # buffer for text under cursor
         self.under_top_left = None
         # fonts
-        # prebuilt glyphs
+        # prebuilt glyph masks
         self.glyph_dict = {}
+        # glyph surfaces by code point and colours
+        self._glyph_surfaces = {}
+        # glyphs drawn in text cells
+        self._cells = None
+        # work surfaces for display update, in 8-bit and display format
+        self._screen = None
+        self._screen_rgb = None
         # joystick and mouse
         # available joysticks
         self.joysticks = []
@@ -357,11 +364,12 @@ class VideoPygame(VideoPlugin):
         """Draw the canvas to the screen."""
         # create the screen that will be stretched onto the display
         border_x, border_y = self._window_sizer.border_start()
-        # surface depth and flags match those of canvas
-        # pylint: disable=E1121,E1123
-        screen = pygame.Surface(
-            (self.size[0] + 2*border_x, self.size[1] + 2*border_y),
-            0, self.canvas[self.vpagenum])
+        screen_size = (self.size[0] + 2*border_x, self.size[1] + 2*border_y)
+        if not self._screen or self._screen.get_size() != screen_size:
+            # surface depth and flags match those of canvas
+            # pylint: disable=E1121,E1123
+            self._screen = pygame.Surface(screen_size, 0, self.canvas[self.vpagenum])
+        screen = self._screen
         screen.set_palette(self.work_palette)
         # border colour
         border_colour = pygame.Color(0, 0, self.border_attr % self.num_fore_attrs)
@@ -375,12 +383,15 @@ class VideoPygame(VideoPlugin):
         if self._composite:
             screen = apply_composite_artifacts(screen, 4//self.bitsperpixel)
         screen.set_palette(self._palette[self.blink_state])
+        # convert to display format, reusing the surface if we can
+        if not self._screen_rgb or self._screen_rgb.get_size() != screen.get_size():
+            self._screen_rgb = screen.convert(self.display)
+        else:
+            self._screen_rgb.blit(screen, (0, 0))
         if self._smooth:
-            pygame.transform.smoothscale(screen.convert(self.display),
-                                         self.display.get_size(), self.display)
+            pygame.transform.smoothscale(self._screen_rgb, self.display.get_size(), self.display)
         else:
-            pygame.transform.scale(screen.convert(self.display),
-                                   self.display.get_size(), self.display)
+            pygame.transform.scale(self._screen_rgb, self.display.get_size(), self.display)
         pygame.display.flip()
 
     def _draw_cursor(self, screen):
@@ -422,6 +433,8 @@ class VideoPygame(VideoPlugin):
         else:
             flags = pygame.RESIZABLE
         self.display = pygame.display.set_mode((width, height), flags)
+        # display format may have changed
+        self._screen_rgb = None
         self._window_sizer.window_size = width, height
         # load display if requested
         self.busy = True
@@ -452,6 +465,8 @@ class VideoPygame(VideoPlugin):
                         for _ in range(self.num_pages)]
         for i in range(self.num_pages):
             self.canvas[i].set_palette(self.work_palette)
+        self._cells = window.TextCells(self.num_pages, mode_info.width, mode_info.height)
+        self._glyph_surfaces = {}
         # initialise clipboard
         self.clipboard = clipboard.ClipboardInterface(
                 self.clipboard_handler, self._input_queue,
@@ -503,6 +518,7 @@ class VideoPygame(VideoPlugin):
         scroll_area = pygame.Rect(
                 0, (start-1)*self.font_height, self.size[0], (stop-start+1)*self.font_height)
         self.canvas[self.apagenum].fill(bg, scroll_area)
+        self._cells.clear_rows(self.apagenum, start, stop)
         self.busy = True
 
     def set_page(self, vpage, apage):
@@ -513,6 +529,7 @@ class VideoPygame(VideoPlugin):
     def copy_page(self, src, dst):
         """Copy source to destination page."""
         self.canvas[dst].blit(self.canvas[src], (0, 0))
+        self._cells.copy_page(src, dst)
         self.busy = True
 
     def show_cursor(self, cursor_on):
@@ -531,19 +548,25 @@ class VideoPygame(VideoPlugin):
 
     def scroll_up(self, from_line, scroll_height, back_attr):
         """Scroll the screen up between from_line and scroll_height."""
+        self.scroll_up_lines(from_line, scroll_height, back_attr, 1)
+
+    def scroll_up_lines(self, from_line, scroll_height, back_attr, num_lines):
+        """Scroll the screen up by a number of lines."""
         temp_scroll_area = pygame.Rect(
             0, (from_line-1)*self.font_height,
             self.size[0], (scroll_height-from_line+1) * self.font_height
         )
         # scroll
         self.canvas[self.apagenum].set_clip(temp_scroll_area)
-        self.canvas[self.apagenum].scroll(0, -self.font_height)
-        # empty new line
+        self.canvas[self.apagenum].scroll(0, -num_lines*self.font_height)
+        # empty new lines
         bg = (0, 0, back_attr)
         self.canvas[self.apagenum].fill(
-            bg, (0, (scroll_height-1) * self.font_height, self.size[0], self.font_height)
+            bg, (0, (scroll_height-num_lines) * self.font_height,
+                self.size[0], num_lines * self.font_height)
         )
         self.canvas[self.apagenum].set_clip(None)
+        self._cells.scroll_up(self.apagenum, from_line, scroll_height, num_lines)
         self.busy = True
 
     def scroll_down(self, from_line, scroll_height, back_attr):
@@ -560,6 +583,7 @@ class VideoPygame(VideoPlugin):
             bg, (0, (from_line-1) * self.font_height, self.size[0], self.font_height)
         )
         self.canvas[self.apagenum].set_clip(None)
+        self._cells.scroll_down(self.apagenum, from_line, scroll_height)
         self.busy = True
 
     def put_glyph(self, pagenum, row, col, cp, is_fullwidth, fore, back, blink, underline):
@@ -567,34 +591,59 @@ class VideoPygame(VideoPlugin):
         if not self.text_mode:
             # in graphics mode, a put_rect call does the actual drawing
             return
-        color = (0, 0, fore + self.num_fore_attrs*back + 128*blink)
+        attr = fore + self.num_fore_attrs*back + 128*blink
+        # skip if this glyph is already there
+        if not self._cells.update(pagenum, row, col, (cp, attr, back, underline), is_fullwidth):
+            return
+        color = (0, 0, attr)
         bg = (0, 0, back)
         x0, y0 = (col-1)*self.font_width, (row-1)*self.font_height
         if cp == u'\0':
             # guaranteed to be blank, saves time on some BLOADs
             self.canvas[pagenum].fill(bg, (x0, y0, self.font_width, self.font_height))
         else:
-            try:
-                glyph = self.glyph_dict[cp]
-            except KeyError:
-                if u'\0' not in self.glyph_dict:
-                    logging.error('No glyph received for code point 0')
-                    return
-                logging.warning('No glyph received for code point %s', hex(ord(cp)))
-                glyph = self.glyph_dict[u'\0']
-            if glyph.get_palette_at(0) != bg:
-                glyph.set_palette_at(0, bg)
-            if glyph.get_palette_at(1) != color:
-                glyph.set_palette_at(1, color)
+            glyph = self._get_glyph_surface(cp, attr, back)
+            if not glyph:
+                self._cells.update(pagenum, row, col, None, is_fullwidth)
+                return
             self.canvas[pagenum].blit(glyph, (x0, y0))
         if underline:
             self.canvas[pagenum].fill(color, (x0, y0 + self.font_height - 1, self.font_width, 1))
         self.busy = True
 
+    def _get_glyph_surface(self, cp, attr, back):
+        """Retrieve a glyph surface in the given attributes, building it if needed."""
+        try:
+            return self._glyph_surfaces[cp, attr, back]
+        except KeyError:
+            pass
+        try:
+            mask = self.glyph_dict[cp]
+        except KeyError:
+            if u'\0' not in self.glyph_dict:
+                logging.error('No glyph received for code point 0')
+                return None
+            logging.warning('No glyph received for code point %s', hex(ord(cp)))
+            mask = self.glyph_dict[u'\0']
+        if len(self._glyph_surfaces) >= window.GLYPH_CACHE_SIZE:
+            self._glyph_surfaces.clear()
+        # glyph pixels are attribute indices, as on the canvas
+        glyph = glyph_to_surface(numpy.where(mask, attr, back))
+        glyph.set_palette(self.work_palette)
+        self._glyph_surfaces[cp, attr, back] = glyph
+        return glyph
+
     def build_glyphs(self, new_dict):
         """Build a dict of glyphs for use in text mode."""
         for char, glyph in new_dict.iteritems():
-            self.glyph_dict[char] = glyph_to_surface(glyph)
+            self.glyph_dict[char] = numpy.asarray(glyph, dtype=bool)
+        # drop coloured versions of replaced glyphs, and make sure they get redrawn
+        self._glyph_surfaces = {
+            key: surface for key, surface in self._glyph_surfaces.iteritems()
+            if key[0] not in new_dict
+        }
+        if self._cells:
+            self._cells.reset()
 
     def set_cursor_shape(self, width, height, from_line, to_line):
         """Build a sprite for the cursor."""
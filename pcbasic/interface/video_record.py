@@ -0,0 +1,334 @@
+"""
+PC-BASIC - video_record.py
+Screen recorder for headless regression testing
+
+(c) 2013--2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import json
+import zlib
+import struct
+import logging
+import zipfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ..compat import monotonic
+from .video import VideoPlugin
+from .base import video_plugins, InitFailed
+
+
+# PNG file signature
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+@video_plugins.register('record')
+class VideoRecorder(VideoPlugin):
+    """Record snapshots of the screen to a file."""
+
+    def __init__(self, input_queue, video_queue, record=u'', **kwargs):
+        """Initialise the recorder."""
+        if not record:
+            raise InitFailed('No recording file specified.')
+        VideoPlugin.__init__(self, input_queue, video_queue)
+        self._file_name = record
+        self._zipfile = None
+        if not numpy:
+            logging.warning('Module `numpy` not found. Pixel pages will not be recorded.')
+        # mode parameters
+        self._width, self._height = 80, 25
+        self._text_mode = True
+        self._font_height = 16
+        self._pixel_size = 640, 400
+        self._vpagenum, self._apagenum = 0, 0
+        # text and attribute buffers
+        self._text, self._attrs = [], []
+        # pixel buffers
+        self._pixels = []
+        self._palette = [(0, 0, 0)]
+        self._cursor_row, self._cursor_col = 1, 1
+        self._cursor_visible = True
+        # snapshots are numbered and timestamped relative to the start
+        self._start = monotonic()
+        self._frame = 0
+        self._dirty = False
+        self._set_buffers(1)
+
+    def __enter__(self):
+        """Open the recording file."""
+        self._zipfile = zipfile.ZipFile(self._file_name, 'w', zipfile.ZIP_DEFLATED)
+        return VideoPlugin.__enter__(self)
+
+    def __exit__(self, type, value, traceback):
+        """Record the final screen and close the file."""
+        try:
+            if self._dirty:
+                self._snapshot()
+            self._zipfile.close()
+        finally:
+            VideoPlugin.__exit__(self, type, value, traceback)
+
+    def _snapshot(self):
+        """Write the visible page to the recording."""
+        name = u'%06d' % (self._frame,)
+        frame = {
+            u'time': round(monotonic() - self._start, 3),
+            u'width': self._width,
+            u'height': self._height,
+            u'text_mode': self._text_mode,
+            u'page': self._vpagenum,
+            u'cursor': [self._cursor_row, self._cursor_col, self._cursor_visible],
+            u'text': [u''.join(row) for row in self._text[self._vpagenum]],
+            u'attr': [
+                u''.join(u'%03x' % (_attr,) for _attr in row)
+                for row in self._attrs[self._vpagenum]
+            ],
+        }
+        if not self._text_mode and self._pixels:
+            frame[u'png'] = name + u'.png'
+            self._zipfile.writestr(
+                frame[u'png'], _encode_png(self._pixels[self._vpagenum], self._palette)
+            )
+        self._zipfile.writestr(name + u'.json', json.dumps(frame, sort_keys=True))
+        self._frame += 1
+        self._dirty = False
+
+    def _set_buffers(self, num_pages):
+        """Create empty buffers."""
+        self._text = [
+            [[u' '] * self._width for _ in range(self._height)] for _ in range(num_pages)
+        ]
+        self._attrs = [
+            [[7] * self._width for _ in range(self._height)] for _ in range(num_pages)
+        ]
+        if numpy and not self._text_mode:
+            width, height = self._pixel_size
+            self._pixels = [numpy.zeros((height, width), dtype=numpy.uint8) for _ in range(num_pages)]
+        else:
+            self._pixels = []
+
+    def _blank_rows(self, num, back_attr):
+        """Create empty text and attribute rows."""
+        return (
+            [[u' '] * self._width for _ in range(num)],
+            [[back_attr << 4] * self._width for _ in range(num)]
+        )
+
+    def _fill_pixel_rows(self, pagenum, start, stop, back_attr):
+        """Fill a range of text rows on the pixel page."""
+        if self._pixels:
+            top, bottom = (start-1) * self._font_height, stop * self._font_height
+            self._pixels[pagenum][top:bottom] = back_attr
+
+    def _set_dirty(self, pagenum):
+        """Mark screen as changed if the page is visible."""
+        if pagenum == self._vpagenum:
+            self._dirty = True
+
+    # signal handlers
+
+    def mark_frame(self):
+        """Take a snapshot if the screen has changed, as the interpreter waits for input."""
+        if self._dirty:
+            self._snapshot()
+
+    def set_mode(self, mode_info):
+        """Initialise a given text or graphics mode."""
+        self._width, self._height = mode_info.width, mode_info.height
+        self._text_mode = mode_info.is_text_mode
+        self._font_height = mode_info.font_height
+        self._pixel_size = mode_info.pixel_width, mode_info.pixel_height
+        self._set_buffers(mode_info.num_pages)
+        self._dirty = True
+
+    def set_palette(self, rgb_palette_0, rgb_palette_1):
+        """Build the palette."""
+        self._palette = list(rgb_palette_0)
+        self._dirty = True
+
+    def set_page(self, vpage, apage):
+        """Set the visible and active page."""
+        self._vpagenum, self._apagenum = vpage, apage
+        self._dirty = True
+
+    def copy_page(self, src, dst):
+        """Copy source to destination page."""
+        self._text[dst] = [row[:] for row in self._text[src]]
+        self._attrs[dst] = [row[:] for row in self._attrs[src]]
+        if self._pixels:
+            self._pixels[dst][:] = self._pixels[src]
+        self._set_dirty(dst)
+
+    def show_cursor(self, cursor_on):
+        """Change visibility of cursor."""
+        self._cursor_visible = cursor_on
+        self._dirty = True
+
+    def move_cursor(self, crow, ccol):
+        """Move the cursor to a new position."""
+        self._cursor_row, self._cursor_col = crow, ccol
+        self._dirty = True
+
+    def clear_rows(self, back_attr, start, stop):
+        """Clear a range of screen rows."""
+        text, attrs = self._blank_rows(stop-start+1, back_attr)
+        self._text[self._apagenum][start-1:stop] = text
+        self._attrs[self._apagenum][start-1:stop] = attrs
+        self._fill_pixel_rows(self._apagenum, start, stop, back_attr)
+        self._set_dirty(self._apagenum)
+
+    def scroll_up(self, from_line, scroll_height, back_attr):
+        """Scroll the screen up between from_line and scroll_height."""
+        self.scroll_up_lines(from_line, scroll_height, back_attr, 1)
+
+    def scroll_up_lines(self, from_line, scroll_height, back_attr, num_lines):
+        """Scroll the screen up by a number of lines."""
+        text, attrs = self._blank_rows(num_lines, back_attr)
+        page_text, page_attrs = self._text[self._apagenum], self._attrs[self._apagenum]
+        first = from_line - 1 + num_lines
+        page_text[from_line-1:scroll_height] = page_text[first:scroll_height] + text
+        page_attrs[from_line-1:scroll_height] = page_attrs[first:scroll_height] + attrs
+        if self._pixels:
+            pixels = self._pixels[self._apagenum]
+            top, bottom = (from_line-1) * self._font_height, scroll_height * self._font_height
+            shift = num_lines * self._font_height
+            pixels[top:bottom-shift] = pixels[top+shift:bottom]
+            self._fill_pixel_rows(self._apagenum, scroll_height-num_lines+1, scroll_height, back_attr)
+        self._set_dirty(self._apagenum)
+
+    def scroll_down(self, from_line, scroll_height, back_attr):
+        """Scroll the screen down between from_line and scroll_height."""
+        text, attrs = self._blank_rows(1, back_attr)
+        page_text, page_attrs = self._text[self._apagenum], self._attrs[self._apagenum]
+        page_text[from_line-1:scroll_height] = text + page_text[from_line-1:scroll_height-1]
+        page_attrs[from_line-1:scroll_height] = attrs + page_attrs[from_line-1:scroll_height-1]
+        if self._pixels:
+            pixels = self._pixels[self._apagenum]
+            top, bottom = (from_line-1) * self._font_height, scroll_height * self._font_height
+            pixels[top+self._font_height:bottom] = pixels[top:bottom-self._font_height].copy()
+            self._fill_pixel_rows(self._apagenum, from_line, from_line, back_attr)
+        self._set_dirty(self._apagenum)
+
+    def put_glyph(self, pagenum, row, col, char, is_fullwidth, fore, back, blink, underline):
+        """Put a character at a given position."""
+        attr = fore + (back << 4) + (blink << 7) + (underline << 8)
+        self._text[pagenum][row-1][col-1] = char
+        self._attrs[pagenum][row-1][col-1] = attr
+        if is_fullwidth:
+            self._text[pagenum][row-1][col] = u''
+            self._attrs[pagenum][row-1][col] = attr
+        self._set_dirty(pagenum)
+
+    def put_pixel(self, pagenum, x, y, index):
+        """Put a pixel on the screen."""
+        if self._pixels:
+            self._pixels[pagenum][y, x] = index
+            self._set_dirty(pagenum)
+
+    def fill_rect(self, pagenum, x0, y0, x1, y1, index):
+        """Fill a rectangle in a solid attribute."""
+        if self._pixels:
+            self._pixels[pagenum][y0:y1+1, x0:x1+1] = index
+            self._set_dirty(pagenum)
+
+    def fill_interval(self, pagenum, x0, x1, y, index):
+        """Fill a scanline interval in a solid attribute."""
+        if self._pixels:
+            self._pixels[pagenum][y, x0:x1+1] = index
+            self._set_dirty(pagenum)
+
+    def put_interval(self, pagenum, x, y, colours):
+        """Write a list of attributes to a scanline interval."""
+        if self._pixels:
+            self._pixels[pagenum][y, x:x+len(colours)] = colours
+            self._set_dirty(pagenum)
+
+    def put_rect(self, pagenum, x0, y0, x1, y1, array):
+        """Apply numpy array [y][x] of attributes to an area."""
+        if self._pixels and x1 >= x0 and y1 >= y0:
+            self._pixels[pagenum][y0:y1+1, x0:x1+1] = array
+            self._set_dirty(pagenum)
+
+
+###############################################################################
+# PNG output
+
+def _png_chunk(tag, data):
+    """Build a PNG chunk."""
+    return b''.join((
+        struct.pack('>I', len(data)), tag, data,
+        struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    ))
+
+def _encode_png(pixels, palette):
+    """Encode an array of attributes as a palettised PNG image."""
+    height, width = pixels.shape
+    # repeat the palette to cover all attribute values, as the display does
+    colours = (palette * (256 // len(palette) + 1))[:256]
+    # each scanline starts with filter type 0
+    scanlines = numpy.hstack((numpy.zeros((height, 1), dtype=numpy.uint8), pixels))
+    return b''.join((
+        PNG_SIGNATURE,
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+        _png_chunk(b'PLTE', b''.join(struct.pack('BBB', *_rgb) for _rgb in colours)),
+        _png_chunk(b'IDAT', zlib.compress(scanlines.tobytes())),
+        _png_chunk(b'IEND', b''),
+    ))
+
+
+###############################################################################
+# comparing recordings
+
+def load_recording(file_name):
+    """Read the frames of a recording; PNG images are included as bytes."""
+    frames = []
+    with zipfile.ZipFile(file_name, 'r') as recording:
+        for name in sorted(recording.namelist()):
+            if name.endswith(u'.json'):
+                frame = json.loads(recording.read(name))
+                if u'png' in frame:
+                    frame[u'png'] = recording.read(frame[u'png'])
+                frames.append(frame)
+    return frames
+
+def _describe_difference(frame, golden_frame):
+    """List the differences between two frames."""
+    if (frame[u'width'], frame[u'height']) != (golden_frame[u'width'], golden_frame[u'height']):
+        return [u'screen size %dx%d, expected %dx%d' % (
+            frame[u'width'], frame[u'height'], golden_frame[u'width'], golden_frame[u'height']
+        )]
+    differences = []
+    for row, (text, golden_text, attr, golden_attr) in enumerate(zip(
+            frame[u'text'], golden_frame[u'text'], frame[u'attr'], golden_frame[u'attr'])):
+        if text != golden_text:
+            differences.append(u'row %d: %r, expected %r' % (row+1, text, golden_text))
+        elif attr != golden_attr:
+            differences.append(u'row %d: attributes differ' % (row+1,))
+    if frame[u'cursor'] != golden_frame[u'cursor']:
+        differences.append(u'cursor at %r, expected %r' % (frame[u'cursor'], golden_frame[u'cursor']))
+    if frame.get(u'png') != golden_frame.get(u'png'):
+        differences.append(u'pixels differ')
+    for key in (u'page', u'text_mode'):
+        if frame[key] != golden_frame[key]:
+            differences.append(u'%s is %r, expected %r' % (key, frame[key], golden_frame[key]))
+    return differences
+
+def compare_recordings(file_name, golden_file_name):
+    """Compare a recording to a golden recording; return a list of differences.
+
+    Snapshots are taken when the interpreter waits for input and at the end of the session,
+    so recordings of the same run consist of the same frames. Timestamps are not compared.
+    """
+    frames = load_recording(file_name)
+    golden_frames = load_recording(golden_file_name)
+    for count, (frame, golden_frame) in enumerate(zip(frames, golden_frames)):
+        differences = _describe_difference(frame, golden_frame)
+        if differences:
+            return [u'frame %d differs from golden frame' % (count,)] + differences
+    if len(frames) != len(golden_frames):
+        return [u'recording has %d frames, expected %d' % (len(frames), len(golden_frames))]
+    return []
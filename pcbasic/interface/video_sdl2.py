@@ -462,6 +462,12 @@ class VideoSDL2(VideoPlugin):
         # http://stackoverflow.com/questions/27751533/sdl2-threading-seg-fault
         self._display = None
         self._work_surface = None
+        # work surface converted to display format
+        self._conv_surface = None
+        # glyph arrays by code point and colours
+        self._glyph_arrays = {}
+        # glyphs drawn in text cells
+        self._cells = None
         self._do_create_window(*self._window_sizer.find_display_size(720, 400))
         # pop up as black rather than background, looks nicer
         sdl2.SDL_UpdateWindowSurface(self._display)
@@ -517,6 +523,7 @@ class VideoSDL2(VideoPlugin):
             for s in self.canvas:
                 sdl2.SDL_FreeSurface(s)
             sdl2.SDL_FreeSurface(self._work_surface)
+            sdl2.SDL_FreeSurface(self._conv_surface)
             sdl2.SDL_FreeSurface(self.overlay)
             # free palettes
             for p in self._palette + self._saved_palette:
@@ -802,8 +809,13 @@ class VideoSDL2(VideoPlugin):
         # apply cursor to work surface
         self._show_cursor(True)
         # convert 8-bit work surface to (usually) 32-bit display surface format
-        pixelformat = self._display_surface.contents.format
-        conv = sdl2.SDL_ConvertSurface(self._work_surface, pixelformat, 0)
+        # reuse the converted surface while the formats stay the same
+        if not self._conv_surface:
+            pixelformat = self._display_surface.contents.format
+            self._conv_surface = sdl2.SDL_ConvertSurface(self._work_surface, pixelformat, 0)
+        else:
+            sdl2.SDL_BlitSurface(self._work_surface, None, self._conv_surface, None)
+        conv = self._conv_surface
         # scale converted surface and blit onto display
         if not self._smooth:
             sdl2.SDL_BlitScaled(conv, None, self._display_surface, None)
@@ -832,8 +844,6 @@ class VideoSDL2(VideoPlugin):
             sdl2.SDL_BlitScaled(self.overlay, None, self._display_surface, None)
         # flip the display
         sdl2.SDL_UpdateWindowSurface(self._display)
-        # destroy the temporary surface
-        sdl2.SDL_FreeSurface(conv)
 
     def _show_cursor(self, do_show):
         """Draw or remove the cursor on the visible page."""
@@ -890,8 +900,16 @@ class VideoSDL2(VideoPlugin):
         sdl2.SDL_GetWindowSize(self._display, ctypes.byref(w), ctypes.byref(h))
         self._window_sizer.window_size = w.value, h.value
         self._display_surface = sdl2.SDL_GetWindowSurface(self._display)
+        # display format may have changed
+        self._free_conv_surface()
         self.busy = True
 
+    def _free_conv_surface(self):
+        """Discard the converted work surface."""
+        if self._conv_surface:
+            sdl2.SDL_FreeSurface(self._conv_surface)
+            self._conv_surface = None
+
 
     ###########################################################################
     # signal handlers
@@ -905,6 +923,8 @@ class VideoSDL2(VideoPlugin):
         # prebuilt glyphs
         # NOTE: [x][y] format - change this if we change _pixels2d
         self.glyph_dict = {u'\0': numpy.zeros((self.font_width, self.font_height))}
+        self._glyph_arrays = {}
+        self._cells = window.TextCells(mode_info.num_pages, mode_info.width, mode_info.height)
         self.num_pages = mode_info.num_pages
         self.mode_has_blink = mode_info.has_blink
         if not self.text_mode:
@@ -928,6 +948,7 @@ class VideoSDL2(VideoPlugin):
         work_height = canvas_height + 2 * self.border_y
         sdl2.SDL_FreeSurface(self._work_surface)
         self._work_surface = sdl2.SDL_CreateRGBSurface(0, work_width, work_height, 8, 0, 0, 0, 0)
+        self._free_conv_surface()
         self._work_pixels = _pixels2d(self._work_surface.contents)[
             self.border_x:work_width-self.border_x, self.border_y:work_height-self.border_y
         ]
@@ -1005,6 +1026,7 @@ class VideoSDL2(VideoPlugin):
             0, (start-1)*self.font_height, self.size[0], (stop-start+1)*self.font_height
         )
         sdl2.SDL_FillRect(self.canvas[self.apagenum], scroll_area, back_attr)
+        self._cells.clear_rows(self.apagenum, start, stop)
         self.busy = True
 
     def set_page(self, vpage, apage):
@@ -1017,6 +1039,7 @@ class VideoSDL2(VideoPlugin):
         self.pixels[dst][:] = self.pixels[src][:]
         # alternative:
         # sdl2.SDL_BlitSurface(self.canvas[src], None, self.canvas[dst], None)
+        self._cells.copy_page(src, dst)
         self.busy = True
 
     def show_cursor(self, cursor_on):
@@ -1034,13 +1057,20 @@ class VideoSDL2(VideoPlugin):
 
     def scroll_up(self, from_line, scroll_height, back_attr):
         """Scroll the screen up between from_line and scroll_height."""
+        self.scroll_up_lines(from_line, scroll_height, back_attr, 1)
+
+    def scroll_up_lines(self, from_line, scroll_height, back_attr, num_lines):
+        """Scroll the screen up by a number of lines."""
         pixels = self.pixels[self.apagenum]
         # these are exclusive ranges [x0, x1) etc
         x0, x1 = 0, self.size[0]
-        new_y0, new_y1 = (from_line-1)*self.font_height, (scroll_height-1)*self.font_height
-        old_y0, old_y1 = from_line*self.font_height, scroll_height*self.font_height
+        new_y0 = (from_line-1)*self.font_height
+        new_y1 = (scroll_height-num_lines)*self.font_height
+        old_y0 = (from_line-1+num_lines)*self.font_height
+        old_y1 = scroll_height*self.font_height
         pixels[x0:x1, new_y0:new_y1] = pixels[x0:x1, old_y0:old_y1]
         pixels[x0:x1, new_y1:old_y1] = numpy.full((x1-x0, old_y1-new_y1), back_attr, dtype=int)
+        self._cells.scroll_up(self.apagenum, from_line, scroll_height, num_lines)
         self.busy = True
 
     def scroll_down(self, from_line, scroll_height, back_attr):
@@ -1052,6 +1082,7 @@ class VideoSDL2(VideoPlugin):
         new_y0, new_y1 = from_line*self.font_height, scroll_height*self.font_height
         pixels[x0:x1, new_y0:new_y1] = pixels[x0:x1, old_y0:old_y1]
         pixels[x0:x1, old_y0:new_y0] = numpy.full((x1-x0, new_y0-old_y0), back_attr, dtype=int)
+        self._cells.scroll_down(self.apagenum, from_line, scroll_height)
         self.busy = True
 
     def put_glyph(self, pagenum, row, col, cp, is_fullwidth, fore, back, blink, underline):
@@ -1060,25 +1091,32 @@ class VideoSDL2(VideoPlugin):
             # in graphics mode, a put_rect call does the actual drawing
             return
         attr = fore + self.num_fore_attrs*back + 128*blink
+        # skip if this glyph is already there
+        if not self._cells.update(pagenum, row, col, (cp, attr, back, underline), is_fullwidth):
+            return
         x0, y0 = (col-1)*self.font_width, (row-1)*self.font_height
         # NOTE: in pygame plugin we used a surface fill for the NUL character
         # which was an optimisation early on -- consider if we need speedup.
         try:
-            glyph = self.glyph_dict[cp]
+            glyph = self._glyph_arrays[cp, attr, back]
         except KeyError:
-            logging.warning('No glyph received for code point %s', hex(ord(cp)))
             try:
-                glyph = self.glyph_dict[u'\0']
+                mask = self.glyph_dict[cp]
             except KeyError:
-                logging.error('No glyph received for code point 0')
-                return
+                logging.warning('No glyph received for code point %s', hex(ord(cp)))
+                try:
+                    mask = self.glyph_dict[u'\0']
+                except KeyError:
+                    logging.error('No glyph received for code point 0')
+                    self._cells.update(pagenum, row, col, None, is_fullwidth)
+                    return
+            if len(self._glyph_arrays) >= window.GLYPH_CACHE_SIZE:
+                self._glyph_arrays.clear()
+            glyph = numpy.where(mask, attr, back).astype(numpy.uint8)
+            self._glyph_arrays[cp, attr, back] = glyph
         # _pixels2d uses column-major mode and hence [x][y] indexing (we can change this)
         glyph_width = glyph.shape[0]
-        # changle glyph color by numpy scalar mult (is there a better way?)
-        self.pixels[pagenum][
-            x0:x0+glyph_width, y0:y0+self.font_height] = (
-                glyph*(attr-back) + back
-            )
+        self.pixels[pagenum][x0:x0+glyph_width, y0:y0+self.font_height] = glyph
         if underline:
             sdl2.SDL_FillRect(
                 self.canvas[self.apagenum],
@@ -1093,6 +1131,13 @@ class VideoSDL2(VideoPlugin):
             # transpose because _pixels2d uses column-major mode and hence [x][y] indexing
             # (we can change this)
             self.glyph_dict[char] = numpy.asarray(glyph).T
+        # drop coloured versions of replaced glyphs, and make sure they get redrawn
+        self._glyph_arrays = {
+            key: glyph for key, glyph in self._glyph_arrays.iteritems()
+            if key[0] not in new_dict
+        }
+        if self._cells:
+            self._cells.reset()
 
     def set_cursor_shape(self, width, height, from_line, to_line):
         """Build a sprite for the cursor."""
@@ -21,6 +21,8 @@ set_dpi_aware()
 
 # percentage of the screen to leave unused for window decorations etc.
 DISPLAY_SLACK = 15
+# maximum number of coloured glyphs to keep
+GLYPH_CACHE_SIZE = 4096
 
 
 def apply_composite_artifacts(src_array, pixels=4):
@@ -77,7 +79,8 @@ class WindowSizer(object):
         # comply with requested size unless we're fullscreening
         if self._force_display_size and not self._fullscreen:
             return self._force_display_size
-        if not self._force_native_pixel:
+        # headless drivers (e.g. SDL's dummy driver) report a zero screen size
+        if not self._force_native_pixel and all(self._screen_size):
             # this assumes actual display aspect ratio is wider than 4:3
             # scale y to fit screen
             canvas_y = (1-DISPLAY_SLACK/100.) * (
@@ -131,3 +134,49 @@ class WindowSizer(object):
     def is_maximal(self, width, height):
         """Compare dimensions to threshold for maximising."""
         return (width >= 0.95*self._screen_size[0] and height >= 0.9*self._screen_size[1])
+
+
+class TextCells(object):
+    """Record of the glyph drawn in each text cell, to skip redundant redraws."""
+
+    def __init__(self, num_pages, width, height):
+        """Initialise with all cells in unknown state."""
+        self._width = width
+        self._pages = [[[None]*width for _ in range(height)] for _ in range(num_pages)]
+
+    def update(self, pagenum, row, col, key, is_fullwidth):
+        """Record the glyph for a cell; return False if it was already drawn there."""
+        cells = self._pages[pagenum][row-1]
+        if is_fullwidth:
+            # don't track fullwidth glyphs; their halves can be overwritten separately
+            cells[col-1:col+1] = [None] * len(cells[col-1:col+1])
+            return True
+        if cells[col-1] == key:
+            return False
+        cells[col-1] = key
+        return True
+
+    def clear_rows(self, pagenum, start, stop):
+        """Set rows to unknown state."""
+        self._pages[pagenum][start-1:stop] = [[None]*self._width for _ in range(start-1, stop)]
+
+    def scroll_up(self, pagenum, from_line, scroll_height, num_lines=1):
+        """Scroll rows up."""
+        rows = self._pages[pagenum]
+        rows[from_line-1:scroll_height] = (
+            rows[from_line-1+num_lines:scroll_height] + [[None]*self._width for _ in range(num_lines)]
+        )
+
+    def scroll_down(self, pagenum, from_line, scroll_height):
+        """Scroll rows down."""
+        rows = self._pages[pagenum]
+        rows[from_line-1:scroll_height] = [[None]*self._width] + rows[from_line-1:scroll_height-1]
+
+    def copy_page(self, src, dst):
+        """Copy the record of a page."""
+        self._pages[dst] = [row[:] for row in self._pages[src]]
+
+    def reset(self):
+        """Set all cells to unknown state."""
+        for pagenum in range(len(self._pages)):
+            self.clear_rows(pagenum, 1, len(self._pages[pagenum]))
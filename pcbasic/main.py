@@ -10,7 +10,7 @@ import os
 import sys
 import locale
 import logging
-import pkg_resources
+import pkgutil
 import traceback
 
 from . import basic
@@ -66,7 +66,7 @@ def run(*arguments):
 
 def show_usage():
     """Show usage description."""
-    sys.stdout.write(pkg_resources.resource_string(__name__, 'data/USAGE.txt'))
+    sys.stdout.write(pkgutil.get_data(__name__, 'data/USAGE.txt'))
 
 def show_version(settings):
     """Show version with optional debugging details."""
@@ -31,6 +31,19 @@ def manage_state(session, state_file, do_resume):
         zpickle(session, state_file)
 
 
+def save_image(session, image_file):
+    """Save a warm image of a session, set up to run its program."""
+    session.prepare_run()
+    zpickle(session, image_file)
+
+def load_image(image_file, interface=None):
+    """Restore a session from a warm image; call resume() to run the program."""
+    session = zunpickle(image_file)
+    if session is not None:
+        session.attach(interface)
+    return session
+
+
 def unpickle_file(name, mode, pos):
     """Unpickle a file object."""
     if name is None:
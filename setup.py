@@ -377,7 +377,8 @@ if CX_FREEZE and sys.platform == 'win32':
     # cx_Freeze options
     SETUP_OPTIONS['options'] = {
         'build_exe': {
-            'packages': ['numpy', 'pkg_resources._vendor'],
+            # interface plugins are imported by name, so cx_Freeze can't find them by itself
+            'packages': ['numpy', 'pkg_resources._vendor', 'pcbasic.interface'],
             'excludes': [
                 'Tkinter', '_tkinter', 'PIL', 'PyQt4', 'scipy', 'pygame',
                 'pywin', 'win32com', 'test',
@@ -521,7 +522,8 @@ elif CX_FREEZE and sys.platform == 'darwin':
     # cx_Freeze options
     SETUP_OPTIONS['options'] = {
         'build_exe': {
-            'packages': ['numpy', 'pkg_resources._vendor'],
+            # interface plugins are imported by name, so cx_Freeze can't find them by itself
+            'packages': ['numpy', 'pkg_resources._vendor', 'pcbasic.interface'],
             'excludes': [
                 'Tkinter', '_tkinter', 'PIL', 'PyQt4', 'scipy', 'pygame', 'test',
             ],
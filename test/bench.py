@@ -0,0 +1,352 @@
+#!/usr/bin/env python2
+
+""" PC-BASIC benchmark script
+
+Runs a set of BASIC workloads headlessly through the Session API, records
+throughput and resource use in a JSON history and flags regressions against
+a stored baseline.
+
+The startup workload times import and session start, and fails if it exceeds
+STARTUP_BUDGET or pulls in any of the modules in STARTUP_EXCLUDED. The unit
+tests in test/unit/test_startup.py run the same checks.
+
+usage: bench.py [workload ...] [--repeat=N] [--threshold=PCT] [--save-baseline] [--no-history]
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import shutil
+import weakref
+import platform
+import tempfile
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+
+BENCH_DIR = os.path.join(HERE, 'bench')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+HISTORY_FILE = os.path.join(BENCH_DIR, 'history.json')
+
+# default regression threshold, in percent
+THRESHOLD = 10.
+# default number of runs per workload; the best run is recorded
+REPEAT = 3
+
+# time budget for a headless import and session start, in seconds
+STARTUP_BUDGET = 1.
+# modules that a headless session should not need to import
+STARTUP_EXCLUDED = (
+    'pkg_resources', 'pygame', 'sdl2', 'curses', 'pyaudio',
+    'pcbasic.interface.video_pygame', 'pcbasic.interface.video_sdl2',
+    'pcbasic.interface.video_curses', 'pcbasic.interface.audio_pygame',
+    'pcbasic.interface.audio_sdl2', 'pcbasic.interface.audio_portaudio',
+    'pcbasic.interface.clipboard', 'pcbasic.interface.synthesiser',
+)
+
+# name, program file, extra session parameters
+# output_streams may name a file in the work directory to redirect output to
+# a workload without a program file times startup only
+WORKLOADS = [
+    ('startup', None, {}),
+    ('arith', 'ARITH.BAS', {}),
+    ('strcat', 'STRCAT.BAS', {}),
+    ('sort', 'SORT.BAS', {}),
+    ('print', 'PRINT.BAS', {}),
+    ('fileio', 'FILEIO.BAS', {}),
+    ('using', 'USING.BAS', {}),
+    ('gosub', 'GOSUB.BAS', {}),
+    ('serial', 'SERIAL.BAS', {'devices': {b'COM1:': u'PORT:loop://'}}),
+    ('redirect', 'PRINT.BAS', {'output_streams': 'OUTPUT.TXT'}),
+]
+
+# metrics compared against the baseline; True if larger is better
+COMPARED = {
+    'stmt_per_sec': True,
+    'wall': False,
+    'peak_rss_kb': False,
+}
+
+
+class GCCounter(object):
+    """Count garbage collector passes as a proxy for allocation pressure."""
+
+    def __init__(self):
+        """Arm the first sentinel."""
+        self.count = 0
+        self._arm()
+
+    def _arm(self):
+        """Create a cyclic sentinel that only the collector can free."""
+        sentinel = _Sentinel()
+        sentinel.cycle = sentinel
+        self._ref = weakref.ref(sentinel, self._collected)
+
+    def _collected(self, ref):
+        """Collector has run; count and re-arm."""
+        self.count += 1
+        self._arm()
+
+
+class _Sentinel(object):
+    """Weakly referenceable object for GCCounter."""
+
+
+def run_startup():
+    """Import PC-BASIC, start a headless session in this process and return its metrics."""
+    before = set(sys.modules)
+    start_clock, start_time = time.clock(), time.time()
+    import pcbasic
+    import_time = time.time() - start_time
+    with pcbasic.Session(input_streams=None, output_streams=None) as session:
+        session.execute(b'A=1')
+        wall, cpu = time.time() - start_time, time.clock() - start_clock
+        error_num = session._impl.interpreter.error_num
+    loaded = set(name for name, module in sys.modules.items() if module) - before
+    return {
+        'wall': wall,
+        'cpu': cpu,
+        'import': import_time,
+        'modules': len(loaded),
+        'excluded': sorted(set(
+            name if name in STARTUP_EXCLUDED else name.split('.')[0]
+            for name in loaded
+            if name in STARTUP_EXCLUDED or name.split('.')[0] in STARTUP_EXCLUDED
+        )),
+        'error': error_num,
+    }
+
+def run_workload(name):
+    """Run a single workload in this process and return its metrics."""
+    _, filename, params = dict((w[0], w) for w in WORKLOADS)[name]
+    if not filename:
+        return run_startup()
+    import pcbasic
+    work_dir = tempfile.mkdtemp(prefix='pcbasic-bench-')
+    output_file = None
+    try:
+        shutil.copy(os.path.join(BENCH_DIR, filename), work_dir)
+        os.chdir(work_dir)
+        session_params = dict(
+            input_streams=None, output_streams=None, greeting=False,
+            mount={b'Z': (work_dir.decode(sys.getfilesystemencoding()), u'')},
+            current_device=b'Z',
+        )
+        session_params.update(params)
+        if session_params['output_streams']:
+            output_file = open(session_params['output_streams'], 'wb')
+            session_params['output_streams'] = output_file
+        with pcbasic.Session(**session_params) as session:
+            session.execute(b'LOAD "%s"' % (filename,))
+            # count statements by wrapping the parser's entry point
+            counter = [0]
+            parser = session._impl.parser
+            parse_statement = parser.parse_statement
+            def counting_parse_statement(ins):
+                counter[0] += 1
+                return parse_statement(ins)
+            parser.parse_statement = counting_parse_statement
+            gc.collect()
+            gc_counter = GCCounter()
+            if tracemalloc:
+                tracemalloc.start()
+            start_clock, start_time = time.clock(), time.time()
+            session.execute(b'RUN')
+            wall, cpu = time.time() - start_time, time.clock() - start_clock
+            gc_passes = gc_counter.count
+            if tracemalloc:
+                _, alloc_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                alloc_peak_kb = alloc_peak // 1024
+            else:
+                alloc_peak_kb = None
+            # error number of last unhandled error, if any
+            error_num = session._impl.interpreter.error_num
+    finally:
+        if output_file:
+            output_file.close()
+        os.chdir(HERE)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if resource:
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            # reported in bytes on mac
+            peak_rss_kb //= 1024
+    else:
+        peak_rss_kb = None
+    return {
+        'statements': counter[0],
+        'wall': wall,
+        'cpu': cpu,
+        'stmt_per_sec': counter[0] / wall if wall else 0.,
+        'peak_rss_kb': peak_rss_kb,
+        'gc_passes': gc_passes,
+        'alloc_peak_kb': alloc_peak_kb,
+        'error': error_num,
+    }
+
+def spawn_workload(name):
+    """Run a workload in a fresh interpreter and collect its metrics."""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--worker', name],
+        stdout=subprocess.PIPE, stderr=open(os.devnull, 'w')
+    )
+    out, _ = proc.communicate()
+    if proc.returncode:
+        return None
+    return json.loads(out.splitlines()[-1])
+
+def best_of(runs):
+    """Select the fastest of a number of runs."""
+    runs = [r for r in runs if r]
+    if not runs:
+        return None
+    return min(runs, key=lambda r: r['wall'])
+
+def compare(results, baseline, threshold):
+    """List metrics that regressed beyond threshold percent."""
+    regressions = []
+    for name, result in sorted(results.iteritems()):
+        base = baseline.get(name)
+        if not base or not result:
+            continue
+        for metric, larger_is_better in COMPARED.iteritems():
+            new, old = result.get(metric), base.get(metric)
+            if not new or not old:
+                continue
+            change = 100. * (new - old) / old
+            if (change < -threshold) if larger_is_better else (change > threshold):
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+def load_json(filename, default):
+    """Read a JSON file, return default if it doesn't exist."""
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except EnvironmentError:
+        return default
+
+def save_json(filename, obj):
+    """Write a JSON file."""
+    with open(filename, 'w') as f:
+        json.dump(obj, f, indent=1, sort_keys=True)
+
+def git_revision():
+    """Get the current commit, if available."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, stderr=open(os.devnull, 'w')
+        ).strip()
+    except (EnvironmentError, subprocess.CalledProcessError):
+        return None
+
+def get_option(args, name, default):
+    """Get and remove a --name=value option."""
+    for arg in args:
+        if arg.startswith('--%s=' % (name,)):
+            args.remove(arg)
+            return type(default)(arg.split('=', 1)[1])
+    return default
+
+def get_flag(args, name):
+    """Get and remove a --name flag."""
+    flag = '--%s' % (name,)
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
+
+
+def main(args):
+    """Run the benchmarks and report."""
+    repeat = get_option(args, 'repeat', REPEAT)
+    threshold = get_option(args, 'threshold', THRESHOLD)
+    save_baseline = get_flag(args, 'save-baseline')
+    keep_history = not get_flag(args, 'no-history')
+    names = args or [w[0] for w in WORKLOADS]
+    results = {}
+    over_budget = []
+    for name in names:
+        if name not in dict((w[0], w) for w in WORKLOADS):
+            print '\033[00;37mWorkload \033[01m%s \033[00;37m.. \033[01;31mno such workload.\033[00;37m' % name
+            continue
+        print '\033[00;37mRunning workload \033[01m%s \033[00;37m.. ' % name,
+        sys.stdout.flush()
+        result = best_of(spawn_workload(name) for _ in range(repeat))
+        results[name] = result
+        if not result:
+            print '\033[01;31mEXCEPTION.\033[00;37m'
+        elif result['error']:
+            print '\033[01;31merror %d.\033[00;37m' % result['error']
+        elif 'excluded' in result:
+            print '%7.3fs import %7.3fs %6d modules' % (
+                result['import'], result['wall'], result['modules']
+            )
+            if result['wall'] > STARTUP_BUDGET:
+                over_budget.append('%s: %.3fs exceeds budget of %.3fs' % (name, result['wall'], STARTUP_BUDGET))
+            if result['excluded']:
+                over_budget.append('%s: imported %s' % (name, u', '.join(result['excluded'])))
+        else:
+            print '%9.0f stmt/s %7.3fs %8s kB rss %6d gc' % (
+                result['stmt_per_sec'], result['wall'],
+                result['peak_rss_kb'] or '--', result['gc_passes']
+            )
+    print '\033[00m'
+    record = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if keep_history:
+        history = load_json(HISTORY_FILE, [])
+        history.append(record)
+        save_json(HISTORY_FILE, history)
+    if over_budget:
+        print 'Startup budget exceeded:'
+        for message in over_budget:
+            print '    \033[01;31m%s\033[00m' % (message,)
+        return 1
+    baseline = load_json(BASELINE_FILE, {})
+    if save_baseline:
+        baseline.update((k, v) for k, v in results.iteritems() if v)
+        save_json(BASELINE_FILE, baseline)
+        print 'Baseline saved to %s' % (BASELINE_FILE,)
+        return 0
+    regressions = compare(results, baseline, threshold)
+    if not baseline:
+        print 'No baseline to compare against; use --save-baseline to store one.'
+    elif regressions:
+        print '%d regressions beyond %.0f%%:' % (len(regressions), threshold)
+        for name, metric, old, new, change in regressions:
+            print '    \033[01;31m%s\033[00m %s: %.4g -> %.4g (%+.1f%%)' % (name, metric, old, new, change)
+        return 1
+    else:
+        print 'No regressions beyond %.0f%%.' % (threshold,)
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--worker']:
+        print json.dumps(run_workload(sys.argv[2]))
+    else:
+        sys.exit(main(sys.argv[1:]))
@@ -2,6 +2,8 @@
 
 """ PC-BASIC test script
 
+usage: test.py [test ...] [--all] [--failed] [--jobs=N] [--timeout=S] [--xml=FILE] [--loud] [--coverage]
+
 (c) 2015--2018 Rob Hagemans
 This file is released under the GNU GPL version 3 or later.
 """
@@ -12,13 +14,24 @@ import shutil
 import filecmp
 import contextlib
 import traceback
+import tempfile
 import time
+import multiprocessing
+import Queue
+from xml.etree import ElementTree
 from copy import copy, deepcopy
 
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
 pythonpath = copy(sys.path)
 
+# list of failures in the last run, for --failed
+LAST_FAILED = os.path.join(HERE, '.lastfailed')
+# default per-test timeout in seconds
+TIMEOUT = 120.
+
+
 def is_same(file1, file2):
     try:
         return filecmp.cmp(file1, file2, shallow=False)
@@ -46,70 +59,55 @@ def suppress_stdio(do_suppress):
         sys.stderr = err
         sys.stdout = out
 
+def get_option(args, name, default):
+    """Get and remove a --name=value option."""
+    for arg in args:
+        if arg.startswith('--%s=' % (name,)):
+            args.remove(arg)
+            return type(default)(arg.split('=', 1)[1])
+    return default
 
-
-args = sys.argv[1:]
-basedir = os.path.join('.', 'correctness')
-
-do_suppress = '--loud' not in args
-
-try:
-    args.remove('--loud')
-except ValueError:
-    pass
-
-if '--coverage' in args:
-    import coverage
-    args.remove('--coverage')
-    cov = coverage.coverage()
-    cov.start()
-else:
-    cov = None
-
-if not args or '--all' in args:
-    args = [f for f in sorted(os.listdir(basedir))
-            if os.path.isdir(os.path.join(basedir, f)) and os.path.isdir(os.path.join(basedir, f, 'model'))]
-
-numtests = 0
-failed = []
-knowfailed = []
+def get_flag(args, name):
+    """Get and remove a --name flag."""
+    flag = '--%s' % (name,)
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
 
 
-import pcbasic
+def make_work_dir(name):
+    """Create a private temporary directory for a test."""
+    return tempfile.mkdtemp(prefix='pcbasic-test-%s-' % (name,))
 
-start_time = time.time()
-start_clock = time.clock()
-
-args = [os.path.basename(n) for n in args]
-
-# preserve environment
-startdir = os.path.abspath(os.getcwd())
-save_env = deepcopy(os.environ)
-
-for name in args:
-    # reset testing environment
-    os.chdir(startdir)
-    os.environ = deepcopy(save_env)
+def keep_output(basedir, name, work_dir):
+    """Move test output into the test directory for inspection."""
+    output_dir = os.path.join(basedir, name, 'output')
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    shutil.copytree(work_dir, output_dir)
+    shutil.rmtree(work_dir, ignore_errors=True)
 
-    print '\033[00;37mRunning test \033[01m%s \033[00;37m.. ' % name,
+def run_test(basedir, name, do_suppress, work_dir):
+    """Run a test in a private temporary directory and compare against the model."""
+    import pcbasic
     dirname = os.path.join(basedir, name)
-    if not os.path.isdir(dirname):
-        print '\033[01;31mno such test.\033[00;37m'
-        continue
     output_dir = os.path.join(dirname, 'output')
     model_dir = os.path.join(dirname, 'model')
     known_dir = os.path.join(dirname, 'known')
     if os.path.isdir(output_dir):
         shutil.rmtree(output_dir)
-    os.mkdir(output_dir)
     for filename in os.listdir(dirname):
         if os.path.isfile(os.path.join(dirname, filename)):
-            shutil.copy(os.path.join(dirname, filename), os.path.join(output_dir, filename))
+            shutil.copy(os.path.join(dirname, filename), os.path.join(work_dir, filename))
+    # preserve environment
     top = os.getcwd()
-    os.chdir(output_dir)
+    save_env = deepcopy(os.environ)
+    os.chdir(work_dir)
     sys.stdout.flush()
     # we need to include the output dir in the PYTHONPATH for it to find extension modules
-    sys.path = pythonpath + [os.path.abspath('.')]
+    sys.path = pythonpath + [work_dir]
+    start_time = time.time()
     # -----------------------------------------------------------
     # suppress output and logging and call PC-BASIC
     with suppress_stdio(do_suppress):
@@ -117,68 +115,223 @@ for name in args:
         try:
             pcbasic.run('--interface=none')
         except Exception as e:
-            crash = e
+            crash = repr(e)
     # -----------------------------------------------------------
+    duration = time.time() - start_time
     os.chdir(top)
+    os.environ = save_env
+    sys.path = pythonpath
     passed = True
     known = True
     failfiles = []
     for path, dirs, files in os.walk(model_dir):
         for f in files:
             filename = os.path.join(path[len(model_dir)+1:], f)
-            if (not is_same(os.path.join(output_dir, filename), os.path.join(model_dir, filename))
+            if (not is_same(os.path.join(work_dir, filename), os.path.join(model_dir, filename))
                     and not os.path.isfile(os.path.join(dirname, filename))):
                 failfiles.append(filename)
-                known = os.path.isdir(known_dir) and is_same(os.path.join(output_dir, filename), os.path.join(known_dir, filename))
+                known = os.path.isdir(known_dir) and is_same(os.path.join(work_dir, filename), os.path.join(known_dir, filename))
                 passed = False
-    for path, dirs, files in os.walk(output_dir):
+    for path, dirs, files in os.walk(work_dir):
         for f in files:
-            filename = os.path.join(path[len(output_dir)+1:], f)
+            filename = os.path.join(path[len(work_dir)+1:], f)
             if (not os.path.isfile(os.path.join(model_dir, filename)) and not os.path.isfile(os.path.join(dirname, filename))):
                 failfiles.append(filename)
                 passed = False
                 known = False
+    diffs = []
+    for failname in failfiles:
+        try:
+            n, count = count_diff(os.path.join(work_dir, failname), os.path.join(model_dir, failname))
+            pct = 100.*count/float(n) if n != 0 else 0
+            diffs.append('%s: %d lines, %d differences (%3.2f %%)' % (failname, n, count, pct))
+        except EnvironmentError as e:
+            diffs.append('%s: %s' % (failname, e))
     if crash or not passed:
-        if crash:
-            print '\033[01;31mEXCEPTION.\033[00;37m'
-            print '    %s' % repr(e)
-            failed.append(name)
-        elif not known:
-            print '\033[01;31mfailed.\033[00;37m'
-            for failname in failfiles:
-                try:
-                    n, count = count_diff(os.path.join(output_dir, failname), os.path.join(model_dir, failname))
-                    pct = 100.*count/float(n) if n != 0 else 0
-                    print '    %s: %d lines, %d differences (%3.2f %%)' % (failname, n, count, pct)
-                except EnvironmentError as e:
-                    print '    %s: %s' % (failname, e)
-            failed.append(name)
+        keep_output(basedir, name, work_dir)
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if crash:
+        status = 'crash'
+    elif passed:
+        status = 'pass'
+    elif known:
+        status = 'known'
+    else:
+        status = 'fail'
+    return dict(name=name, status=status, time=duration, crash=crash, diffs=diffs)
+
+def _worker(basedir, name, do_suppress, work_dir, results):
+    """Run a test in a child process and report back."""
+    try:
+        result = run_test(basedir, name, do_suppress, work_dir)
+    except BaseException:
+        result = dict(name=name, status='crash', time=0., crash=traceback.format_exc(), diffs=[])
+    results.put(result)
+
+def run_parallel(basedir, names, jobs, timeout, do_suppress):
+    """Run tests in a pool of child processes with a per-test timeout."""
+    results = multiprocessing.Queue()
+    pending = list(names)
+    running = {}
+    while pending or running:
+        while pending and len(running) < jobs:
+            name = pending.pop(0)
+            work_dir = make_work_dir(name)
+            proc = multiprocessing.Process(
+                target=_worker, args=(basedir, name, do_suppress, work_dir, results)
+            )
+            proc.daemon = True
+            proc.start()
+            running[name] = proc, time.time(), work_dir
+        try:
+            result = results.get(timeout=0.05)
+        except Queue.Empty:
+            pass
         else:
-            print '\033[00;36mknown failure.\033[00;37m'
-            for failname in failfiles:
-                try:
-                    n, count = count_diff(os.path.join(output_dir, failname), os.path.join(model_dir, failname))
-                    pct = 100.*count/float(n) if n != 0 else 0
-                    print '    %s: %d lines, %d differences (%3.2f %%)' % (failname, n, count, pct)
-                except EnvironmentError as e:
-                    print '    %s: %s' % (failname, e)
-            knowfailed.append(name)
+            # ignore late results for tests we have already timed out
+            if result['name'] in running:
+                proc, _, _ = running.pop(result['name'])
+                proc.join()
+                yield result
+        now = time.time()
+        for name, (proc, start, work_dir) in running.items():
+            if now - start > timeout:
+                # hung, probably waiting on input in an event loop
+                proc.terminate()
+                proc.join()
+                del running[name]
+                keep_output(basedir, name, work_dir)
+                yield dict(name=name, status='timeout', time=now-start, crash=None, diffs=[])
+            elif not proc.is_alive() and proc.exitcode:
+                # died without reporting
+                del running[name]
+                keep_output(basedir, name, work_dir)
+                yield dict(
+                    name=name, status='crash', time=now-start,
+                    crash='exit code %d' % proc.exitcode, diffs=[]
+                )
+
+def run_serial(basedir, names, do_suppress):
+    """Run tests one by one in this process."""
+    for name in names:
+        yield run_test(basedir, name, do_suppress, make_work_dir(name))
+
+def write_junit(filename, results, total_time):
+    """Write results as JUnit-style XML."""
+    suite = ElementTree.Element('testsuite', {
+        'name': 'correctness',
+        'tests': str(len(results)),
+        'failures': str(sum(r['status'] == 'fail' for r in results)),
+        'errors': str(sum(r['status'] in ('crash', 'timeout') for r in results)),
+        'skipped': str(sum(r['status'] == 'known' for r in results)),
+        'time': '%.3f' % total_time,
+    })
+    for result in results:
+        case = ElementTree.SubElement(suite, 'testcase', {
+            'classname': 'correctness',
+            'name': result['name'],
+            'time': '%.3f' % result['time'],
+        })
+        if result['status'] == 'fail':
+            ElementTree.SubElement(case, 'failure', {'message': 'output differs'}).text = (
+                '\n'.join(result['diffs']))
+        elif result['status'] == 'crash':
+            ElementTree.SubElement(case, 'error', {'message': 'exception'}).text = result['crash']
+        elif result['status'] == 'timeout':
+            ElementTree.SubElement(case, 'error', {'message': 'timeout'})
+        elif result['status'] == 'known':
+            ElementTree.SubElement(case, 'skipped', {'message': 'known failure'}).text = (
+                '\n'.join(result['diffs']))
+    ElementTree.ElementTree(suite).write(filename, encoding='utf-8', xml_declaration=True)
+
+def report(result):
+    """Print the outcome of a single test."""
+    name, status = result['name'], result['status']
+    print '\033[00;37mTest \033[01m%s \033[00;37m.. ' % name,
+    if status == 'crash':
+        print '\033[01;31mEXCEPTION.\033[00;37m (%.2fs)' % result['time']
+        print '    %s' % result['crash']
+    elif status == 'timeout':
+        print '\033[01;31mtimed out.\033[00;37m (%.2fs)' % result['time']
+    elif status == 'fail':
+        print '\033[01;31mfailed.\033[00;37m (%.2fs)' % result['time']
+    elif status == 'known':
+        print '\033[00;36mknown failure.\033[00;37m (%.2fs)' % result['time']
     else:
-        print '\033[00;32mpassed.\033[00;37m'
-        shutil.rmtree(output_dir)
-    numtests += 1
-
-print
-print '\033[00mRan %d tests in %.2fs (wall) %.2fs (cpu):' % (numtests, time.time() - start_time, time.clock() - start_clock)
-if failed:
-    print '    %d new failures: \033[01;31m%s\033[00m' % (len(failed), ' '.join(failed))
-if knowfailed:
-    print '    %d known failures: \033[00;36m%s\033[00m' % (len(knowfailed), ' '.join(knowfailed))
-numpass = numtests - len(failed) - len(knowfailed)
-if numpass:
-    print '    %d passes' % numpass
-
-if cov:
-    cov.stop()
-    cov.save()
-    cov.html_report()
+        print '\033[00;32mpassed.\033[00;37m (%.2fs)' % result['time']
+    for diff in result['diffs']:
+        print '    %s' % diff
+    sys.stdout.flush()
+
+
+def main(args):
+    """Run the correctness tests."""
+    basedir = os.path.join(HERE, 'correctness')
+    do_suppress = not get_flag(args, 'loud')
+    do_coverage = get_flag(args, 'coverage')
+    rerun_failed = get_flag(args, 'failed')
+    jobs = get_option(args, 'jobs', multiprocessing.cpu_count())
+    timeout = get_option(args, 'timeout', TIMEOUT)
+    xml_file = get_option(args, 'xml', '')
+    if do_coverage:
+        import coverage
+        cov = coverage.coverage()
+        cov.start()
+    else:
+        cov = None
+    if rerun_failed:
+        try:
+            with open(LAST_FAILED) as f:
+                args = f.read().split()
+        except EnvironmentError:
+            args = []
+    elif not args or '--all' in args:
+        args = [f for f in sorted(os.listdir(basedir))
+                if os.path.isdir(os.path.join(basedir, f)) and os.path.isdir(os.path.join(basedir, f, 'model'))]
+    args = [os.path.basename(n) for n in args]
+    names = []
+    for name in args:
+        if not os.path.isdir(os.path.join(basedir, name)):
+            print '\033[00;37mTest \033[01m%s \033[00;37m.. \033[01;31mno such test.\033[00;37m' % name
+        else:
+            names.append(name)
+    start_time = time.time()
+    start_clock = time.clock()
+    # coverage can only be collected in-process
+    if cov or jobs <= 1:
+        outcomes = run_serial(basedir, names, do_suppress)
+    else:
+        outcomes = run_parallel(basedir, names, jobs, timeout, do_suppress)
+    results = []
+    for result in outcomes:
+        report(result)
+        results.append(result)
+    total_time = time.time() - start_time
+    results.sort(key=lambda r: r['name'])
+    failed = [r['name'] for r in results if r['status'] in ('fail', 'crash', 'timeout')]
+    knowfailed = [r['name'] for r in results if r['status'] == 'known']
+    with open(LAST_FAILED, 'w') as f:
+        f.write('\n'.join(failed))
+    if xml_file:
+        write_junit(xml_file, results, total_time)
+    numtests = len(results)
+    print
+    print '\033[00mRan %d tests in %.2fs (wall) %.2fs (cpu), %.2fs total per test:' % (
+        numtests, total_time, time.clock() - start_clock, sum(r['time'] for r in results))
+    if failed:
+        print '    %d new failures: \033[01;31m%s\033[00m' % (len(failed), ' '.join(failed))
+    if knowfailed:
+        print '    %d known failures: \033[00;36m%s\033[00m' % (len(knowfailed), ' '.join(knowfailed))
+    numpass = numtests - len(failed) - len(knowfailed)
+    if numpass:
+        print '    %d passes' % numpass
+    if cov:
+        cov.stop()
+        cov.save()
+        cov.html_report()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,110 @@
+"""
+PC-BASIC tests - test_batch
+Batch runner
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', '..'))
+
+from pcbasic.batch import BatchRunner, BatchJob, TIMED_OUT
+
+
+class BatchTest(unittest.TestCase):
+    """Jobs run in a pool of warmed-up sessions."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='pcbasic-test-batch-')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _program(self, name, *lines):
+        """Write a BASIC program to the work directory."""
+        file_name = os.path.join(self.dir, name)
+        with open(file_name, 'wb') as f:
+            f.write(b''.join(b'%s\r\n' % (line,) for line in lines))
+        return file_name
+
+    def _run(self, *jobs, **kwargs):
+        """Run jobs on a single worker, so that they share a session."""
+        with BatchRunner(workers=1, **kwargs) as runner:
+            return runner.run(jobs)
+
+    def test_exit_codes(self):
+        """Jobs report 0 on normal ending or SYSTEM, or the BASIC error number."""
+        results = self._run(
+            BatchJob(self._program('END.BAS', b'10 PRINT 1')),
+            BatchJob(self._program('SYSTEM.BAS', b'10 SYSTEM')),
+            BatchJob(self._program('ERROR.BAS', b'10 ERROR 5')),
+            BatchJob(os.path.join(self.dir, 'NOSUCH.BAS')),
+        )
+        self.assertEqual([result.exit_code for result in results], [0, 0, 5, 53])
+
+    def test_output(self):
+        """Screen output is captured per job."""
+        program = self._program('HELLO.BAS', b'10 PRINT "hello"')
+        results = self._run(BatchJob(program), BatchJob(program))
+        self.assertEqual([result.output for result in results], [b'hello\r\n'] * 2)
+
+    def test_timeout(self):
+        """A job that runs too long is stopped and the pool carries on."""
+        results = self._run(
+            BatchJob(self._program('LOOP.BAS', b'10 GOTO 10'), timeout=1),
+            BatchJob(self._program('HELLO.BAS', b'10 PRINT "hello"')),
+        )
+        self.assertEqual(results[0].exit_code, TIMED_OUT)
+        self.assertEqual((results[1].exit_code, results[1].output), (0, b'hello\r\n'))
+
+    def test_reload_after_chain(self):
+        """A program replaced by CHAIN is loaded again for the next job."""
+        main = self._program('MAIN.BAS', b'10 PRINT "MAIN"', b'20 CHAIN "@:SUB"')
+        sub = self._program('SUB.BAS', b'10 PRINT "SUB"')
+        job = BatchJob(main, files={b'SUB': sub})
+        results = self._run(job, job)
+        self.assertEqual([result.output for result in results], [b'MAIN\r\nSUB\r\n'] * 2)
+
+    def test_reload_after_commands(self):
+        """A program changed by a job's commands is loaded again for the next job."""
+        program = self._program('HELLO.BAS', b'10 PRINT "hello"')
+        results = self._run(
+            BatchJob(program, commands=[b'10 PRINT "changed"']), BatchJob(program)
+        )
+        self.assertEqual([result.output for result in results], [b'changed\r\n', b'hello\r\n'])
+
+    def test_keys_isolated(self):
+        """Keystrokes left over by a job are not seen by the next."""
+        results = self._run(
+            BatchJob(self._program('END.BAS', b'10 END'), keys=u'x' * 100),
+            BatchJob(self._program('INKEY.BAS', b'10 PRINT "[" INKEY$ "]"')),
+        )
+        self.assertEqual(results[1].output, b'[]\r\n')
+
+    def test_width_isolated(self):
+        """A job's screen width is reset for the next."""
+        results = self._run(
+            BatchJob(self._program('WIDTH.BAS', b'10 WIDTH 40')),
+            BatchJob(self._program('LOCATE.BAS', b'10 LOCATE 1, 60')),
+        )
+        self.assertEqual(results[1].exit_code, 0)
+
+    def test_macros_isolated(self):
+        """A job's function-key macros are reset for the next."""
+        results = self._run(
+            BatchJob(self._program('KEY.BAS', b'10 KEY 1, "changed"')),
+            BatchJob(self._program('KEYLIST.BAS', b'10 KEY LIST')),
+        )
+        self.assertIn(b'LIST', results[1].output)
+        self.assertNotIn(b'changed', results[1].output)
+
+
+if __name__ == '__main__':
+    unittest.main()
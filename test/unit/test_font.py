@@ -0,0 +1,75 @@
+"""
+PC-BASIC tests - test_font
+Coloured glyph cache
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import sys
+import Queue
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', '..'))
+
+from pcbasic.basic.display import font
+
+
+class FakeMode(object):
+    """Graphics mode with an 8x8 font."""
+    font_width = 8
+    font_height = 8
+    is_text_mode = False
+
+
+class FakeCodepage(object):
+    """Codepage that maps bytes to latin-1."""
+
+    def to_unicode(self, char, replace=u''):
+        return char.decode('latin-1')
+
+
+class FakeQueues(object):
+    """Signal queues."""
+
+    def __init__(self):
+        self.video = Queue.Queue()
+
+
+class GlyphCacheTest(unittest.TestCase):
+    """Coloured sprites are cached and can't be corrupted by callers."""
+
+    def setUp(self):
+        self.glyphs = font.GlyphCache(
+            FakeMode(), {8: font.Font(8, {})}, FakeCodepage(), FakeQueues()
+        )
+
+    def _colours(self, sprite):
+        return set(value for row in sprite for value in row)
+
+    def test_colours(self):
+        """Sprites have the requested foreground and background."""
+        x0, y0, x1, y1, sprite = self.glyphs.get_sprite(2, 3, b'A', 3, 1)
+        self.assertEqual((x0, y0, x1, y1), (16, 8, 23, 15))
+        self.assertEqual(self._colours(sprite), set((1, 3)))
+        _, _, _, _, space = self.glyphs.get_sprite(1, 1, b' ', 3, 1)
+        self.assertEqual(self._colours(space), set((1,)))
+
+    def test_reuse(self):
+        """Sprites with the same character and colours are reused."""
+        sprite = self.glyphs.get_sprite(1, 1, b'A', 3, 1)[4]
+        self.assertIs(self.glyphs.get_sprite(5, 7, b'A', 3, 1)[4], sprite)
+        self.assertIsNot(self.glyphs.get_sprite(1, 1, b'A', 2, 1)[4], sprite)
+
+    def test_read_only(self):
+        """Changing a sprite in place fails and leaves the cache intact."""
+        sprite = self.glyphs.get_sprite(1, 1, b'A', 3, 1)[4]
+        with self.assertRaises((ValueError, TypeError)):
+            sprite[0][0] = 15
+        self.assertEqual(self._colours(self.glyphs.get_sprite(1, 1, b'A', 3, 1)[4]), set((1, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+PC-BASIC tests - test_iostreams
+Redirected input and output
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', '..'))
+
+import pcbasic
+from pcbasic.basic import iostreams
+from pcbasic.basic.codepage import Codepage
+
+
+class FakeClock(object):
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class OutputTest(unittest.TestCase):
+    """Buffered output to redirected streams."""
+
+    def setUp(self):
+        self.clock = FakeClock(1000.)
+        self._monotonic, iostreams.monotonic = iostreams.monotonic, self.clock
+
+    def tearDown(self):
+        iostreams.monotonic = self._monotonic
+
+    def test_flush_before_input(self):
+        """Output reaches the stream before the interpreter waits for input."""
+        output = io.BytesIO()
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, 'rb') as input_stream:
+            session = pcbasic.Session(input_streams=input_stream, output_streams=output)
+            thread = threading.Thread(target=session.execute, args=('INPUT "name"; A$',))
+            thread.daemon = True
+            thread.start()
+            # the clock is stopped, so the prompt can only be flushed by the input wait
+            for _ in range(500):
+                if b'name? ' in output.getvalue():
+                    break
+                time.sleep(0.01)
+            prompt = output.getvalue()
+            os.write(write_fd, b'hello\r\n')
+            thread.join(5)
+            os.close(write_fd)
+            self.assertFalse(thread.is_alive())
+            self.assertIn(b'name? ', prompt)
+            self.assertEqual(session.get_variable('A$'), b'hello')
+            session.close()
+
+    def test_flush_interval(self):
+        """Held-back output is written out once it is old enough."""
+        output = io.BytesIO()
+        session = pcbasic.Session(output_streams=output)
+        session.start()
+        streams = session._impl.io_streams
+        streams.write(b'hello')
+        streams.check_output(idle=False)
+        self.assertEqual(output.getvalue(), b'')
+        self.clock.now += iostreams.FLUSH_INTERVAL
+        streams.check_output(idle=False)
+        self.assertEqual(output.getvalue(), b'hello')
+        session.close()
+
+    def test_stdio_device_order(self):
+        """Output to a printer on standard output stays in order with screen output."""
+        work_dir = tempfile.mkdtemp(prefix='pcbasic-test-iostreams-')
+        try:
+            with open(os.path.join(work_dir, 'MIXED.BAS'), 'wb') as f:
+                f.write(
+                    b'10 PRINT "one"\r\n20 LPRINT "two"\r\n'
+                    b'30 PRINT "three"\r\n40 LPRINT "four"\r\n'
+                )
+            # standard output must be a pipe, so that it is buffered
+            with open(os.devnull, 'wb') as devnull:
+                output = subprocess.check_output([
+                    sys.executable, '-c',
+                    'import sys; sys.path.insert(0, sys.argv[1]); import pcbasic; '
+                    'pcbasic.run("MIXED.BAS", "--interface=none", "--output=STDOUT", '
+                    '"--lpt1=STDIO:", "--quit")',
+                    os.path.join(HERE, '..', '..')
+                ], cwd=work_dir, stderr=devnull)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        self.assertEqual(output.split(), [b'one', b'two', b'three', b'four'])
+
+
+class InputTest(unittest.TestCase):
+    """Redirected input is read in chunks."""
+
+    def _read_all(self, data, lfcr=False):
+        """Read a stream through the wrapper until it closes."""
+        stream = iostreams.InputStreamWrapper(io.BytesIO(data), Codepage(), None, lfcr)
+        chunks = []
+        while True:
+            chunk = stream.read()
+            if chunk is None:
+                return chunks
+            chunks.append(chunk)
+
+    def test_crlf(self):
+        """CR LF is read as CR."""
+        self.assertEqual(u''.join(self._read_all(b'1\r\n2\r\n')), u'1\r2\r')
+
+    def test_crlf_across_chunks(self):
+        """CR LF split between chunks is read as CR."""
+        data = b'A' * (iostreams.CHUNK_SIZE - 1) + b'\r\nB'
+        chunks = self._read_all(data)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(u''.join(chunks), u'A' * (iostreams.CHUNK_SIZE - 1) + u'\rB')
+        self.assertEqual(u''.join(self._read_all(data, lfcr=True)).count(u'\r'), 1)
+
+    def test_cr_at_end_of_chunk(self):
+        """CR at the end of a chunk is not held back."""
+        chunks = self._read_all(b'A' * (iostreams.CHUNK_SIZE - 1) + b'\rB')
+        self.assertEqual(chunks[0][-1], u'\r')
+        self.assertEqual(chunks[1], u'B')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+PC-BASIC tests - test_startup
+Headless startup time and imports
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..'))
+
+import bench
+
+
+class StartupTest(unittest.TestCase):
+    """A headless session starts quickly and does not load interface plugins."""
+
+    @classmethod
+    def setUpClass(cls):
+        # start in a fresh interpreter, as this one may already have imported pcbasic
+        cls.result = json.loads(subprocess.check_output([
+            sys.executable, os.path.join(HERE, '..', 'bench.py'), '--worker', 'startup'
+        ]))
+
+    def test_no_error(self):
+        """The session starts without error."""
+        self.assertEqual(self.result['error'], 0)
+
+    def test_excluded(self):
+        """No interface plugins or their dependencies are imported."""
+        self.assertEqual(self.result['excluded'], [])
+
+    def test_budget(self):
+        """Import and session start fit in the startup budget."""
+        self.assertLessEqual(self.result['wall'], bench.STARTUP_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
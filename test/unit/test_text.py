@@ -0,0 +1,57 @@
+"""
+PC-BASIC tests - test_text
+Double-width character marking in the text buffer
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import sys
+import random
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', '..'))
+
+from pcbasic.data import read_codepage
+from pcbasic.basic.codepage import Codepage
+from pcbasic.basic.display.text import TextRow
+
+
+class DoubleWidthTest(unittest.TestCase):
+    """Flags updated per character match those of a freshly marked row."""
+
+    def _check(self, codepage_name, box_protect):
+        """Write random lead, trail and single bytes and compare with a full re-mark."""
+        codepage = Codepage(read_codepage(codepage_name), box_protect)
+        conv = codepage.get_converter(preserve=b'')
+        chars = sorted(codepage.lead)[:4] + sorted(codepage.trail)[:4] + [b'A', b' ', b'\xc4', b'\xcd']
+        rng = random.Random(0)
+        row = TextRow(7, 80, conv, True)
+        for _ in range(2000):
+            col = rng.randint(1, 80)
+            before = bytearray(row.double)
+            start, stop = row.put_char_attr(col, rng.choice(chars), 7)
+            fresh = TextRow(7, 80, conv, True)
+            fresh.chars[:] = row.chars
+            self.assertEqual(row.double, fresh.double)
+            # all changed flags are within the range to be redrawn
+            changed = [i+1 for i in range(80) if before[i] != row.double[i]]
+            self.assertTrue(all(start <= i <= stop for i in changed))
+
+    def test_950(self):
+        """Big-5 with box-drawing protection."""
+        self._check('950', True)
+
+    def test_950_nobox(self):
+        """Big-5 without box-drawing protection."""
+        self._check('950', False)
+
+    def test_932(self):
+        """Shift-JIS with box-drawing protection."""
+        self._check('932', True)
+
+
+if __name__ == '__main__':
+    unittest.main()
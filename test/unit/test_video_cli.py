@@ -0,0 +1,108 @@
+"""
+PC-BASIC tests - test_video_cli
+Frame buffering in the text-based interfaces
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import re
+import sys
+import Queue
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', '..'))
+
+from pcbasic.interface import video_cli
+
+
+def strip_escapes(unicode_str):
+    """Remove ANSI escape sequences."""
+    return re.sub(u'\x1b\\[[0-9;]*[A-Za-z]', u'', unicode_str)
+
+
+class FakeConsole(object):
+    """Terminal that records what is written to it."""
+
+    is_tty = True
+
+    def __init__(self):
+        self.written = []
+
+    def write(self, unicode_str):
+        self.written.append(unicode_str)
+
+    def read_char(self):
+        return u''
+
+    def set_raw(self):
+        pass
+
+    def unset_raw(self):
+        pass
+
+
+class FakeClock(object):
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FrameTest(unittest.TestCase):
+    """Output of the cli interface is written in frames."""
+
+    def setUp(self):
+        self._console, video_cli.console = video_cli.console, FakeConsole()
+        self._monotonic, video_cli.monotonic = video_cli.monotonic, FakeClock(1000.)
+        self.video = video_cli.VideoCLI(Queue.Queue(), Queue.Queue())
+
+    def tearDown(self):
+        video_cli.console = self._console
+        video_cli.monotonic = self._monotonic
+
+    def _put_text(self, col, text):
+        for i, char in enumerate(text):
+            self.video.put_glyph(0, 1, col + i, char, False, 7, 0, False, False)
+
+    def test_first_frame(self):
+        """The first cycle writes immediately."""
+        self.video.move_cursor(1, 1)
+        self._put_text(1, u'Ok')
+        self.video._work()
+        self.assertEqual(len(video_cli.console.written), 1)
+        self.assertIn(u'Ok', video_cli.console.written[0])
+
+    def test_frame_interval(self):
+        """Output within a frame interval is held back and written in one go."""
+        self.video.move_cursor(1, 1)
+        self.video._work()
+        del video_cli.console.written[:]
+        for i, char in enumerate(u'HELLO'):
+            video_cli.monotonic.now += video_cli.FRAME_INTERVAL / 10.
+            self._put_text(i+1, char)
+            self.video._work()
+        self.assertEqual(video_cli.console.written, [])
+        # the clock is faked, so this also checks that frames are timed on the monotonic clock
+        video_cli.monotonic.now += video_cli.FRAME_INTERVAL
+        self.video._work()
+        self.assertEqual(len(video_cli.console.written), 1)
+        self.assertEqual(strip_escapes(video_cli.console.written[0]), u'HELLO')
+
+    def test_flush_on_exit(self):
+        """Output held back is written when the interface closes."""
+        self.video.move_cursor(1, 1)
+        self.video._work()
+        self._put_text(1, u'BYE')
+        self.video._work()
+        self.video.__exit__(None, None, None)
+        self.assertIn(u'BYE', u''.join(video_cli.console.written))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+PC-BASIC tests - test_video_record
+Screen recorder
+
+(c) 2018 Rob Hagemans
+This file is released under the GNU GPL version 3 or later.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', '..'))
+
+import pcbasic
+from pcbasic.interface import video_record
+
+
+# fast-scrolling output around a wait for input
+PROGRAM = (
+    b'10 FOR I = 1 TO 3000: PRINT I;: NEXT\r\n'
+    b'20 INPUT A$\r\n'
+    b'30 PRINT A$\r\n'
+    b'40 FOR I = 1 TO 3000: PRINT I;: NEXT\r\n'
+)
+
+
+class RecordingTest(unittest.TestCase):
+    """Recordings of the same run are the same."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='pcbasic-test-record-')
+        self.program = os.path.join(self.dir, 'PROGRAM.BAS')
+        with open(self.program, 'wb') as f:
+            f.write(PROGRAM)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _record(self, name, keys=u'hello\\r'):
+        """Run the program in the recorder."""
+        file_name = os.path.join(self.dir, name)
+        pcbasic.run(
+            self.program, '--interface=record', '--record=%s' % (file_name,),
+            '--keys=%s' % (keys,), '--quit'
+        )
+        return file_name
+
+    def test_same_run(self):
+        """Two recordings of the same program match."""
+        golden = self._record('golden.zip')
+        for count in range(2):
+            self.assertEqual(
+                video_record.compare_recordings(self._record('run%d.zip' % (count,)), golden), []
+            )
+
+    def test_frames(self):
+        """Snapshots are taken when waiting for input and at the end."""
+        frames = video_record.load_recording(self._record('frames.zip'))
+        self.assertEqual(frames[-1][u'text'][-2].split()[-1], u'3000')
+        self.assertIn(u'hello', u''.join(frames[-2][u'text'] + frames[-1][u'text']))
+
+    def test_difference(self):
+        """Different input is reported."""
+        golden = self._record('golden.zip')
+        self.assertNotEqual(
+            video_record.compare_recordings(self._record('other.zip', keys=u'world\\r'), golden), []
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()